@@ -1,7 +1,19 @@
+import os
+import sys
+import json
+import pickle
+import hashlib
+import multiprocessing
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 
-import bca_tool_code.engine_cost_modules.engine_package_cost as cap_package_cost
-from bca_tool_code.general_modules.sum_by_vehicle import calc_sum_of_costs
+from bca_tool_code.engine_cost_modules.learning_curve import LearningCurve
+from bca_tool_code.general_modules.results_table import ResultsTable
+from bca_tool_code.general_modules.fleet_cache import update_hash
+from bca_tool_code.general_modules.shared_arrays import get_process_memory
+from bca_tool_code.general_modules.task_graph import TaskGraph
+from bca_tool_code.general_modules.vehicle import Vehicle
 from bca_tool_code.general_modules.emission_cost import calc_criteria_emission_cost
 from bca_tool_code.general_modules.discounting import discount_values
 from bca_tool_code.general_modules.calc_deltas import calc_deltas
@@ -14,11 +26,55 @@ from bca_tool_code.engine_cost_modules.tech_cost import calc_tech_cost
 from bca_tool_code.operation_modules.def_cost import calc_def_cost
 from bca_tool_code.operation_modules.fuel_cost import calc_fuel_cost
 
+_option_worker_settings = None  # the SetInputs object of option worker processes
+
 
 class CostCalcs:
+    indirect_attributes = {  # results attribute: calc_indirect_cost_new_warranty return_dict key
+        'WarrantyCost_PerVeh': 'WarrantyCost_PerVeh',
+        'RnDCost_PerVeh': 'RnDCost_PerVeh',
+        'OtherCost_PerVeh': 'OtherCost_PerVeh',
+        'ProfitCost_PerVeh': 'ProfitCost_PerVeh',
+        'IndirectCost_PerVeh': 'ic_sum_per_veh',
+        'WarrantyCost': 'WarrantyCost',
+        'RnDCost': 'RnDCost',
+        'OtherCost': 'OtherCost',
+        'ProfitCost': 'ProfitCost',
+        'IndirectCost': 'ic_sum',
+    }
+    def_attributes = ['DEFCost_PerVeh', 'DEFCost_PerMile', 'DEF_Gallons', 'DEFCost']
+    fuel_attributes = [
+        'Gallons',
+        'GallonsCaptured_byORVR',
+        'FuelCost_Retail_PerVeh',
+        'FuelCost_Retail_PerMile',
+        'FuelCost_Retail',
+        'FuelCost_Pretax',
+    ]
+    repair_attributes = [  # in the order returned by EmissionRepairCost.calc_repair_cost
+        'EmissionRepairCost_PerVeh',
+        'EmissionRepairCost',
+        'EmissionRepairCost_PerMile',
+        'EmissionRepairCost_PerHour',
+    ]
+
+    reference_vehicle_id = (61, 47, 2)  # its no-action direct costs scale the repair and warranty costs of all vehicles
+    worker_start_method = None  # 'fork' or 'spawn' for option worker processes; None uses fork where available
 
-    def __init__(self):
-        self.results = dict()
+    def __init__(self, fused=False, parallel_options=False):
+        self.fused = fused
+        self.parallel_options = parallel_options
+        self.shards_path = None  # the shared directory of shard results files to merge rather than calculating costs
+        self.option_ids = None  # the options being calculated; None calculates all options
+        self.vehicle_ids = None  # the vehicle_ids being calculated; None calculates all vehicle_ids
+        self.worker_start_method_used = None
+        self.worker_stats = list()
+        self.shared_fleet_size = 0
+        self.learning_curve = LearningCurve()
+        self.results = ResultsTable(('vehicle_id', 'option_id', 'modelyear_id', 'age_id', 'discount_rate'),
+                                    int_columns=('CO2_UStons', 'Energy_KJ'))
+        self.discounted_results = None
+        self.stage_graph = TaskGraph('Cost stages')
         self.attributes_to_sum = {
             'OperatingCost': ['DEFCost', 'FuelCost_Pretax', 'EmissionRepairCost'],
             'TechAndOperatingCost': ['TechCost', 'OperatingCost'],
@@ -29,6 +85,40 @@ class CostCalcs:
     def calc_results(self, settings):
         print('Calculating costs...')
 
+        self.add_results_rows(settings)
+
+        # calculate costs, running the cost stages in the order of the stages writing their inputs ------------------
+        if self.shards_path:
+            self.merge_shard_costs(settings)
+        elif self.parallel_options:
+            self.calc_costs_by_option(settings)
+        else:
+            self.run_cost_stages(settings)
+
+        # discount things ----------------------------------------------------------------------------------------------
+        if settings.runtime_options.discount_values:
+            self.discounted_results = discount_values(settings, self)
+
+        # calc the annual summary, present values and annualized values (excluding cost/veh and cost/mile results) -----
+        if settings.runtime_options.discount_values:
+            settings.annual_summary_cap.annual_summary(settings, self, settings.options, settings.vehicle.year_ids)
+
+        # calc deltas relative to the no-action scenario ---------------------------------------------------------------
+        if settings.runtime_options.calc_deltas:
+            calc_deltas(settings, self, settings.options)
+            if settings.runtime_options.discount_values:
+                calc_deltas(settings, settings.annual_summary_cap, settings.options)
+
+    def add_results_rows(self, settings):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.
+
+        Returns:
+            Adds one undiscounted results row, holding the physical data and zero costs, for each vehicle in the fleet.
+
+        """
         discount_rate = 0
 
         # create a new attributes dictionary that can be included for each dictionary key
@@ -38,56 +128,603 @@ class CostCalcs:
             new_attributes_dict.update({new_attribute: 0})
 
         # create keys and include physical data for each vehicle and attributes from the new attributes dictionary
-        for veh in settings.fleet.vehicles:
-            key = (veh.vehicle_id, veh.option_id, veh.modelyear_id, veh.age_id, discount_rate)
+        self.add_vehicle_rows(settings, discount_rate, new_attributes_dict)
 
-            update_dict = {
-                'yearID': veh.year_id,
-                'modelYearID': veh.modelyear_id,
-                'ageID': veh.age_id,
-                'optionID': veh.option_id,
-                'sourceTypeID': veh.sourcetype_id,
-                'regClassID': veh.regclass_id,
-                'fuelTypeID': veh.fueltype_id,
-                'optionName': veh.option_name,
-                'sourceTypeName': veh.sourcetype_name,
-                'regClassName': veh.regclass_name,
-                'fuelTypeName': veh.fueltype_name,
-                'DiscountRate': discount_rate,
-                'THC_UStons': veh.thc_ustons,
-                'CO_UStons': veh.co_ustons,
-                'NOx_UStons': veh.nox_ustons,
-                'PM25_exhaust_UStons': veh.pm25_exhaust_ustons,
-                'PM25_brakewear_UStons': veh.pm25_brakewear_ustons,
-                'PM25_tirewear_UStons': veh.pm25_tirewear_ustons,
-                'PM25_UStons': veh.pm25_ustons,
-                'VOC_UStons': veh.voc_ustons,
-                'CO2_UStons': veh.co2_ustons,
-                'Energy_KJ': veh.energy_kj,
-                'VMT': veh.vmt,
-                'VMT_PerVeh': veh.vmt_per_veh,
-                'Odometer': veh.odometer,
-                'VPOP': veh.vpop,
-                'Gallons': veh.gallons,
-            }
-            self.update_object_dict(key, update_dict)
-            self.update_object_dict(key, new_attributes_dict)
+    def run_cost_stages(self, settings, option_ids=None, vehicle_ids=None):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.\n
+            option_ids: List; the options to calculate; None calculates all options.\n
+            vehicle_ids: List; the vehicle_ids to calculate; None calculates all vehicle_ids.
+
+        Returns:
+            Updates the results with the costs of the option_ids and vehicle_ids, running each cost stage after the
+            stages writing its inputs and recording the time of each stage.
+
+        Note:
+            The stages run one after another; the stage graph orders and times them. The stages are pure Python and NumPy
+            work that holds the GIL and writes to the shared results table, so running them on threads gains nothing;
+            options are calculated in parallel, in worker processes, with parallel_options.
+
+        """
+        self.option_ids = option_ids
+        self.vehicle_ids = vehicle_ids
+        stages = self.get_fused_stages(settings) if self.fused else self.get_cost_stages(settings)
+        stages.append(self.get_stage('sum_costs', self.calc_sums,
+                                     [attribute for attributes in self.attributes_to_sum.values() for attribute in attributes],
+                                     list(self.attributes_to_sum)))
+        self.stage_graph = TaskGraph('Cost stages')
+        self.stage_graph.add_stages(stages)
+        self.stage_graph.run(max_workers=1)
+        self.option_ids = self.vehicle_ids = None
+
+    def calc_costs_by_option(self, settings):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.
 
-        # Direct costs by standard implementation step with learning ---------------------------------------------------
-        for vehicle in settings.fleet.vehicles_age0:
-            for start_year in settings.engine_costs.standardyear_ids:
-                cap_package_cost.calc_avg_package_cost_per_step(
-                    settings, settings.engine_costs, vehicle, start_year)
+        Returns:
+            Updates the results with the costs of the no-action option and then with those of each action option, each
+            calculated in its own worker process.
+
+        Note:
+            Action options read only their own rows and the no-action rows (package costs, reductions, and the repair
+            and warranty scalers), so once the no-action option is complete each action option can be calculated
+            independently. The fleet table arrays are moved into shared memory before the workers start. Forked workers
+            inherit the settings and no-action results and use the shared fleet arrays directly; spawned workers (e.g.,
+            on Windows, where fork is not available) attach to the shared fleet arrays by name, load only the other,
+            small, inputs and are passed the no-action results once. Each worker returns its rows of the results, its
+            entries of the detail dictionaries and its attach time and memory use; the costs are merged in option order.
+
+        """
+        global _option_worker_settings
+
+        option_ids = list(settings.fleet.table.option_names)
+        action_option_ids = [option_id for option_id in option_ids if option_id != settings.no_action_alt]
+
+        self.run_cost_stages(settings, [settings.no_action_alt])
+        if not action_option_ids:
+            return
+
+        start_method = self.worker_start_method
+        if start_method is None:
+            start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        self.worker_start_method_used = start_method
+        self.worker_stats = list()
+
+        # calculate the reductions shared by all options before sharing the fleet so that workers do not repeat them
+        for attribute in ['nox_ustons', 'thc_ustons']:
+            settings.fleet.table.get_reductions(attribute)
+        shared_fleet = settings.fleet.share_vehicles()
+        self.shared_fleet_size = settings.fleet.shared_arrays.get_size()
+
+        initializer, initargs = None, ()
+        if start_method == 'fork':
+            _option_worker_settings = settings
+        else:
+            initializer = init_option_worker
+            initargs = (shared_fleet, self.get_option_costs(settings, settings.no_action_alt))
+        try:
+            max_workers = min(len(action_option_ids), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context(start_method),
+                                     initializer=initializer, initargs=initargs) as executor:
+                futures = [executor.submit(calc_option_costs, option_id) for option_id in action_option_ids]
+                for future in futures:
+                    option_costs = future.result()
+                    self.worker_stats.append(option_costs['worker_stats'])
+                    self.merge_partial_costs(settings, option_costs)
+        finally:
+            _option_worker_settings = None
+            settings.fleet.unshare_vehicles()
+
+    def get_worker_summary(self):
+        """
+
+        Returns:
+            A DataFrame, in the Item/Results/Units layout of the summary log, of the option worker start method, the size
+            of the shared fleet arrays and the attach time and memory use of each option worker.
 
+        """
+        items = ['Option worker start method', 'Shared fleet arrays size']
+        results = [self.worker_start_method_used, self.shared_fleet_size / 1e6]
+        units = ['', 'MB']
+        for worker_stats in self.worker_stats:
+            option_id = worker_stats['option_id']
+            items += [f'Option {option_id} worker attach time',
+                      f'Option {option_id} worker RSS',
+                      f'Option {option_id} worker USS']
+            results += [worker_stats['attach_time'],
+                        worker_stats['rss'] / 1e6 if worker_stats['rss'] is not None else None,
+                        worker_stats['uss'] / 1e6 if worker_stats['uss'] is not None else None]
+            units += ['seconds', 'MB', 'MB']
+
+        return pd.DataFrame(data={'Item': items, 'Results': results, 'Units': units})
+
+    def get_detail_dicts(self, settings):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.
+
+        Returns:
+            A dictionary of the detail dictionaries the cost stages update outside the results, each with the position of
+            option_id within its keys.
+
+        """
+        detail_dicts = {
+            'package_cost_steps': (settings.engine_costs.package_cost_by_step, 1),
+            'estimated_ages': (settings.estimated_age.estimated_ages_dict, 1),
+            'contribution_factors': (settings.markups.contribution_factors, 2),
+            'repair_cost_details': (settings.emission_repair_cost.repair_cost_details, 1),
+        }
         if settings.replacement_costs:
-            for vehicle in settings.fleet.vehicles_age0:
-                for start_year in settings.engine_costs.standardyear_ids:
-                    cap_package_cost.calc_avg_package_cost_per_step(
-                        settings, settings.replacement_costs, vehicle, start_year, labor=True)
+            detail_dicts['replacement_cost_steps'] = (settings.replacement_costs.package_cost_by_step, 1)
+
+        return detail_dicts
+
+    def get_option_costs(self, settings, option_id):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.\n
+            option_id: int; the option_id.
+
+        Returns:
+            A dictionary of the results rows of the option_id, the numeric results columns for those rows and the
+            entries of each detail dictionary for the option_id.
+
+        """
+        rows = np.flatnonzero(settings.fleet.table.columns['option_id'] == option_id)
+        columns = {attribute_name: self.results.columns[attribute_name][rows]
+                   for attribute_name in self.results.column_names if attribute_name not in self.results.categories}
+        details = {name: {key: value for key, value in detail_dict.items() if key[position] == option_id}
+                   for name, (detail_dict, position) in self.get_detail_dicts(settings).items()}
+
+        return {'option_id': option_id, 'rows': rows, 'columns': columns, 'details': details}
+
+    def merge_partial_costs(self, settings, partial_costs):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.\n
+            partial_costs: Dictionary; the costs of some rows as returned by get_option_costs or get_shard_costs.
+
+        Returns:
+            Updates the results and the detail dictionaries with the partial costs.
+
+        """
+        rows = partial_costs['rows']
+        for attribute_name, values in partial_costs['columns'].items():
+            self.results.set_values(rows, attribute_name, values)
+        for name, (detail_dict, position) in self.get_detail_dicts(settings).items():
+            detail_dict.update(partial_costs['details'][name])
+
+    def get_shard_vehicle_ids(self, settings, shard_number, num_shards):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.\n
+            shard_number: int; the shard, from 1 through num_shards.\n
+            num_shards: int; the number of shards.
+
+        Returns:
+            A list of the vehicle_ids of the shard; vehicle_ids are dealt to shards in turn.
+
+        """
+        if not 1 <= shard_number <= num_shards:
+            print(f'\nShard {shard_number} is not within shards 1 through {num_shards}.')
+            sys.exit()
+
+        return settings.fleet.table.vehicle_ids[shard_number - 1::num_shards]
+
+    @staticmethod
+    def get_input_fingerprint(settings):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.
+
+        Returns:
+            A hex string hash of the input files of the run, its general inputs and its overrides, which identifies the
+            inputs the reference costs and each shard were calculated with.
+
+        Note:
+            The input files are hashed as for the fleet cache key (see fleet_cache.update_hash); overridden general
+            inputs and input filenames are included through the general inputs and Input_Files entries in use.
+
+        """
+        filepaths = [settings.path_inputs / 'Runtime_Options.csv', settings.path_inputs / 'Input_Files.csv']
+        filepaths += [settings.get_input_path(file_id) for file_id in settings.input_files._dict]
+        sha = hashlib.sha256()
+        update_hash(sha, [filepath for filepath in filepaths if filepath.exists()])
+        sha.update(json.dumps({
+            'general_inputs': settings.general_inputs._dict,
+            'input_files': settings.input_files._dict,
+            'overrides': settings.overrides,
+        }, sort_keys=True, default=str).encode())
+
+        return sha.hexdigest()[:16]
+
+    def check_input_fingerprint(self, settings, path, partial_costs):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.\n
+            path: Path; the file the partial costs were read from.\n
+            partial_costs: Dictionary; the costs read from path.
 
-        # Direct Costs by model year (sum implementation steps) --------------------------------------------------------
-        for veh in settings.fleet.vehicles_age0:
-            key = (veh.vehicle_id, veh.option_id, veh.modelyear_id, veh.age_id, discount_rate)
+        Returns:
+            Nothing, but the code issues an exit command and stops if the partial costs were calculated with inputs
+            other than the inputs of this run.
+
+        """
+        if partial_costs.get('input_fingerprint') != self.get_input_fingerprint(settings):
+            print(f'\n{path.name} was calculated with input files, general inputs or overrides other than those of this '
+                  f'run.')
+            sys.exit()
+
+    @staticmethod
+    def get_num_shards(shards_path):
+        """
+
+        Parameters:
+            shards_path: Path; the shared directory of shard results files.
+
+        Returns:
+            The number of shards the shard results files in the shards_path were run with.
+
+        Note:
+            The code issues an exit command and stops if there are no shard results files or if they were run with
+            different numbers of shards (e.g., files left from an earlier split of the fleet).
+
+        """
+        shard_paths = sorted(shards_path.glob('shard_*_of_*.pkl'))
+        if not shard_paths:
+            print(f'\nNo shard results files found in {shards_path}.')
+            sys.exit()
+
+        shard_counts = sorted({int(path.stem.split('_of_')[1]) for path in shard_paths})
+        if len(shard_counts) > 1:
+            print(f'\nThe shard results files in {shards_path} were run with {shard_counts} shards; remove the files '
+                  f'of all but one number of shards.')
+            sys.exit()
+
+        return shard_counts[0]
+
+    def calc_reference_costs(self, settings, shards_path):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.\n
+            shards_path: Path; the shared directory of shard results files.
+
+        Returns:
+            Nothing, but calculates the no-action direct costs of the reference vehicle and saves them, with the input
+            fingerprint of the run, to the shards_path for use by each shard.
+
+        Note:
+            The reference vehicle's no-action direct costs are the only costs read across vehicle_ids (in the repair
+            cost and warranty cost scalers), so calculating them once here lets each shard run independently.
+
+        """
+        self.add_results_rows(settings)
+        self.option_ids = [settings.no_action_alt]
+        self.vehicle_ids = [self.reference_vehicle_id]
+        self.calc_learning_curve(settings)
+        self.calc_package_cost_steps(settings, settings.engine_costs)
+        self.calc_direct_costs(settings)
+        rows = self.get_vehicles(settings.fleet.vehicles_age0).index
+        self.option_ids = self.vehicle_ids = None
+
+        if not len(rows):
+            print(f'\nNo no-action age_id=0 rows found for the reference vehicle {self.reference_vehicle_id}.')
+            sys.exit()
+
+        reference_costs = {
+            'input_fingerprint': self.get_input_fingerprint(settings),
+            'num_rows': len(self.results),
+            'rows': rows,
+            'columns': {attribute_name: self.results.get_column(attribute_name)[rows]
+                        for attribute_name in ['PackageCost_PerVeh', 'DirectCost_PerVeh', 'DirectCost']},
+        }
+        self.write_partial_costs(shards_path / 'reference_costs.pkl', reference_costs)
+
+    def calc_shard_costs(self, settings, shards_path, shard_number, num_shards):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.\n
+            shards_path: Path; the shared directory of shard results files.\n
+            shard_number: int; the shard, from 1 through num_shards.\n
+            num_shards: int; the number of shards.
+
+        Returns:
+            Nothing, but calculates the costs of the vehicle_ids of the shard, for all options, and saves them to the
+            shards_path.
+
+        Note:
+            The code issues an exit command and stops if the reference costs were calculated with inputs other than the
+            inputs of this shard (see get_input_fingerprint).
+
+        """
+        vehicle_ids = self.get_shard_vehicle_ids(settings, shard_number, num_shards)
+        reference_path = shards_path / 'reference_costs.pkl'
+        reference_costs = self.read_partial_costs(reference_path)
+        self.check_input_fingerprint(settings, reference_path, reference_costs)
+
+        self.add_results_rows(settings)
+        for attribute_name, values in reference_costs['columns'].items():
+            self.results.set_values(reference_costs['rows'], attribute_name, values)
+
+        self.run_cost_stages(settings, vehicle_ids=vehicle_ids)
+
+        self.vehicle_ids = vehicle_ids
+        rows = self.get_vehicles(settings.fleet.vehicles).index
+        self.vehicle_ids = None
+        shard_costs = self.get_shard_costs(settings, rows)
+        shard_costs.update({'shard_number': shard_number, 'num_shards': num_shards,
+                            'input_fingerprint': reference_costs['input_fingerprint']})
+        self.write_partial_costs(shards_path / f'shard_{shard_number}_of_{num_shards}.pkl', shard_costs)
+
+    def get_shard_costs(self, settings, rows):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.\n
+            rows: array; the results rows of the shard.
+
+        Returns:
+            A dictionary of the results rows of the shard, the numeric results columns for those rows and each detail
+            dictionary.
+
+        """
+        columns = {attribute_name: self.results.columns[attribute_name][rows]
+                   for attribute_name in self.results.column_names if attribute_name not in self.results.categories}
+        details = {name: detail_dict for name, (detail_dict, position) in self.get_detail_dicts(settings).items()}
+
+        return {'num_rows': len(self.results), 'rows': rows, 'columns': columns, 'details': details}
+
+    def merge_shard_costs(self, settings):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.
+
+        Returns:
+            Updates the results and the detail dictionaries with the costs in the shard results files of the shards_path.
+
+        Note:
+            Every shard of the run must be complete and must have been run with the inputs of this run.
+
+        """
+        num_shards = self.get_num_shards(self.shards_path)
+        expected = [self.shards_path / f'shard_{shard_number}_of_{num_shards}.pkl'
+                    for shard_number in range(1, num_shards + 1)]
+        missing = [path.name for path in expected if not path.exists()]
+        if missing:
+            print(f'\nShard results files {missing} not found in {self.shards_path}.')
+            sys.exit()
+
+        merged_rows = np.zeros(len(self.results), dtype=bool)
+        for path in expected:
+            shard_costs = self.read_partial_costs(path)
+            self.check_input_fingerprint(settings, path, shard_costs)
+            if shard_costs['num_rows'] != len(self.results):
+                print(f'\n{path.name} was not run on the fleet of this run.')
+                sys.exit()
+            self.merge_partial_costs(settings, shard_costs)
+            merged_rows[shard_costs['rows']] = True
+
+        if not merged_rows.all():
+            print(f'\nThe shard results files in {self.shards_path} do not cover the fleet.')
+            sys.exit()
+
+    @staticmethod
+    def write_partial_costs(path, partial_costs):
+        """
+
+        Parameters:
+            path: Path; the file to write.\n
+            partial_costs: Dictionary; the costs to write.
+
+        Returns:
+            Nothing, but writes the partial costs to path; the file is written under a temporary name and then renamed
+            so that a merge never reads a partly written file.
+
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f'{path.name}.tmp')
+        with open(temp_path, 'wb') as file:
+            pickle.dump(partial_costs, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def read_partial_costs(path):
+        """
+
+        Parameters:
+            path: Path; the file to read.
+
+        Returns:
+            The partial costs saved by write_partial_costs.
+
+        """
+        if not path.exists():
+            print(f'\n{path} not found.')
+            sys.exit()
+        with open(path, 'rb') as file:
+            return pickle.load(file)
+
+    def get_vehicles(self, vehicle_rows):
+        """
+
+        Parameters:
+            vehicle_rows: object; a VehicleRows sequence of the fleet (e.g., settings.fleet.vehicles_age0).
+
+        Returns:
+            The vehicle_rows of the options and vehicle_ids being calculated.
+
+        """
+        if self.option_ids is None and self.vehicle_ids is None:
+            return vehicle_rows
+        table = vehicle_rows.table
+        index = vehicle_rows.index
+        if self.option_ids is not None:
+            index = index[np.isin(table.columns['option_id'][index], self.option_ids)]
+        if self.vehicle_ids is not None:
+            vehicle_codes = [code for code, vehicle_id in enumerate(table.vehicle_ids) if vehicle_id in self.vehicle_ids]
+            index = index[np.isin(table.vehicle_codes[index], vehicle_codes)]
+
+        return table.rows(index)
+
+    @staticmethod
+    def get_stage(name, function, inputs, outputs):
+        """
+
+        Parameters:
+            name: str; the stage name.\n
+            function: callable; the function, taking no arguments, that carries out the stage.\n
+            inputs: List; the results attributes (or other data, e.g., 'estimated_ages') the stage reads.\n
+            outputs: List; the results attributes (or other data) the stage writes.
+
+        Returns:
+            A stage dictionary for use in TaskGraph.add_stages.
+
+        """
+        return {'name': name, 'function': function, 'inputs': inputs, 'outputs': outputs}
+
+    def get_cost_stages(self, settings):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.
+
+        Returns:
+            A list of the cost stages, each making one pass over the fleet and updating the results row by row.
+
+        Note:
+            Stage inputs and outputs include data held outside the results: the per-step package costs of the engine and
+            replacement cost objects, the estimated ages and the markup contribution factors (which hold the warranty
+            cost used in repair costs).
+
+        """
+        get_stage = self.get_stage
+        stages = [
+            get_stage('learning_effects', lambda: self.calc_learning_curve(settings),
+                      [], ['learning_effects']),
+            get_stage('package_cost_steps',
+                      lambda: self.calc_package_cost_steps(settings, settings.engine_costs),
+                      ['learning_effects'], ['package_cost_steps']),
+            get_stage('direct_costs', lambda: self.calc_direct_costs(settings),
+                      ['package_cost_steps'], ['PackageCost_PerVeh', 'DirectCost_PerVeh', 'DirectCost']),
+            get_stage('estimated_ages', lambda: self.calc_estimated_ages(settings),
+                      [], ['estimated_ages']),
+            get_stage('indirect_costs', lambda: self.calc_indirect_costs(settings),
+                      ['DirectCost_PerVeh', 'estimated_ages'], [*self.indirect_attributes, 'contribution_factors']),
+            get_stage('tech_costs', lambda: self.calc_tech_costs(settings),
+                      ['DirectCost_PerVeh', 'IndirectCost_PerVeh', 'ReplacementCost_PerVeh'],
+                      ['TechCost_PerVeh', 'TechCost']),
+            get_stage('def_costs', lambda: self.calc_def_costs(settings),
+                      [], self.def_attributes),
+            get_stage('fuel_costs', lambda: self.calc_fuel_costs(settings),
+                      [], self.fuel_attributes),
+            get_stage('repair_costs', lambda: self.calc_repair_costs(settings),
+                      ['DirectCost_PerVeh', 'estimated_ages', 'contribution_factors'], self.repair_attributes),
+        ]
+        if settings.replacement_costs:
+            stages += [
+                get_stage('replacement_cost_steps',
+                          lambda: self.calc_package_cost_steps(settings, settings.replacement_costs, labor=True),
+                          ['learning_effects'], ['replacement_cost_steps']),
+                get_stage('replacement_costs', lambda: self.calc_replacement_costs(settings),
+                          ['replacement_cost_steps'], ['ReplacementCost_PerVeh', 'ReplacementCost']),
+            ]
+        if settings.runtime_options.calc_cap_pollution:
+            stages.append(get_stage('pollution_costs', lambda: self.calc_pollution_costs(settings),
+                                    [], ['pollution_costs']))
+
+        return stages
+
+    def get_fused_stages(self, settings):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.
+
+        Returns:
+            A list of the cost stages with the stages of get_cost_stages fused as far as their inputs allow; each makes
+            one pass over the fleet and writes one record per row.
+
+        """
+        get_stage = self.get_stage
+        direct_attributes = ['PackageCost_PerVeh', 'DirectCost_PerVeh', 'DirectCost']
+        if settings.replacement_costs:
+            direct_attributes += ['ReplacementCost_PerVeh', 'ReplacementCost']
+        stages = [
+            get_stage('package_cost_steps', lambda: self.calc_package_cost_steps_fused(settings),
+                      [], ['package_cost_steps']),
+            get_stage('direct_costs', lambda: self.calc_direct_costs_fused(settings, direct_attributes),
+                      ['package_cost_steps'], [*direct_attributes, 'estimated_ages']),
+            get_stage('indirect_and_tech_costs', lambda: self.calc_indirect_and_tech_costs_fused(settings),
+                      ['DirectCost_PerVeh', 'ReplacementCost_PerVeh', 'estimated_ages'],
+                      [*self.indirect_attributes, 'TechCost_PerVeh', 'TechCost', 'contribution_factors']),
+            get_stage('operating_costs', lambda: self.calc_operating_costs_fused(settings),
+                      ['DirectCost_PerVeh', 'estimated_ages', 'contribution_factors'],
+                      [*self.fuel_attributes, *self.def_attributes, *self.repair_attributes, 'pollution_costs']),
+        ]
+
+        return stages
+
+    def calc_package_cost_steps(self, settings, cost_object, labor=False):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.\n
+            cost_object: object; an object of the PieceCost class (e.g., settings.engine_costs or settings.replacement_costs).\n
+            labor: boolean; if True, a labor cost will be included in the package cost.
+
+        Returns:
+            Updates the cost_object with the package costs, with learning, of each standard implementation step.
+
+        """
+        labor_cost = 0
+        if labor:
+            labor_cost = settings.repair_and_maintenance.get_attribute_value(('replacement_cost_labor', 'dollars'))
+        self.learning_curve.update_package_cost_by_step(cost_object, settings.general_inputs.config.learning_rate,
+                                                        labor_cost)
+
+    def calc_learning_curve(self, settings):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.
+
+        Returns:
+            Nothing, but gathers the learning curve inputs of the age_id=0 fleet and calculates the learning effects, for
+            the learning rate of the general inputs, once for use by the engine and replacement cost objects.
+
+        """
+        cost_objects = [settings.engine_costs]
+        if settings.replacement_costs:
+            cost_objects.append(settings.replacement_costs)
+        self.learning_curve = LearningCurve()
+        self.learning_curve.init_from_vehicles(settings, self.get_vehicles(settings.fleet.vehicles_age0), cost_objects)
+        self.learning_curve.calc_learning_effects(settings.general_inputs.config.learning_rate)
+
+    def calc_direct_costs(self, settings):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.
+
+        Returns:
+            Updates the results with the direct costs by model year (the sum of implementation steps).
+
+        """
+        for veh in self.get_vehicles(settings.fleet.vehicles_age0):
+            key = (veh.vehicle_id, veh.option_id, veh.modelyear_id, veh.age_id, 0)
 
             direct_applied_cost_per_veh, direct_cost, pkg_cost_per_veh \
                 = calc_package_cost(settings, settings.engine_costs, veh)
@@ -100,62 +737,74 @@ class CostCalcs:
             }
             self.update_object_dict(key, update_dict)
 
-        # Replacement Costs, where applicable --------------------------------------------------------------------------
-        if settings.replacement_costs:
-            for veh in settings.fleet.vehicles_age0:
-                key = (veh.vehicle_id, veh.option_id, veh.modelyear_id, veh.age_id, discount_rate)
+    def calc_replacement_costs(self, settings):
+        """
 
-                replacement_applied_cost_per_veh, replacement_cost, replacement_pkg_cost_per_veh \
-                    = calc_package_cost(settings, settings.replacement_costs, veh)
+        Parameters:
+            settings: object; the SetInputs class object.
 
-                # update object dict with direct costs, all of which are for age_id=0 only
-                update_dict = {
-                    'ReplacementCost_PerVeh': replacement_applied_cost_per_veh,
-                    'ReplacementCost': replacement_cost,
-                }
-                self.update_object_dict(key, update_dict)
+        Returns:
+            Updates the results with the replacement costs by model year.
 
-        # Estimated Ages at which warranty and useful life will be reached ---------------------------------------------
-        for veh in settings.fleet.vehicles_age0:
-            settings.estimated_age.calc_estimated_age(settings, veh)
+        """
+        for veh in self.get_vehicles(settings.fleet.vehicles_age0):
+            key = (veh.vehicle_id, veh.option_id, veh.modelyear_id, veh.age_id, 0)
 
-        # Indirect Costs -----------------------------------------------------------------------------------------------
-        for veh in settings.fleet.vehicles_age0:
-            key = (veh.vehicle_id, veh.option_id, veh.modelyear_id, veh.age_id, discount_rate)
-
-            indirect_cost_dict \
-                = calc_indirect_cost_new_warranty(settings, veh)
-            warranty_cost_per_veh = indirect_cost_dict['WarrantyCost_PerVeh']
-            rnd_cost_per_veh = indirect_cost_dict['RnDCost_PerVeh']
-            other_cost_per_veh = indirect_cost_dict['OtherCost_PerVeh']
-            profit_cost_per_veh = indirect_cost_dict['ProfitCost_PerVeh']
-            indirect_cost_per_veh = indirect_cost_dict['ic_sum_per_veh']
-            warranty_cost = indirect_cost_dict['WarrantyCost']
-            rnd_cost = indirect_cost_dict['RnDCost']
-            other_cost = indirect_cost_dict['OtherCost']
-            profit_cost = indirect_cost_dict['ProfitCost']
-            indirect_cost = indirect_cost_dict['ic_sum']
+            replacement_applied_cost_per_veh, replacement_cost, replacement_pkg_cost_per_veh \
+                = calc_package_cost(settings, settings.replacement_costs, veh)
 
+            # update object dict with direct costs, all of which are for age_id=0 only
             update_dict = {
-                'WarrantyCost_PerVeh': warranty_cost_per_veh,
-                'RnDCost_PerVeh': rnd_cost_per_veh,
-                'OtherCost_PerVeh': other_cost_per_veh,
-                'ProfitCost_PerVeh': profit_cost_per_veh,
-                'IndirectCost_PerVeh': indirect_cost_per_veh,
-                'WarrantyCost': warranty_cost,
-                'RnDCost': rnd_cost,
-                'OtherCost': other_cost,
-                'ProfitCost': profit_cost,
-                'IndirectCost': indirect_cost,
+                'ReplacementCost_PerVeh': replacement_applied_cost_per_veh,
+                'ReplacementCost': replacement_cost,
             }
             self.update_object_dict(key, update_dict)
 
-        # Tech Costs (Direct + Indirect) -------------------------------------------------------------------------------
-        for veh in settings.fleet.vehicles_age0:
-            key = (veh.vehicle_id, veh.option_id, veh.modelyear_id, veh.age_id, discount_rate)
-            tech_cost_per_veh, tech_cost \
-                = calc_tech_cost(settings, veh) #, direct_applied_cost_per_veh, indirect_cost_per_veh, replacement_applied_cost_per_veh)
-            
+    def calc_estimated_ages(self, settings):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.
+
+        Returns:
+            Updates the estimated ages at which warranty and useful life will be reached.
+
+        """
+        for veh in self.get_vehicles(settings.fleet.vehicles_age0):
+            settings.estimated_age.calc_estimated_age(settings, veh)
+
+    def calc_indirect_costs(self, settings):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.
+
+        Returns:
+            Updates the results with the indirect costs.
+
+        """
+        for veh in self.get_vehicles(settings.fleet.vehicles_age0):
+            key = (veh.vehicle_id, veh.option_id, veh.modelyear_id, veh.age_id, 0)
+
+            indirect_cost_dict = calc_indirect_cost_new_warranty(settings, veh)
+            update_dict = {attribute_name: indirect_cost_dict[indirect_name]
+                           for attribute_name, indirect_name in self.indirect_attributes.items()}
+            self.update_object_dict(key, update_dict)
+
+    def calc_tech_costs(self, settings):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.
+
+        Returns:
+            Updates the results with the tech costs (direct plus indirect).
+
+        """
+        for veh in self.get_vehicles(settings.fleet.vehicles_age0):
+            key = (veh.vehicle_id, veh.option_id, veh.modelyear_id, veh.age_id, 0)
+            tech_cost_per_veh, tech_cost = calc_tech_cost(settings, veh)
+
             # update object dict with tech costs, all of which are for age_id=0 only
             update_dict = {
                 'TechCost_PerVeh': tech_cost_per_veh,
@@ -163,12 +812,23 @@ class CostCalcs:
             }
             self.update_object_dict(key, update_dict)
 
-        # DEF Costs for diesel fueled vehicles -------------------------------------------------------------------------
-        for veh in settings.fleet.vehicles_ft2:
-            key = (veh.vehicle_id, veh.option_id, veh.modelyear_id, veh.age_id, discount_rate)
+    def calc_def_costs(self, settings):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.
+
+        Returns:
+            Updates the results with the DEF costs of diesel fueled vehicles.
+
+        """
+        vehicles = self.get_vehicles(settings.fleet.vehicles_ft2)
+        def_prices = settings.def_prices.get_prices(vehicles.get_values('year_id')).tolist()
+        for veh, def_price in zip(vehicles, def_prices):
+            key = (veh.vehicle_id, veh.option_id, veh.modelyear_id, veh.age_id, 0)
             nox_reduction = calc_nox_reduction(settings, veh)
             def_cost_per_veh, def_cost, def_cost_per_mile, def_gallons \
-                = calc_def_cost(settings, veh, nox_reduction=nox_reduction)
+                = calc_def_cost(settings, veh, nox_reduction=nox_reduction, def_price=def_price)
             update_dict = {
                 'DEFCost_PerVeh': def_cost_per_veh,
                 'DEFCost_PerMile': def_cost_per_mile,
@@ -177,12 +837,22 @@ class CostCalcs:
             }
             self.update_object_dict(key, update_dict)
 
-        # Fuel Costs ---------------------------------------------------------------------------------------------------
-        for veh in settings.fleet.vehicles:
-            key = (veh.vehicle_id, veh.option_id, veh.modelyear_id, veh.age_id, discount_rate)
+    def calc_fuel_costs(self, settings):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.
+
+        Returns:
+            Updates the results with the fuel costs.
+
+        """
+        vehicles = self.get_vehicles(settings.fleet.vehicles)
+        for veh, prices in zip(vehicles, self.get_fuel_prices(settings, vehicles)):
+            key = (veh.vehicle_id, veh.option_id, veh.modelyear_id, veh.age_id, 0)
             thc_reduction = calc_thc_reduction(settings, veh)
             fuel_cost_per_veh, retail_cost, pretax_cost, fuel_cost_per_mile, captured_gallons \
-                = calc_fuel_cost(settings, veh, thc_reduction=thc_reduction)
+                = calc_fuel_cost(settings, veh, thc_reduction=thc_reduction, prices=prices)
             update_dict = {
                 'Gallons': veh.gallons - captured_gallons,
                 'GallonsCaptured_byORVR': captured_gallons,
@@ -193,9 +863,36 @@ class CostCalcs:
             }
             self.update_object_dict(key, update_dict)
 
-        # Emission Repair Costs ----------------------------------------------------------------------------------------
-        for veh in settings.fleet.vehicles:
-            key = (veh.vehicle_id, veh.option_id, veh.modelyear_id, veh.age_id, discount_rate)
+    @staticmethod
+    def get_fuel_prices(settings, vehicles):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.\n
+            vehicles: object; a VehicleRows sequence of the fleet.
+
+        Returns:
+            A list of the (retail, pretax) fuel prices of each vehicle, looked up for all vehicles at once.
+
+        """
+        retail_prices, pretax_prices \
+            = settings.fuel_prices.get_prices(vehicles.get_values('year_id'), vehicles.get_values('fueltype_id'),
+                                              'retail_fuel_price', 'pretax_fuel_price')
+
+        return list(zip(retail_prices.tolist(), pretax_prices.tolist()))
+
+    def calc_repair_costs(self, settings):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.
+
+        Returns:
+            Updates the results with the emission repair costs.
+
+        """
+        for veh in self.get_vehicles(settings.fleet.vehicles):
+            key = (veh.vehicle_id, veh.option_id, veh.modelyear_id, veh.age_id, 0)
 
             repair_cost_per_veh, repair_cost, repair_cost_per_mile, repair_cost_per_hour \
                 = settings.emission_repair_cost.calc_repair_cost(settings, veh)
@@ -208,35 +905,224 @@ class CostCalcs:
             }
             self.update_object_dict(key, update_dict)
 
-        # sum attributes in the attributes_to_sum dictionary -----------------------------------------------------------
-        for veh in settings.fleet.vehicles:
-            key = (veh.vehicle_id, veh.option_id, veh.modelyear_id, veh.age_id, discount_rate)
-            for summed_attribute, sum_attributes in self.attributes_to_sum.items():
-                summed_attribute_value = calc_sum_of_costs(key, self.results, *sum_attributes)
-                update_dict = {summed_attribute: summed_attribute_value}
-                self.update_object_dict(key, update_dict)
+    def calc_pollution_costs(self, settings):
+        """
 
-        # CAP pollution effects, if applicable -------------------------------------------------------------------------
-        if settings.runtime_options.calc_cap_pollution:
-            for veh in settings.fleet.vehicles:
-                key = (veh.vehicle_id, veh.option_id, veh.modelyear_id, veh.age_id, discount_rate)
+        Parameters:
+            settings: object; the SetInputs class object.
+
+        Returns:
+            Updates the results with the CAP pollution costs.
+
+        """
+        for veh in self.get_vehicles(settings.fleet.vehicles):
+            key = (veh.vehicle_id, veh.option_id, veh.modelyear_id, veh.age_id, 0)
+            update_dict = calc_criteria_emission_cost(settings, veh)
+            self.update_object_dict(key, update_dict)
+
+    def calc_sums(self):
+        """
+
+        Returns:
+            Updates the results with the sums of the attributes in the attributes_to_sum dictionary.
+
+        """
+        for summed_attribute, sum_attributes in self.attributes_to_sum.items():
+            summed_attribute_values = 0
+            for sum_attribute in sum_attributes:
+                summed_attribute_values = summed_attribute_values + self.results.get_column(sum_attribute)
+            self.results.set_column(summed_attribute, summed_attribute_values)
+
+    def calc_package_cost_steps_fused(self, settings):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.
+
+        Returns:
+            Updates the engine and replacement cost objects with the package costs, with learning, of each standard
+            implementation step, calculating the learning effects once for both.
+
+        """
+        self.calc_learning_curve(settings)
+        self.calc_package_cost_steps(settings, settings.engine_costs)
+        if settings.replacement_costs:
+            self.calc_package_cost_steps(settings, settings.replacement_costs, labor=True)
+
+    def calc_direct_costs_fused(self, settings, attribute_names):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.\n
+            attribute_names: List; the direct (and, where applicable, replacement) cost attributes.
+
+        Returns:
+            Updates the results with the direct and replacement costs, and the estimated ages, in a single pass over the
+            age_id=0 fleet.
+
+        """
+        vehicles_age0 = self.get_vehicles(settings.fleet.vehicles_age0)
+        record = np.zeros((len(vehicles_age0), len(attribute_names)))
+        for position, veh in enumerate(vehicles_age0):
+            direct_applied_cost_per_veh, direct_cost, pkg_cost_per_veh \
+                = calc_package_cost(settings, settings.engine_costs, veh)
+            values = [pkg_cost_per_veh, direct_applied_cost_per_veh, direct_cost]
+            if settings.replacement_costs:
+                replacement_applied_cost_per_veh, replacement_cost, replacement_pkg_cost_per_veh \
+                    = calc_package_cost(settings, settings.replacement_costs, veh)
+                values += [replacement_applied_cost_per_veh, replacement_cost]
+            record[position] = values
+
+            settings.estimated_age.calc_estimated_age(settings, veh)
+        self.write_record(vehicles_age0.index, attribute_names, record)
+
+    def calc_indirect_and_tech_costs_fused(self, settings):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.
+
+        Returns:
+            Updates the results with the indirect and tech costs in a single pass over the age_id=0 fleet.
+
+        """
+        vehicles_age0 = self.get_vehicles(settings.fleet.vehicles_age0)
+        attribute_names = [*self.indirect_attributes, 'TechCost_PerVeh', 'TechCost']
+        record = np.zeros((len(vehicles_age0), len(attribute_names)))
+        for position, veh in enumerate(vehicles_age0):
+            indirect_cost_dict = calc_indirect_cost_new_warranty(settings, veh)
+            tech_cost_per_veh, tech_cost \
+                = calc_tech_cost(settings, veh, indirect_cost_per_veh=indirect_cost_dict['ic_sum_per_veh'])
+            record[position] = [indirect_cost_dict[k] for k in self.indirect_attributes.values()] \
+                               + [tech_cost_per_veh, tech_cost]
+        self.write_record(vehicles_age0.index, attribute_names, record)
+
+    def calc_operating_costs_fused(self, settings):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.
+
+        Returns:
+            Updates the results with the fuel costs, the DEF costs (for diesel fueled vehicles), the emission repair costs
+            and, if calculated, the CAP pollution costs in a single pass over the fleet.
+
+        """
+        vehicles = self.get_vehicles(settings.fleet.vehicles)
+        fuel_prices = self.get_fuel_prices(settings, vehicles)
+        vehicles_ft2 = self.get_vehicles(settings.fleet.vehicles_ft2)
+        def_prices = settings.def_prices.get_prices(vehicles_ft2.get_values('year_id')).tolist()
+        attribute_names = [*self.fuel_attributes, *self.repair_attributes]
+        def_rows = list()
+        def_record = np.zeros((len(vehicles_ft2), len(self.def_attributes)))
+        record = np.zeros((len(vehicles), len(attribute_names)))
+        pollution_attributes = pollution_record = None
+        for position, veh in enumerate(vehicles):
+            if veh.fueltype_id == 2:
+                nox_reduction = calc_nox_reduction(settings, veh)
+                def_cost_per_veh, def_cost, def_cost_per_mile, def_gallons \
+                    = calc_def_cost(settings, veh, nox_reduction=nox_reduction, def_price=def_prices[len(def_rows)])
+                def_record[len(def_rows)] = [def_cost_per_veh, def_cost_per_mile, def_gallons, def_cost]
+                def_rows.append(veh.row)
+
+            thc_reduction = calc_thc_reduction(settings, veh)
+            fuel_cost_per_veh, retail_cost, pretax_cost, fuel_cost_per_mile, captured_gallons \
+                = calc_fuel_cost(settings, veh, thc_reduction=thc_reduction, prices=fuel_prices[position])
+            record[position] = [
+                veh.gallons - captured_gallons,
+                captured_gallons,
+                fuel_cost_per_veh,
+                fuel_cost_per_mile,
+                retail_cost,
+                pretax_cost,
+                *settings.emission_repair_cost.calc_repair_cost(settings, veh),
+            ]
+
+            if settings.runtime_options.calc_cap_pollution:
                 update_dict = calc_criteria_emission_cost(settings, veh)
-                self.update_object_dict(key, update_dict)
+                if pollution_record is None:
+                    pollution_attributes = list(update_dict)
+                    pollution_record = np.zeros((len(vehicles), len(pollution_attributes)))
+                pollution_record[position] = [update_dict[k] for k in pollution_attributes]
 
-        # discount things ----------------------------------------------------------------------------------------------
-        if settings.runtime_options.discount_values:
-            add_keys_for_discounting(settings.general_inputs, self.results)
-            discount_values(settings, self)
+        self.write_record(np.array(def_rows, dtype=np.int64), self.def_attributes, def_record[:len(def_rows)])
+        self.write_record(vehicles.index, attribute_names, record)
+        if pollution_record is not None:
+            self.write_record(vehicles.index, pollution_attributes, pollution_record)
 
-        # calc the annual summary, present values and annualized values (excluding cost/veh and cost/mile results) -----
-        if settings.runtime_options.discount_values:
-            settings.annual_summary_cap.annual_summary(settings, self, settings.options, settings.vehicle.year_ids)
+    def write_record(self, rows, attribute_names, record):
+        """
 
-        # calc deltas relative to the no-action scenario ---------------------------------------------------------------
-        if settings.runtime_options.calc_deltas:
-            calc_deltas(settings, self, settings.options)
-            if settings.runtime_options.discount_values:
-                calc_deltas(settings, settings.annual_summary_cap, settings.options)
+        Parameters:
+            rows: array; the results rows of the record.\n
+            attribute_names: List; the attribute names of the record columns.\n
+            record: array; one row of values per results row and one column per attribute.
+
+        Returns:
+            Nothing, but stores each column of the record in the results.
+
+        Note:
+            Results rows are in fleet table order, so the rows of a fused pass are the fleet table rows of its vehicles.
+
+        """
+        for index, attribute_name in enumerate(attribute_names):
+            self.results.set_values(rows, attribute_name, record[:, index])
+
+    def add_vehicle_rows(self, settings, discount_rate, new_attributes_dict):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.\n
+            discount_rate: numeric; the discount rate of the rows to add (i.e., 0).\n
+            new_attributes_dict: Dictionary; the attributes, and initial values, to include in each row.
+
+        Returns:
+            Adds one results row, holding the physical data, for each vehicle in the fleet in a single pass over the
+            fleet table columns.
+
+        """
+        table = settings.fleet.table
+        columns = table.columns
+        keys = self.results.encode_key_columns((table.vehicle_ids, table.vehicle_codes),
+                                               columns['option_id'],
+                                               columns['modelyear_id'],
+                                               columns['age_id'],
+                                               discount_rate)
+        sourcetype_ids = columns['sourcetype_id'].tolist()
+        regclass_ids = columns['regclass_id'].tolist()
+        fueltype_ids = columns['fueltype_id'].tolist()
+
+        update_dict = {
+            'yearID': columns['year_id'],
+            'modelYearID': columns['modelyear_id'],
+            'ageID': columns['age_id'],
+            'optionID': columns['option_id'],
+            'sourceTypeID': columns['sourcetype_id'],
+            'regClassID': columns['regclass_id'],
+            'fuelTypeID': columns['fueltype_id'],
+            'optionName': [table.option_names[option_id] for option_id in columns['option_id'].tolist()],
+            'sourceTypeName': [Vehicle.sourcetype_names[sourcetype_id] for sourcetype_id in sourcetype_ids],
+            'regClassName': [Vehicle.regclass_names[regclass_id] for regclass_id in regclass_ids],
+            'fuelTypeName': [Vehicle.fueltype_names[fueltype_id] for fueltype_id in fueltype_ids],
+            'DiscountRate': discount_rate,
+            'THC_UStons': columns['thc_ustons'],
+            'CO_UStons': columns['co_ustons'],
+            'NOx_UStons': columns['nox_ustons'],
+            'PM25_exhaust_UStons': columns['pm25_exhaust_ustons'],
+            'PM25_brakewear_UStons': columns['pm25_brakewear_ustons'],
+            'PM25_tirewear_UStons': columns['pm25_tirewear_ustons'],
+            'PM25_UStons': columns['pm25_ustons'],
+            'VOC_UStons': columns['voc_ustons'],
+            'CO2_UStons': 0,
+            'Energy_KJ': 0,
+            'VMT': columns['vmt'],
+            'VMT_PerVeh': columns['vmt_per_veh'],
+            'Odometer': columns['odometer'],
+            'VPOP': columns['vpop'],
+            'Gallons': columns['gallons'],
+        }
+        update_dict.update(new_attributes_dict)
+        self.results.add_rows(keys, update_dict)
 
     def update_object_dict(self, key, update_dict):
         """
@@ -249,14 +1135,7 @@ class CostCalcs:
             Updates the object dictionary with each attribute updated with the appropriate value.
 
         """
-        if key in self.results:
-            for attribute_name, attribute_value in update_dict.items():
-                self.results[key][attribute_name] = attribute_value
-
-        else:
-            self.results.update({key: {}})
-            for attribute_name, attribute_value in update_dict.items():
-                self.results[key].update({attribute_name: attribute_value})
+        self.results.update_object_dict(key, update_dict)
 
     def get_attribute_values(self, key, *attribute_names):
         """
@@ -269,11 +1148,7 @@ class CostCalcs:
             A list of attribute values associated with attribute_names for the given key.
 
         """
-        attribute_values = list()
-        for attribute_name in attribute_names:
-            attribute_values.append(self.results[key][attribute_name])
-
-        return attribute_values
+        return self.results.get_attribute_values(key, *attribute_names)
 
     def get_attribute_value(self, key, attribute_name):
         """
@@ -286,7 +1161,7 @@ class CostCalcs:
             The attribute value associated with attribute_name for the given key.
 
         """
-        return self.results[key][attribute_name]
+        return self.results.get_attribute_value(key, attribute_name)
 
     @staticmethod
     def create_new_attributes(settings):
@@ -354,24 +1229,49 @@ class CostCalcs:
         return new_attributes
 
 
-def add_keys_for_discounting(general_inputs, input_dict):
+def init_option_worker(shared_fleet, no_action_costs):
     """
+    This function sets up a spawned option worker process; forked option workers inherit the settings instead.
 
     Parameters:
-        general_inputs: object; the GeneralInputs class object.\n
-        input_dict: Dictionary; into which new keys will be added that provide room for discounting data.
+        shared_fleet: Dictionary; the shared fleet returned by Fleet.share_vehicles in the parent process.\n
+        no_action_costs: Dictionary; the no-action option costs as returned by CostCalcs.get_option_costs.
 
     Returns:
-        The passed dictionary with new keys added.
+        Nothing, but loads the inputs, attaching to the shared fleet rather than reading it, and adds the no-action
+        results.
 
     """
-    rates = [general_inputs.get_attribute_value('social_discount_rate_1'),
-             general_inputs.get_attribute_value('social_discount_rate_2')]
-    rates = [pd.to_numeric(rate) for rate in rates]
-    for rate in rates:
-        update_dict = dict()
-        for key in input_dict:
-            vehicle_id, option_id, modelyear_id, age_id, discount_rate = key
-            update_dict[vehicle_id, option_id, modelyear_id, age_id, rate] = input_dict[key].copy()
-            update_dict[vehicle_id, option_id, modelyear_id, age_id, rate]['DiscountRate'] = rate
-        input_dict.update(update_dict)
+    global _option_worker_settings
+    from bca_tool_code.set_inputs import SetInputs  # imported here since set_inputs imports this module
+
+    settings = SetInputs(shared_fleet=shared_fleet)
+    settings.cost_calcs.add_results_rows(settings)
+    settings.cost_calcs.merge_partial_costs(settings, no_action_costs)
+    _option_worker_settings = settings
+
+
+def calc_option_costs(option_id):
+    """
+    This function calculates the costs of an action option in a worker process started by
+    CostCalcs.calc_costs_by_option.
+
+    Parameters:
+        option_id: int; the option_id.
+
+    Returns:
+        The option costs, for merging into the results of the parent process, as returned by
+        CostCalcs.get_option_costs, along with the worker's attach time and memory use.
+
+    """
+    settings = _option_worker_settings
+    settings.cost_calcs.run_cost_stages(settings, [option_id])
+
+    option_costs = settings.cost_calcs.get_option_costs(settings, option_id)
+    option_costs['worker_stats'] = {
+        'option_id': option_id,
+        'attach_time': settings.fleet.shared_arrays.attach_time,
+        **get_process_memory(),
+    }
+
+    return option_costs
@@ -1,6 +1,3 @@
-import pandas as pd
-
-
 def calc_avg_package_cost_per_step(settings, cost_object, vehicle, standardyear_id, labor=False):
     """
 
@@ -16,10 +13,11 @@ def calc_avg_package_cost_per_step(settings, cost_object, vehicle, standardyear_
         effects, associated with implementation of each new standard.
 
     Note:
-        Tech penetrations are applied here.
+        Tech penetrations are applied here. CostCalcs calculates these package costs for the whole age_id=0 fleet at
+        once with the LearningCurve class; this function remains for single-vehicle use.
 
     """    
-    learning_rate = pd.to_numeric(settings.general_inputs.get_attribute_value('learning_rate'))
+    learning_rate = settings.general_inputs.config.learning_rate
 
     engine_id, option_id, modelyear_id = vehicle.engine_id, vehicle.option_id, vehicle.modelyear_id
     key = (engine_id, option_id, modelyear_id)
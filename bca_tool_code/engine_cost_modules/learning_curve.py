@@ -0,0 +1,321 @@
+import numpy as np
+
+
+class LearningCurve:
+    """
+
+    The LearningCurve class gathers, for each vehicle of the age_id=0 fleet and each standardyear_id, the inputs to the
+    learning curve (tech penetration, first-year and cumulative sales and seed volume factor) into arrays, calculates the
+    learning effects as array operations and applies them to the package costs of any number of PieceCosts objects.
+
+    Note:
+        The arrays have one row per vehicle and one column per standardyear_id. Tech penetrations, sales and learning
+        effects do not depend on the cost object so they are gathered and calculated once, and learning effects are
+        cached by learning rate, for all cost objects (e.g., engine costs and replacement costs). Calculation methods
+        accept a list of learning rates and return arrays with a leading learning rate axis so that learning rate
+        sensitivities are calculated in one pass.
+
+    """
+    def __init__(self):
+        self.vehicles = list()
+        self.engine_ids = list()
+        self.engine_codes = np.zeros(0, dtype=np.int64)
+        self.option_ids = np.zeros(0, dtype=np.int64)
+        self.modelyear_ids = np.zeros(0, dtype=np.int64)
+        self.standardyear_ids = list()
+        self.key_options = np.zeros(0, dtype=np.int64)
+        self.key_years = np.zeros(0, dtype=np.int64)
+        self.key_shape = (0, 0, 0)
+        self.standardyear_codes = np.zeros((0, 0), dtype=np.int64)
+        self.applies = np.zeros((0, 0), dtype=bool)
+        self.techpens = np.zeros((0, 0))
+        self.sales_year1 = np.zeros((0, 0))
+        self.cumulative_sales = np.zeros((0, 0))
+        self.seedvolume_factors = np.zeros((0, 0))
+        self.learning_effects = dict()
+
+    def init_from_vehicles(self, settings, vehicles, cost_objects):
+        """
+
+        Parameters:
+            settings: object; the SetInputs class object.\n
+            vehicles: object; a VehicleRows sequence of the age_id=0 fleet.\n
+            cost_objects: List; the PieceCost class objects (e.g., settings.engine_costs and settings.replacement_costs)
+            to which the learning effects will be applied.
+
+        Returns:
+            Nothing, but gathers the learning curve inputs of each vehicle and standardyear_id for which any of the
+            cost_objects has a package cost.
+
+        Note:
+            The inputs are gathered with array lookups on (engine_id, option_id, year_id) key codes, the engine_ids
+            coded as in the fleet table; the input dictionaries are coded once rather than looked up vehicle by vehicle.
+
+        """
+        table = vehicles.table
+        self.vehicles = vehicles
+        self.engine_ids = table.engine_ids
+        self.engine_codes = table.engine_codes[vehicles.index]
+        self.option_ids = vehicles.get_values('option_id').astype(np.int64)
+        self.modelyear_ids = vehicles.get_values('modelyear_id').astype(np.int64)
+        self.standardyear_ids = [int(standardyear_id) for standardyear_id in settings.engine_costs.standardyear_ids]
+        self.learning_effects = dict()
+        self.init_key_codes()
+
+        shape = (len(self.vehicles), len(self.standardyear_ids))
+        self.applies = self.get_applies(cost_objects)
+        self.techpens = np.zeros(shape)
+        self.sales_year1 = np.zeros(shape)
+        self.cumulative_sales = np.zeros(shape)
+        self.seedvolume_factors = np.zeros(shape)
+
+        techpen_ids, techpen_codes = table.engine_ids, self.engine_codes
+        if settings.techpens.unit_id == 'vehicle_id':
+            techpen_ids, techpen_codes = table.vehicle_ids, table.vehicle_codes[vehicles.index]
+        sales = settings.fleet.sales_by_start_year
+        sales_codes = self.get_dict_codes(sales)
+        engine_sales = self.get_key_values(sales, sales_codes, 'engine_sales')[0]
+        modelyear_codes = self.get_key_codes(self.engine_codes, self.option_ids, self.modelyear_ids)
+
+        for column, standardyear_id in enumerate(self.standardyear_ids):
+            rows = np.flatnonzero(self.applies[:, column])
+            if not len(rows):
+                continue
+            self.techpens[rows, column] = settings.techpens.get_values(
+                techpen_ids, techpen_codes[rows], self.option_ids[rows], self.modelyear_ids[rows], standardyear_id)
+
+            cumulative_sales = self.get_key_values(sales, sales_codes,
+                                                   f'cumulative_engine_sales_{standardyear_id}_std')[0]
+            self.sales_year1[rows, column] = engine_sales[self.standardyear_codes[rows, column]]
+            self.cumulative_sales[rows, column] = cumulative_sales[modelyear_codes[rows]]
+
+        rows = np.flatnonzero(self.applies.any(axis=1))
+        if len(rows):
+            pairs, inverse = np.unique(np.stack([self.engine_codes[rows], self.option_ids[rows]], axis=1),
+                                       axis=0, return_inverse=True)
+            factors = np.array([settings.engine_learning_scalers.get_seedvolume_factor(self.engine_ids[engine_code],
+                                                                                        option_id)
+                                for engine_code, option_id in pairs.tolist()], dtype=float)
+            self.seedvolume_factors[rows] = factors[inverse.reshape(-1)].reshape(-1, 1)
+            self.seedvolume_factors[~self.applies] = 0
+
+        self.sales_year1 *= self.techpens
+        self.cumulative_sales *= self.techpens
+
+    def init_key_codes(self):
+        """
+
+        Returns:
+            Nothing, but sets the option_ids and years spanned by the key codes and the key code of each vehicle and
+            standardyear_id.
+
+        """
+        self.key_options = np.unique(self.option_ids)
+        years = np.concatenate([self.modelyear_ids, np.array(self.standardyear_ids, dtype=np.int64)])
+        self.key_years = np.arange(years.min(), years.max() + 1) if len(years) else np.zeros(0, dtype=np.int64)
+        self.key_shape = (len(self.engine_ids), len(self.key_options), len(self.key_years))
+        self.standardyear_codes = self.get_key_codes(self.engine_codes.reshape(-1, 1), self.option_ids.reshape(-1, 1),
+                                                     np.array(self.standardyear_ids, dtype=np.int64).reshape(1, -1))
+
+    def get_key_codes(self, engine_codes, option_ids, year_ids):
+        """
+
+        Parameters:
+            engine_codes: array; positions within engine_ids.\n
+            option_ids: array; option_ids.\n
+            year_ids: array; model years or standardyear_ids.
+
+        Returns:
+            An array, broadcast over the passed arrays, of the key code of each (engine_id, option_id, year_id); keys
+            outside the engine_ids, option_ids and years of the vehicles get -1.
+
+        """
+        engine_codes, option_ids, year_ids = np.broadcast_arrays(engine_codes, option_ids, year_ids)
+        option_index = np.searchsorted(self.key_options, option_ids)
+        year_index = year_ids - (self.key_years[0] if len(self.key_years) else 0)
+        valid = (engine_codes >= 0) & np.isin(option_ids, self.key_options) \
+            & (year_index >= 0) & (year_index < len(self.key_years))
+
+        codes = np.full(engine_codes.shape, -1, dtype=np.int64)
+        codes[valid] = np.ravel_multi_index((engine_codes[valid], option_index[valid], year_index[valid]),
+                                            self.key_shape)
+
+        return codes
+
+    def get_dict_codes(self, _dict):
+        """
+
+        Parameters:
+            _dict: Dictionary; a dictionary keyed by (engine_id, option_id, year_id).
+
+        Returns:
+            An array of the key code of each key of _dict, in order.
+
+        """
+        engine_positions = {engine_id: position for position, engine_id in enumerate(self.engine_ids)}
+        keys = list(_dict)
+
+        return self.get_key_codes(np.array([engine_positions.get(key[0], -1) for key in keys], dtype=np.int64),
+                                  np.array([key[1] for key in keys], dtype=np.int64),
+                                  np.array([key[2] for key in keys], dtype=np.int64))
+
+    def get_key_values(self, _dict, dict_codes, value_name):
+        """
+
+        Parameters:
+            _dict: Dictionary; a dictionary keyed by (engine_id, option_id, year_id).\n
+            dict_codes: array; the key codes of _dict returned by get_dict_codes.\n
+            value_name: str; the name of the value sought.
+
+        Returns:
+            An array, by key code, of the value_name values of _dict (NaN where _dict has no key) and an array, by key
+            code, that is True where _dict has a key.
+
+        """
+        size = int(np.prod(self.key_shape))
+        values = np.full(size, np.nan)
+        found = np.zeros(size, dtype=bool)
+        valid = dict_codes >= 0
+        values[dict_codes[valid]] = np.array([entry[value_name] for entry in _dict.values()], dtype=float)[valid]
+        found[dict_codes[valid]] = True
+
+        return values, found
+
+    def get_applies(self, cost_objects):
+        """
+
+        Parameters:
+            cost_objects: List; PieceCost class objects.
+
+        Returns:
+            An array, by vehicle and standardyear_id, that is True where the vehicle's model year is at or after the
+            standardyear_id and any of the cost_objects has a package cost for the vehicle's engine and option in the
+            standardyear_id.
+
+        """
+        applies = self.modelyear_ids.reshape(-1, 1) >= np.array(self.standardyear_ids, dtype=np.int64).reshape(1, -1)
+        has_cost = np.zeros(applies.shape, dtype=bool)
+        valid = self.standardyear_codes >= 0
+        for cost_object in cost_objects:
+            found = self.get_key_values(cost_object._dict, self.get_dict_codes(cost_object._dict), 'pkg_cost')[1]
+            has_cost[valid] |= found[self.standardyear_codes[valid]]
+
+        return applies & has_cost
+
+    def calc_learning_effects(self, learning_rates):
+        """
+
+        Parameters:
+            learning_rates: numeric or list; the learning rate(s).
+
+        Returns:
+            An array, by learning rate, vehicle and standardyear_id, of the learning effects to be applied to first year
+            costs; learning effects are zero where learning does not apply (i.e., no package cost or no first-year
+            sales).
+
+        Note:
+            Learning effects are cached by learning rate so each is calculated once for all cost objects.
+
+        """
+        learning_rates = np.atleast_1d(np.asarray(learning_rates, dtype=float)).tolist()
+        new_rates = [rate for rate in dict.fromkeys(learning_rates) if rate not in self.learning_effects]
+        if new_rates:
+            learned = self.get_learned()
+            seed_sales = self.sales_year1 * self.seedvolume_factors
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = np.where(learned, (self.cumulative_sales + seed_sales) / (self.sales_year1 + seed_sales), 1)
+            learning_effects = np.where(learned, ratio ** np.array(new_rates).reshape(-1, 1, 1), 0)
+            self.learning_effects.update(zip(new_rates, learning_effects))
+
+        return np.stack([self.learning_effects[rate] for rate in learning_rates])
+
+    def get_learned(self):
+        """
+
+        Returns:
+            An array, by vehicle and standardyear_id, that is True where learning applies, i.e., where a package cost
+            applies and first-year sales are not zero.
+
+        """
+        return self.applies & (self.sales_year1 != 0)
+
+    def calc_package_costs(self, cost_object, learning_rates, labor_cost=0):
+        """
+
+        Parameters:
+            cost_object: object; an object of the PieceCost class (e.g., settings.engine_costs or
+            settings.replacement_costs).\n
+            learning_rates: numeric or list; the learning rate(s).\n
+            labor_cost: numeric; a labor cost to add to the learned package cost, if applicable.
+
+        Returns:
+            A dictionary of arrays, by learning rate, vehicle and standardyear_id, of the learning effects, learned
+            package costs per vehicle, tech penetrations and learned package costs per vehicle applied by tech
+            penetration of the cost_object; all are zero where the cost_object has no package cost.
+
+        """
+        pkg_costs, found = self.get_key_values(cost_object._dict, self.get_dict_codes(cost_object._dict), 'pkg_cost')
+        codes = self.standardyear_codes
+        applies = self.applies & (codes >= 0)
+        applies[applies] = found[codes[applies]]
+        pkg_costs = np.where(applies, pkg_costs[codes], 0)
+
+        learned = self.get_learned() & applies
+        learning_effects = np.where(learned, self.calc_learning_effects(learning_rates), 0)
+        pkg_costs_learned = np.where(learned, pkg_costs * learning_effects + labor_cost, 0)
+        techpens = np.where(applies, self.techpens, 0)
+
+        return {
+            'learning_effect': learning_effects,
+            'tech_cost_per_vehicle': pkg_costs_learned,
+            'techpen': np.broadcast_to(techpens, learning_effects.shape),
+            'tech_applied_cost_per_vehicle': pkg_costs_learned * techpens,
+        }
+
+    def update_package_cost_by_step(self, cost_object, learning_rate, labor_cost=0):
+        """
+
+        Parameters:
+            cost_object: object; an object of the PieceCost class (e.g., settings.engine_costs or
+            settings.replacement_costs).\n
+            learning_rate: numeric; the learning rate.\n
+            labor_cost: numeric; a labor cost to add to the learned package cost, if applicable.
+
+        Returns:
+            Nothing, but updates the package_cost_by_step dictionary of cost_object with the package costs, with
+            learning, of each vehicle and standardyear_id.
+
+        Note:
+            Where several vehicles share a package_cost_by_step key (e.g., engine costs of vehicles sharing an engine),
+            the key takes the package costs of the last of those vehicles.
+
+        """
+        unit_codes = self.engine_codes
+        if cost_object.unit_id == 'vehicle_id':
+            unit_codes = self.vehicles.table.vehicle_codes[self.vehicles.index]
+        keys = np.stack([unit_codes, self.option_ids, self.modelyear_ids], axis=1)
+        first_rows = np.unique(keys, axis=0, return_index=True)[1]
+        last_rows = len(keys) - 1 - np.unique(keys[::-1], axis=0, return_index=True)[1]
+        last_rows = last_rows[np.argsort(first_rows)]
+
+        package_costs = {attribute_name: values[0][last_rows].tolist()
+                         for attribute_name, values in self.calc_package_costs(cost_object, learning_rate,
+                                                                               labor_cost).items()}
+
+        for position, row in enumerate(last_rows.tolist()):
+            vehicle = self.vehicles[row]
+            update_dict = {
+                'optionID': vehicle.option_id,
+                'engineID': vehicle.engine_id,
+                'regClassID': vehicle.regclass_id,
+                'fuelTypeID': vehicle.fueltype_id,
+                'modelYearID': vehicle.modelyear_id,
+                'optionName': vehicle.option_name,
+                'regClassName': vehicle.regclass_name,
+                'fuelTypeName': vehicle.fueltype_name,
+            }
+            for column, standardyear_id in enumerate(self.standardyear_ids):
+                for attribute_name, values in package_costs.items():
+                    update_dict[f'{attribute_name}_{standardyear_id}_std'] = values[position][column]
+
+            cost_object.update_package_cost_by_step(vehicle, update_dict)
@@ -1,9 +1,11 @@
-def calc_tech_cost(settings, vehicle):
+def calc_tech_cost(settings, vehicle, indirect_cost_per_veh=None):
     """
 
     Parameters:
         settings: object; an object of the SetInputs class.
         vehicle: object; an object of the Vehicle class.
+        indirect_cost_per_veh: numeric; the indirect cost per vehicle, if already calculated but not yet stored in the
+        cost results; None uses the stored value.
 
     Returns:
         The tech cost per vehicle and tech cost (direct plus indirect).
@@ -27,6 +29,9 @@ def calc_tech_cost(settings, vehicle):
         ]
         direct_cost, indirect_cost = settings.cost_calcs.get_attribute_values(key, *attribute_names)
 
+    if indirect_cost_per_veh is not None:
+        indirect_cost = indirect_cost_per_veh
+
     cost_per_veh = direct_cost + indirect_cost + replacement_cost
     cost = cost_per_veh * vehicle.vpop
 
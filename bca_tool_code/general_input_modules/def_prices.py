@@ -33,6 +33,8 @@ Data Column Name and Description
 **CODE**
 
 """
+import sys
+import numpy as np
 import pandas as pd
 
 from bca_tool_code.general_input_modules.general_functions import read_input_file
@@ -48,6 +50,8 @@ class DefPrices:
     def __init__(self):
         self._dict = dict()
         self.def_prices_in_analysis_dollars = pd.DataFrame()
+        self.year_id_min = self.year_id_max = None
+        self.price_array = np.zeros(0)
 
     def init_from_file(self, filepath, general_inputs, deflators):
         """
@@ -69,6 +73,7 @@ class DefPrices:
         self.def_prices_in_analysis_dollars = df.copy()
 
         self._dict = df.to_dict('index')
+        self.init_price_array(df)
 
         # update input_files_pathlist if this class is used
         InputFiles.update_pathlist(filepath)
@@ -84,3 +89,46 @@ class DefPrices:
 
         """
         return self._dict[year_id]['DEF_USDperGal']
+
+    def init_price_array(self, df):
+        """
+
+        Parameters:
+            df: DataFrame; the DEF prices in analysis dollars, indexed by calendar year.
+
+        Returns:
+            Nothing, but creates the dense price array, indexed by year_id - year_id_min, from which get_prices draws
+            prices; years without a price hold NaN.
+
+        """
+        year_ids = df.index.to_numpy(dtype=np.int64)
+        self.year_id_min, self.year_id_max = int(year_ids.min()), int(year_ids.max())
+
+        self.price_array = np.full(self.year_id_max - self.year_id_min + 1, np.nan)
+        self.price_array[year_ids - self.year_id_min] = df['DEF_USDperGal'].to_numpy(dtype=float)
+
+    def get_prices(self, year_ids):
+        """
+
+        Parameters:
+            year_ids: array-like; the calendar years for which prices are sought.
+
+        Returns:
+            An array of the DEF price per gallon for each of the passed year_ids.
+
+        """
+        year_ids = np.asarray(year_ids, dtype=np.int64)
+
+        out_of_range = (year_ids < self.year_id_min) | (year_ids > self.year_id_max)
+        if out_of_range.any():
+            print(f'\nDEF prices cover calendar years {self.year_id_min} through {self.year_id_max}; prices for '
+                  f'{sorted(set(year_ids[out_of_range].tolist()))} were sought.')
+            sys.exit()
+
+        prices = self.price_array[year_ids - self.year_id_min]
+        missing = np.isnan(prices)
+        if missing.any():
+            print(f'\nDEF prices are missing for calendar years {sorted(set(year_ids[missing].tolist()))}.')
+            sys.exit()
+
+        return prices
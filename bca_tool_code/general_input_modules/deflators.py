@@ -105,7 +105,7 @@ class Deflators:
             dollar basis.
 
         """
-        dollar_basis_analysis = int(general_inputs.get_attribute_value('dollar_basis_analysis'))
+        dollar_basis_analysis = general_inputs.config.dollar_basis_analysis
         basis_factor_df = pd.DataFrame(df.loc[df['yearID'] == dollar_basis_analysis, 'price_deflator']).reset_index(drop=True)
         basis_factor = basis_factor_df.at[0, 'price_deflator']
 
@@ -129,7 +129,7 @@ class Deflators:
             The passed DataFrame will all args adjusted into dollar_basis dollars.
 
         """
-        dollar_basis_analysis = int(general_inputs.get_attribute_value('dollar_basis_analysis'))
+        dollar_basis_analysis = general_inputs.config.dollar_basis_analysis
         dollar_years = pd.Series(pd.DataFrame(df.loc[df['DollarBasis'] > 1])['DollarBasis'].unique())
         for year in dollar_years:
             for arg in args:
@@ -16,6 +16,8 @@ File Type
 **CODE**
 
 """
+import sys
+import numpy as np
 import pandas as pd
 
 from bca_tool_code.general_input_modules.general_functions import read_input_file
@@ -41,6 +43,10 @@ class FuelPrices:
                              'Diesel': 2,
                              'CNG': 3,
                              }
+        self.price_series = ('retail_fuel_price', 'pretax_fuel_price')
+        self.year_id_min = self.year_id_max = None
+        self.fueltype_index = np.zeros(0, dtype=np.int64)
+        self.price_array = np.zeros((0, 0, len(self.price_series)))
 
     def init_from_file(self, filepath, general_inputs, deflators):
         """
@@ -67,6 +73,7 @@ class FuelPrices:
         self.fuel_prices_in_analysis_dollars = df.copy()
 
         self._dict = df.to_dict('index')
+        self.init_price_array(df)
 
         # update input_files_pathlist if this class is used
         InputFiles.update_pathlist(filepath)
@@ -83,10 +90,72 @@ class FuelPrices:
             A list of the price(s) sought expressed in dollar_basis_analysis dollars.
 
         """
-        prices = [item for item in series]
-        price_list = list()
-        for price in prices:
-            price_list.append(self._dict[yearID, fuelTypeID][price])
+        prices = self._dict[yearID, fuelTypeID]
+
+        return [prices[price] for price in series]
+
+    def init_price_array(self, df):
+        """
+
+        Parameters:
+            df: DataFrame; the fuel prices in analysis dollars.
+
+        Returns:
+            Nothing, but creates the dense price array, indexed by (year_id - year_id_min, fueltype index, series), from
+            which get_prices draws prices; years and fuels without a price hold NaN.
+
+        """
+        year_ids = df['yearID'].to_numpy(dtype=np.int64)
+        fueltype_ids = df['fuelTypeID'].to_numpy(dtype=np.int64)
+        self.year_id_min, self.year_id_max = int(year_ids.min()), int(year_ids.max())
+
+        unique_fueltype_ids = np.unique(fueltype_ids)
+        self.fueltype_index = np.full(unique_fueltype_ids.max() + 1, -1, dtype=np.int64)
+        self.fueltype_index[unique_fueltype_ids] = np.arange(len(unique_fueltype_ids))
+
+        self.price_array = np.full(
+            (self.year_id_max - self.year_id_min + 1, len(unique_fueltype_ids), len(self.price_series)), np.nan)
+        self.price_array[year_ids - self.year_id_min, self.fueltype_index[fueltype_ids]] \
+            = df[list(self.price_series)].to_numpy(dtype=float)
+
+    def get_prices(self, year_ids, fueltype_ids, *series):
+        """
+
+        Parameters:
+            year_ids: array-like; the calendar years.\n
+            fueltype_ids: array-like; the fueltype_id, 1, 2, or 3 for gasoline, diesel, or CNG, respectively, of each
+            year_id.\n
+            series: str; 'retail_fuel_price' and/or 'pretax_fuel_price.
+
+        Returns:
+            A list of arrays, one per series, of the prices for each year_id and fueltype_id expressed in
+            dollar_basis_analysis dollars.
+
+        """
+        year_ids = np.asarray(year_ids, dtype=np.int64)
+        fueltype_ids = np.asarray(fueltype_ids, dtype=np.int64)
+
+        out_of_range = (year_ids < self.year_id_min) | (year_ids > self.year_id_max)
+        if out_of_range.any():
+            print(f'\nFuel prices cover calendar years {self.year_id_min} through {self.year_id_max}; prices for '
+                  f'{sorted(set(year_ids[out_of_range].tolist()))} were sought.')
+            sys.exit()
+
+        unknown = (fueltype_ids < 0) | (fueltype_ids >= len(self.fueltype_index))
+        unknown[~unknown] = self.fueltype_index[fueltype_ids[~unknown]] < 0
+        if unknown.any():
+            print(f'\nFuel prices are not available for fuelTypeID {sorted(set(fueltype_ids[unknown].tolist()))}.')
+            sys.exit()
+
+        prices = self.price_array[year_ids - self.year_id_min, self.fueltype_index[fueltype_ids]]
+        price_list = [prices[:, self.price_series.index(price)] for price in series]
+        for price, values in zip(series, price_list):
+            missing = np.isnan(values)
+            if missing.any():
+                print(f'\n{price} is missing for calendar years {sorted(set(year_ids[missing].tolist()))} of fuelTypeID '
+                      f'{sorted(set(fueltype_ids[missing].tolist()))}.')
+                sys.exit()
+
         return price_list
 
     @staticmethod
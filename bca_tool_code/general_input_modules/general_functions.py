@@ -4,6 +4,14 @@ import os
 import sys
 import time
 
+try:
+    import pyarrow  # enables the multithreaded pyarrow CSV engine in read_input_file
+    pyarrow_available = True
+except ImportError:
+    pyarrow_available = False
+
+read_stats = list()  # this list is updated by read_input_file and reported in the summary log
+
 
 def inputs_filenames(input_files_pathlist):
     """
@@ -38,40 +46,84 @@ def get_file_datetime(list_of_files):
     return file_datetime
 
 
-def read_input_file(path, usecols=None, index_col=None, skiprows=None, reset_index=False):
+def read_input_file(path, usecols=None, index_col=None, skiprows=None, reset_index=False,
+                    dtype=None, engine=None):
     """
 
     Parameters:
         path: Path to the specified file.\n
-        usecols: List; the columns to use in the returned DataFrame.\n
+        usecols: List or callable; the columns to use in the returned DataFrame.\n
         index_col: int; the column to use as the index column of the returned DataFrame.\n
         skiprows: int; the number of rows to skip when reading the file.\n
-        reset_index: Boolean; True resets index, False does not.
+        reset_index: Boolean; True resets index, False does not.\n
+        dtype: Dictionary; the dtype to apply, by column name, to any of those columns present in the file.\n
+        engine: str; 'pyarrow' to parse with the multithreaded pyarrow CSV engine (if installed); None for the default.
 
     Returns:
         A DataFrame of the desired data from the passed input file.
 
     Note:
-        If a file is not found, the code issues an exit command and stops.
+        If a file is not found, the code issues an exit command and stops. The file is read once; the bytes read and
+        the parse time are recorded in read_stats for the run summary log. The pyarrow engine does not accept a callable
+        usecols or skip bad lines, so the default engine is used for a callable usecols and the file is read again with
+        the default engine, skipping bad lines, if the pyarrow engine fails to parse it.
 
     """
+    start_time = time.time()
+    use_pyarrow = engine == 'pyarrow' and pyarrow_available and not callable(usecols)
     try:
-        pd.read_csv(path, usecols=usecols, index_col=index_col, skiprows=skiprows, on_bad_lines='skip')
-        print(f'File {path}.......FOUND.')
-        if reset_index:
-            return pd.read_csv(path, usecols=usecols, index_col=index_col, skiprows=skiprows, on_bad_lines='skip').dropna().reset_index(drop=True)
-        else:
-            return pd.read_csv(path, usecols=usecols, index_col=index_col, skiprows=skiprows, on_bad_lines='skip')
+        df = None
+        if use_pyarrow:
+            try:
+                df = pd.read_csv(path, usecols=usecols, index_col=index_col, skiprows=skiprows, engine='pyarrow')
+            except ValueError as err:  # pyarrow's ArrowInvalid, e.g., a line with too many fields, is a ValueError
+                print(f'File {path} could not be parsed with the pyarrow engine ({err}); using the default engine.')
+                use_pyarrow = False
+        if df is None:
+            df = pd.read_csv(path, usecols=usecols, index_col=index_col, skiprows=skiprows, on_bad_lines='skip')
     except FileNotFoundError:
         print(f'File {path}......NOT FOUND.')
         sys.exit()
+    print(f'File {path}.......FOUND.')
+
+    if dtype:
+        df = df.astype({col: col_dtype for col, col_dtype in dtype.items() if col in df.columns})
+    if reset_index:
+        df = df.dropna().reset_index(drop=True)
+
+    read_stats.append({
+        'file': PurePath(path).name,
+        'bytes': os.path.getsize(path),
+        'rows': len(df),
+        'engine': 'pyarrow' if use_pyarrow else 'c',
+        'seconds': time.time() - start_time,
+    })
+
+    return df
+
+
+def get_read_stats():
+    """
+
+    Returns:
+        A DataFrame, in the Item/Results/Units layout of the summary log, of the bytes read and the parse time for
+        each input file read by read_input_file.
+
+    """
+    items, results, units = list(), list(), list()
+    for stats in read_stats:
+        items += [f'Bytes read {stats["file"]}', f'Parse time {stats["file"]} ({stats["engine"]} engine)']
+        results += [stats['bytes'], stats['seconds']]
+        units += ['bytes', 'seconds']
+
+    return pd.DataFrame(data={'Item': items, 'Results': results, 'Units': units})
 
 
 def save_dict(dict_to_save, save_path, row_header=None, stamp=None, index=False):
     """
 
     Parameters:
-        dict_to_save: Dictionary; the dictionary to be saved to CSV.\n
+        dict_to_save: Dictionary or ResultsTable; the dictionary (or table) to be saved to CSV.\n
         save_path: Path object; the path for saving the passed dict_to_save.\n
         row_header: List; the column names to use as the row header for the preferred structure of the output file.\n
         stamp: str; an identifier for inclusion in the filename, e.g., datetime stamp.\n
@@ -82,7 +134,10 @@ def save_dict(dict_to_save, save_path, row_header=None, stamp=None, index=False)
 
     """
     print('Saving dictionary to CSV.')
-    df = pd.DataFrame(dict_to_save).transpose()
+    if hasattr(dict_to_save, 'to_dataframe'):
+        df = dict_to_save.to_dataframe()
+    else:
+        df = pd.DataFrame(dict_to_save).transpose()
     if row_header:
         cols = [col for col in df.columns if col not in row_header]
         df = pd.DataFrame(df, columns=row_header + cols)
@@ -96,7 +151,7 @@ def save_dict_return_df(dict_to_save, save_path, row_header=None, stamp=None, in
     """
 
     Parameters:
-        dict_to_save: Dictionary; the dictionary to be saved to CSV.\n
+        dict_to_save: Dictionary or ResultsTable; the dictionary (or table) to be saved to CSV.\n
         save_path: Path object; the path for saving the passed dict_to_save.\n
         row_header: List; the column names to use as the row header for the preferred structure of the output file.\n
         stamp: str; an identifier for inclusion in the filename, e.g., datetime stamp.\n
@@ -107,7 +162,10 @@ def save_dict_return_df(dict_to_save, save_path, row_header=None, stamp=None, in
 
     """
     print('Saving dictionary to CSV.')
-    df = pd.DataFrame(dict_to_save).transpose()
+    if hasattr(dict_to_save, 'to_dataframe'):
+        df = dict_to_save.to_dataframe()
+    else:
+        df = pd.DataFrame(dict_to_save).transpose()
     if row_header:
         cols = [col for col in df.columns if col not in row_header]
         df = pd.DataFrame(df, columns=row_header + cols)
@@ -19,6 +19,7 @@ Sample Data Columns
         aeo_fuel_price_case,Reference case,"enter one of: ""Reference case""; ""High oil price""; ""Low oil price"" (exactly as shown)"
         social_discount_rate_1,0.03,
         social_discount_rate_2,0.07,
+        social_discount_rate_3,0.02,"optional; enter any number of social_discount_rate_# entries, or a single social_discount_rates entry listing the rates (e.g., ""0.03, 0.07, 0.02"")"
 
 Data Column Name and Description
     :Metric:
@@ -35,18 +36,45 @@ Data Column Name and Description
 **CODE**
 
 """
+import re
+import sys
+import pandas as pd
+
 from bca_tool_code.general_input_modules.general_functions import read_input_file
 from bca_tool_code.general_input_modules.input_files import InputFiles
 
 
+class GeneralInputsConfig:
+    """
+
+    The GeneralInputsConfig class holds the value of each BCA_General_Inputs entry, parsed to its type, as an attribute
+    of the entry name (e.g., config.learning_rate).
+
+    """
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+
 class GeneralInputs:
     """
 
     The GeneralInputs class reads the BCA_General_Inputs file and provides methods to query its contents.
 
     """
+    value_types = {  # entries parsed to numbers; entries not listed, other than discount rates, are kept as entered
+        'dollar_basis_analysis': int,
+        'no_action_alt': int,
+        'discount_to_yearID': int,
+        'weighted_operating_cost_thru_ageID': int,
+        'learning_rate': float,
+        'def_gallons_per_ton_nox_reduction': float,
+        'gallons_per_ml': float,
+        'grams_per_short_ton': float,
+    }
+
     def __init__(self):
         self._dict = dict()
+        self.config = GeneralInputsConfig(dict())
 
     def init_from_file(self, filepath):
         """
@@ -62,6 +90,7 @@ class GeneralInputs:
         df = read_input_file(filepath, usecols=lambda x: 'Notes' not in x, index_col=0)
 
         self._dict = df.to_dict('index')
+        self.set_config()
 
         # update input_files_pathlist if this class is used
         InputFiles.update_pathlist(filepath)
@@ -77,3 +106,49 @@ class GeneralInputs:
 
         """
         return self._dict[attribute_name]['UserEntry']
+
+    def set_config(self):
+        """
+
+        Returns:
+            Nothing, but parses and validates each entry once and sets config to the parsed values; call again after
+            changing entries in the object dictionary.
+
+        """
+        values = dict()
+        for attribute_name, entry in self._dict.items():
+            value = entry['UserEntry']
+            if attribute_name in self.value_types:
+                value = self.parse_number(attribute_name, value, self.value_types[attribute_name])
+            elif re.fullmatch(r'(social|criteria)_discount_rate_\d+', attribute_name):
+                value = self.parse_number(attribute_name, value, float)
+            elif attribute_name == 'social_discount_rates':
+                value = [self.parse_number(attribute_name, rate, float)
+                         for rate in re.split(r'[,;\s]+', str(value)) if rate]
+            values[attribute_name] = value
+
+        self.config = GeneralInputsConfig(values)
+
+    @staticmethod
+    def parse_number(attribute_name, value, value_type):
+        """
+
+        Parameters:
+            attribute_name: str; the entry name.\n
+            value: the entry as read.\n
+            value_type: type; int or float.
+
+        Returns:
+            The entry as a value of value_type.
+
+        """
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            number = None
+        if number is None or pd.isna(number) or (value_type is int and not number.is_integer()):
+            kind = 'a whole number' if value_type is int else 'a number'
+            print(f'\n{attribute_name} in the BCA_General_Inputs file must be {kind}; "{value}" was entered.')
+            sys.exit()
+
+        return value_type(number)
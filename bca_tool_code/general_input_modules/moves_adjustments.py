@@ -66,6 +66,7 @@ class MovesAdjustments:
     """
     def __init__(self):
         self._dict = dict()
+        self.adjustments_df = pd.DataFrame()
 
     def init_from_file(self, filepath):
         """
@@ -80,6 +81,8 @@ class MovesAdjustments:
         """
         df = read_input_file(filepath, skiprows=1, usecols=lambda x: 'Notes' not in x)
 
+        self.adjustments_df = df.copy()
+
         key = pd.Series(zip
                         (zip(df['sourceTypeID'],
                              df['regClassID'],
@@ -88,7 +91,8 @@ class MovesAdjustments:
                          ))
         df.set_index(key, inplace=True)
 
-        self._dict = df.to_dict('index')
+        # keep the last of any duplicated entries here; duplicates are reported when the adjustments are applied
+        self._dict = df.loc[~df.index.duplicated(keep='last'), :].to_dict('index')
 
         # update input_files_pathlist if this class is used
         InputFiles.update_pathlist(filepath)
@@ -16,6 +16,8 @@ Sample Data Columns
         calculate_cap_pollution_effects,0,"1 for YES, 0 for NO"
         discount_values,1,"1 for YES, 0 for NO"
         calculate_deltas,1,"1 for YES, 0 for NO"
+        fused_cost_calcs,0,"optional; 1 calculates costs in fused passes over the fleet, 0 (the default) in one pass per cost stage"
+        parallel_options,0,"optional; 1 calculates each action option in its own worker process after the no-action option, 0 (the default) all options in this process"
 
 Data Column Name and Description
     :item:
@@ -51,6 +53,8 @@ class RuntimeOptions:
         self.calc_cap_pollution = False
         self.discount_values = False
         self.calc_deltas = False
+        self.fused_cost_calcs = False
+        self.parallel_options = False
 
     def init_from_file(self, filepath):
         """
@@ -119,3 +123,11 @@ class RuntimeOptions:
         self.calc_cap_pollution = self.get_attribute_value('calculate_cap_pollution_effects')
         self.discount_values = self.get_attribute_value('discount_values')
         self.calc_deltas = self.get_attribute_value('calculate_deltas')
+
+        # optional runtime options, set to their default if not in the input file
+        self.fused_cost_calcs = False
+        if 'fused_cost_calcs' in self._dict:
+            self.fused_cost_calcs = self.get_attribute_value('fused_cost_calcs')
+        self.parallel_options = False
+        if 'parallel_options' in self._dict:
+            self.parallel_options = self.get_attribute_value('parallel_options')
@@ -0,0 +1,160 @@
+import sys
+import numpy as np
+from bisect import bisect_right
+
+
+class StartYearLookup:
+    """
+
+    The StartYearLookup class holds the sorted start years of an input file whose provisions apply from a start year
+    onward (e.g., warranty provisions for MY2027 and later) and provides methods to find the start year in effect for
+    a model year and to look up the values in effect for arrays of units, options and model years.
+
+    """
+    def __init__(self):
+        self.start_years = list()
+        self.start_years_array = np.array([], dtype=int)
+        self.unit_ids = list()
+        self.unit_positions = dict()
+        self.option_ids = np.array([], dtype=int)
+        self.key_suffixes = dict()
+        self.found = np.zeros((0, 0, 0, 0), dtype=bool)
+        self.values = dict()
+
+    def init_from_start_years(self, start_years):
+        """
+
+        Parameters:
+            start_years: array-like; the start years of the input file.
+
+        Returns:
+            Nothing, but sorts the start years for use in lookups.
+
+        """
+        self.start_years = sorted(int(start_year) for start_year in set(start_years))
+        self.start_years_array = np.array(self.start_years, dtype=int)
+
+    def init_from_dict(self, _dict, *value_names):
+        """
+
+        Parameters:
+            _dict: Dictionary; the dictionary, keyed by (unit_id, option_id, start_year, *key_suffix), of an input
+            file.\n
+            value_names: str(s); the names of the values to be looked up with get_values.
+
+        Returns:
+            Nothing, but sorts the start years and holds each of the value_names in an array by unit_id, option_id,
+            start year and key suffix (e.g., the standardyear_id or period_id), with blank entries as NaN.
+
+        Note:
+            The arrays are built once, when the input file is read, so that get_values is a set of array lookups.
+
+        """
+        keys = list(_dict)
+        self.init_from_start_years([key[2] for key in keys])
+        self.unit_ids = list(dict.fromkeys(key[0] for key in keys))
+        self.unit_positions = {unit_id: position for position, unit_id in enumerate(self.unit_ids)}
+        self.option_ids = np.unique(np.array([key[1] for key in keys], dtype=int))
+        self.key_suffixes = {key_suffix: position
+                             for position, key_suffix in enumerate(dict.fromkeys(key[3:] for key in keys))}
+
+        index = (
+            np.array([self.unit_positions[key[0]] for key in keys], dtype=np.int64),
+            np.searchsorted(self.option_ids, np.array([key[1] for key in keys], dtype=int)),
+            np.searchsorted(self.start_years_array, np.array([key[2] for key in keys], dtype=int)),
+            np.array([self.key_suffixes[key[3:]] for key in keys], dtype=np.int64),
+        )
+        shape = (len(self.unit_ids), len(self.option_ids), len(self.start_years), len(self.key_suffixes))
+        self.found = np.zeros(shape, dtype=bool)
+        self.found[index] = True
+
+        self.values = dict()
+        for value_name in value_names:
+            values = np.full(shape, np.nan)
+            values[index] = [np.nan if entry[value_name] is None else entry[value_name] for entry in _dict.values()]
+            self.values[value_name] = values
+
+    def get_start_year(self, modelyear_id):
+        """
+
+        Parameters:
+            modelyear_id: int; the model year.
+
+        Returns:
+            The latest start year at or before the passed model year.
+
+        """
+        index = bisect_right(self.start_years, modelyear_id) - 1
+        if index < 0:
+            print(f'\nModel year {modelyear_id} is earlier than the first start year, {self.start_years[0]}.')
+            sys.exit()
+
+        return self.start_years[index]
+
+    def get_start_year_indexes(self, modelyear_ids):
+        """
+
+        Parameters:
+            modelyear_ids: array-like; model years.
+
+        Returns:
+            An array of the position, within start_years, of the latest start year at or before each of the passed
+            model years.
+
+        """
+        modelyear_ids = np.asarray(modelyear_ids)
+        indexes = np.searchsorted(self.start_years_array, modelyear_ids, side='right') - 1
+        if (indexes < 0).any():
+            print(f'\nModel year {modelyear_ids.min()} is earlier than the first start year, {self.start_years[0]}.')
+            sys.exit()
+
+        return indexes
+
+    def get_start_years(self, modelyear_ids):
+        """
+
+        Parameters:
+            modelyear_ids: array-like; model years.
+
+        Returns:
+            An array of the latest start year at or before each of the passed model years.
+
+        """
+        return self.start_years_array[self.get_start_year_indexes(modelyear_ids)]
+
+    def get_values(self, value_name, unit_ids, unit_codes, option_ids, modelyear_ids, *key_suffix):
+        """
+
+        Parameters:
+            value_name: str; the name of the value sought, one of the value_names passed to init_from_dict.\n
+            unit_ids: list; the unique engine_ids or vehicle_ids (e.g., FleetTable.engine_ids).\n
+            unit_codes: array-like; the position, within unit_ids, of the unit_id of each value sought (e.g.,
+            FleetTable.engine_codes).\n
+            option_ids: array-like; option_ids, one per unit_code.\n
+            modelyear_ids: array-like; model years, one per unit_code.\n
+            key_suffix: any remaining key elements (e.g., the period_id), the same for all unit_codes.
+
+        Returns:
+            An array of floats of the value for each unit_id, option_id and model year, with blank entries as NaN.
+
+        Note:
+            Only the unique unit_ids are matched to those of the input file; the values are then looked up as array
+            operations. The code issues an exit command and stops if the input file has no entry for a value sought.
+
+        """
+        unit_positions = np.array([self.unit_positions.get(unit_id, -1) for unit_id in unit_ids], dtype=np.int64)
+        unit_index = unit_positions[np.asarray(unit_codes, dtype=np.int64)]
+        option_ids = np.asarray(option_ids)
+        option_index = np.searchsorted(self.option_ids, option_ids)
+        start_year_index = self.get_start_year_indexes(modelyear_ids)
+        suffix_index = self.key_suffixes.get(key_suffix, -1)
+
+        found = (unit_index >= 0) & np.isin(option_ids, self.option_ids) & (suffix_index >= 0)
+        found[found] = self.found[unit_index[found], option_index[found], start_year_index[found], suffix_index]
+        if not found.all():
+            position = np.flatnonzero(~found)[0]
+            print(f'\nNo entry for unit {unit_ids[int(np.asarray(unit_codes)[position])]}, option '
+                  f'{option_ids[position]}, model year {np.asarray(modelyear_ids)[position]} and {key_suffix}.')
+            sys.exit()
+
+        return self.values[value_name][unit_index, option_index, start_year_index, suffix_index]
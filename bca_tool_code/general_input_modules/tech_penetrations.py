@@ -59,6 +59,7 @@ import pandas as pd
 
 from bca_tool_code.general_input_modules.general_functions import read_input_file
 from bca_tool_code.general_input_modules.input_files import InputFiles
+from bca_tool_code.general_input_modules.start_year_lookup import StartYearLookup
 
 
 class TechPenetrations:
@@ -70,6 +71,7 @@ class TechPenetrations:
     def __init__(self):
         self._dict = dict()
         self.start_years = list()
+        self.start_year_lookup = StartYearLookup()
         self.value_name = 'techpen'
         self.unit_id = None
 
@@ -127,6 +129,7 @@ class TechPenetrations:
         df.set_index(key, inplace=True)
 
         self._dict = df.to_dict('index')
+        self.start_year_lookup.init_from_dict(self._dict, self.value_name)
 
         # update input_files_pathlist if this class is used
         InputFiles.update_pathlist(filepath)
@@ -146,6 +149,23 @@ class TechPenetrations:
         if self.unit_id == 'vehicle_id':
             unit_id = vehicle.vehicle_id
         option_id, modelyear_id = vehicle.option_id, vehicle.modelyear_id
-        year = max([int(year) for year in self.start_years if int(year) <= modelyear_id])
+        year = self.start_year_lookup.get_start_year(modelyear_id)
 
         return self._dict[unit_id, option_id, year, standardyear_id][self.value_name]
+
+    def get_values(self, unit_ids, unit_codes, option_ids, modelyear_ids, standardyear_id):
+        """
+
+        Parameters:
+            unit_ids: list; the unique engine_ids or vehicle_ids, consistent with the unit_id of the input file.\n
+            unit_codes: array-like; the position, within unit_ids, of the unit_id of each value sought.\n
+            option_ids: array-like; option_ids, one per unit_code.\n
+            modelyear_ids: array-like; model years, one per unit_code.\n
+            standardyear_id: int; the year in which a new standard starts.
+
+        Returns:
+            An array of the tech penetration values for each unit_id, option_id and model year.
+
+        """
+        return self.start_year_lookup.get_values(self.value_name, unit_ids, unit_codes, option_ids, modelyear_ids,
+                                                 standardyear_id)
@@ -56,6 +56,7 @@ import numpy as np
 
 from bca_tool_code.general_input_modules.general_functions import read_input_file
 from bca_tool_code.general_input_modules.input_files import InputFiles
+from bca_tool_code.general_input_modules.start_year_lookup import StartYearLookup
 
 
 class UsefulLife:
@@ -67,6 +68,7 @@ class UsefulLife:
     def __init__(self):
         self._dict = dict()
         self.start_years = list()
+        self.start_year_lookup = StartYearLookup()
         self.value_name = 'period_value'
 
     def init_from_file(self, filepath):
@@ -94,6 +96,7 @@ class UsefulLife:
                      )
         df['start_year'] = pd.to_numeric(df['start_year'])
         self.start_years = df['start_year'].unique()
+        self.start_year_lookup.init_from_start_years(self.start_years)
 
         key = pd.Series(zip(
             zip(
@@ -122,10 +125,7 @@ class UsefulLife:
 
         """
         engine_id, option_id, my_id, period_id = key
-        if my_id == min(self.start_years):
-            year = my_id
-        else:
-            year = max([int(year) for year in self.start_years if int(year) <= my_id])
+        year = self.start_year_lookup.get_start_year(my_id)
         new_key = (engine_id, option_id, year, period_id)
 
         return self._dict[new_key][attribute_name]
@@ -2,6 +2,7 @@ import pandas as pd
 
 from bca_tool_code.general_input_modules.general_functions import read_input_file
 from bca_tool_code.general_input_modules.input_files import InputFiles
+from bca_tool_code.general_input_modules.start_year_lookup import StartYearLookup
 
 
 class WarrantyNewTechAdj:
@@ -15,6 +16,7 @@ class WarrantyNewTechAdj:
     def __init__(self):
         self._dict = dict()
         self.start_years = list()
+        self.start_year_lookup = StartYearLookup()
         self.value_name = 'factor'
 
     def init_from_file(self, filepath):
@@ -39,6 +41,7 @@ class WarrantyNewTechAdj:
                      )
         df['start_year'] = pd.to_numeric(df['start_year'])
         self.start_years = df['start_year'].unique()
+        self.start_year_lookup.init_from_start_years(self.start_years)
 
         key = pd.Series(
             zip(
@@ -67,10 +70,7 @@ class WarrantyNewTechAdj:
 
         """
         engine_id, option_id, my_id = vehicle.engine_id, vehicle.option_id, vehicle.modelyear_id
-        if my_id == min(self.start_years):
-            year = my_id
-        else:
-            year = max([int(year) for year in self.start_years if int(year) <= my_id])
+        year = self.start_year_lookup.get_start_year(my_id)
         new_key = (engine_id, option_id, year)
 
         return self._dict[new_key][self.value_name]
@@ -1,4 +1,7 @@
-import pandas as pd
+import numpy as np
+
+from bca_tool_code.general_modules.results_table import ResultsTable
+from bca_tool_code.general_modules.discounting import get_attribute_rate
 
 
 class AnnualSummary:
@@ -9,7 +12,7 @@ class AnnualSummary:
 
     """
     def __init__(self):
-        self.results = dict()
+        self.results = ResultsTable(('series', 'option_id', 'year_id', 'rate'), int_columns=('Periods',))
 
     def annual_summary(self, settings, data_object, options, year_ids):
         """
@@ -21,190 +24,117 @@ class AnnualSummary:
             year_ids: range; the min_year_id thru max_year_id as set in settings.
 
         Returns:
-            Updates the annual summary dictionary with annual, present and annualized values based on the data_object.
+            Updates the annual summary results with annual, present and annualized values based on the data_object.
 
         """
         print(f'\nCalculating Annual Values, Present Values and Annualized Values...')
 
-        source_dict = data_object.results
+        source_table = data_object.results
         num_option_ids = len(options._dict)
 
-        costs_start = settings.general_inputs.get_attribute_value('costs_start')
-        discount_to_year = pd.to_numeric(settings.general_inputs.get_attribute_value('discount_to_yearID'))
-        discount_offset = 0
-        annualized_offset = 1
-        if costs_start == 'end-year':
-            discount_offset = 1
-            annualized_offset = 0
+        discount_tables = settings.discount_tables
 
         # get cost attributes but only totals, per vehicle or mile costs are not relevant here
-        nested_dict = [n_dict for key, n_dict in source_dict.items()][0]
-        all_costs = tuple([k for k, v in nested_dict.items() if 'Cost' in k and 'Per' not in k])
-        emission_cost_args_25 = tuple([item for item in all_costs if '_0.025' in item])
-        emission_cost_args_3 = tuple([item for item in all_costs if '_0.03' in item])
-        emission_cost_args_5 = tuple([item for item in all_costs if '_0.05' in item])
-        emission_cost_args_7 = tuple([item for item in all_costs if '_0.07' in item])
-        non_emission_cost_args = tuple([item for item in all_costs if '_0.0' not in item])
+        all_costs = tuple([k for k in source_table.column_names if 'Cost' in k and 'Per' not in k])
+
+        social_rates = discount_tables.social_rates
 
-        social_rates = tuple([settings.general_inputs.get_attribute_value('social_discount_rate_1'),
-                              settings.general_inputs.get_attribute_value('social_discount_rate_2')])
-        social_rates = tuple([pd.to_numeric(rate) for rate in social_rates])
+        option_ids = range(0, num_option_ids)
+        year_array = np.array(year_ids)
+        periods = discount_tables.get_periods(year_array)
 
-        # build the destination dictionary to house data
+        # sum each cost arg by option_id and year_id in one grouped reduction; the result is option x year x arg
+        source_option_ids = source_table.get_column('optionID')
+        source_year_ids = source_table.get_column('yearID')
+        rows = (source_option_ids >= 0) & (source_option_ids < num_option_ids) \
+               & (source_year_ids >= year_array[0]) & (source_year_ids <= year_array[-1])
+        groups = source_option_ids[rows] * len(year_array) + source_year_ids[rows] - year_array[0]
+        values = np.column_stack([source_table.get_column(arg)[rows] for arg in all_costs])
+        annual_values = np.zeros((num_option_ids * len(year_array), len(all_costs)))
+        np.add.at(annual_values, groups, values)
+        annual_values = annual_values.reshape(num_option_ids, len(year_array), len(all_costs))
 
         # first undiscounted annual values
-        for option_id in range(0, num_option_ids):
-            rate = 0
-            series = 'AnnualValue'
-            for year_id in year_ids:
-                self.results.update({
-                    (series, option_id, year_id, rate): {
-                        'optionID': option_id,
-                        'optionName': options.get_option_name(option_id),
-                        'yearID': year_id,
-                        'DiscountRate': rate,
-                        'Series': series,
-                        'Periods': 1,
-                    }
-                }
-                )
-
-        # then for discounted values
+        for option_id in option_ids:
+            self.add_series_rows('AnnualValue', option_id, options.get_option_name(option_id), year_array, 0, 1,
+                                 all_costs, annual_values[option_id])
+
+        # then discounted annual values (the undiscounted sums times the year's discount factor), present values (a
+        # cumulative sum year-over-year of discounted annual values) and annualized values of those present values, for
+        # all social rates at once; the results are rate x option x year x arg
+        arg_rates = np.array([[get_attribute_rate(arg, social_rate) for arg in all_costs] for social_rate in social_rates])
+        arg_rates = arg_rates.reshape(len(social_rates), 1, 1, len(all_costs))
+        factor_year_ids = year_array.reshape(1, 1, -1, 1)
+        discount_factors = discount_tables.get_discount_factors(arg_rates, factor_year_ids)
+        annuity_factors = discount_tables.get_annuity_factors(arg_rates, factor_year_ids)
+        discounted_annual_values = annual_values * discount_factors
+        present_values = np.cumsum(discounted_annual_values, axis=2)
+        annualized_values = present_values * annuity_factors
+        discounted_values = {
+            'AnnualValue': (discounted_annual_values, 1),
+            'PresentValue': (present_values, periods),
+            'AnnualizedValue': (annualized_values, periods),
+        }
+
         for series in ('AnnualValue', 'PresentValue', 'AnnualizedValue'):
-            for option_id in range(0, num_option_ids):
-                for social_rate in social_rates:
-                    for year_id in year_ids:
-                        self.results.update({
-                            (series, option_id, year_id, social_rate): {
-                                'optionID': option_id,
-                                'optionName': options.get_option_name(option_id),
-                                'yearID': year_id,
-                                'DiscountRate': social_rate,
-                                'Series': series,
-                                'Periods': 1,
-                            }
-                        }
-                        )
-
-        # first sum by year for each cost arg
-        series = 'AnnualValue'
-        for option_id in range(0, num_option_ids):
-            for social_rate in (0, *social_rates):
-                for year_id in year_ids:
-                    temp_dict = {k: v for k, v in source_dict.items()
-                                 if v['yearID'] == year_id
-                                 and v['DiscountRate'] == social_rate
-                                 and v['optionID'] == option_id}
-                    for arg in all_costs:
-                        arg_sum = sum(v[arg] for k, v in temp_dict.items())
-                        self.results[(series, option_id, year_id, social_rate)][arg] = arg_sum
-
-        # now do a cumulative sum year-over-year for each cost arg - these will be present values
-        # (note change to destination_dict in arg_value calc and removal of rate=0)
-        series = 'PresentValue'
-        for option_id in range(0, num_option_ids):
-            for social_rate in social_rates:
-                for arg in all_costs:
-                    for year_id in year_ids:
-                        periods = year_id - discount_to_year + discount_offset
-                        if (series, option_id, year_id - 1, social_rate) not in self.results:
-                            arg_value = self.results[('AnnualValue', option_id, year_id, social_rate)][arg]
-                        else:
-                            arg_value = self.results[(series, option_id, year_id - 1, social_rate)][arg]
-                            arg_value += self.results[('AnnualValue', option_id, year_id, social_rate)][arg]
-                        self.results[(series, option_id, year_id, social_rate)][arg] = arg_value
-                        self.results[(series, option_id, year_id, social_rate)]['Periods'] = periods
-
-        # now annualize those present values
-        series = 'AnnualizedValue'
-        for option_id in range(0, num_option_ids):
-            for social_rate in social_rates:
-                for arg in non_emission_cost_args:
-                    for year_id in year_ids:
-                        periods = year_id - discount_to_year + discount_offset
-                        present_value = self.results['PresentValue', option_id, year_id, social_rate][arg]
-                        arg_annualized = self.calc_annualized_value(present_value, social_rate, periods, annualized_offset)
-                        self.results[(series, option_id, year_id, social_rate)][arg] = arg_annualized
-                        self.results[(series, option_id, year_id, social_rate)]['Periods'] = periods
-
-                emission_rate = 0.025
-                for arg in emission_cost_args_25:
-                    for year_id in year_ids:
-                        periods = year_id - discount_to_year + discount_offset
-                        present_value = self.results['PresentValue', option_id, year_id, social_rate][arg]
-                        arg_annualized = self.calc_annualized_value(present_value, emission_rate, periods, annualized_offset)
-                        self.results[(series, option_id, year_id, social_rate)][arg] = arg_annualized
-
-                emission_rate = 0.03
-                for arg in emission_cost_args_3:
-                    for year_id in year_ids:
-                        periods = year_id - discount_to_year + discount_offset
-                        present_value = self.results['PresentValue', option_id, year_id, social_rate][arg]
-                        arg_annualized = self.calc_annualized_value(present_value, emission_rate, periods, annualized_offset)
-                        self.results[(series, option_id, year_id, social_rate)][arg] = arg_annualized
-
-                emission_rate = 0.05
-                for arg in emission_cost_args_5:
-                    for year_id in year_ids:
-                        periods = year_id - discount_to_year + discount_offset
-                        present_value = self.results['PresentValue', option_id, year_id, social_rate][arg]
-                        arg_annualized = self.calc_annualized_value(present_value, emission_rate, periods, annualized_offset)
-                        self.results[(series, option_id, year_id, social_rate)][arg] = arg_annualized
-
-                emission_rate = 0.07
-                for arg in emission_cost_args_7:
-                    for year_id in year_ids:
-                        periods = year_id - discount_to_year + discount_offset
-                        present_value = self.results['PresentValue', option_id, year_id, social_rate][arg]
-                        arg_annualized = self.calc_annualized_value(present_value, emission_rate, periods, annualized_offset)
-                        self.results[(series, option_id, year_id, social_rate)][arg] = arg_annualized
+            series_values, series_periods = discounted_values[series]
+            for option_id in option_ids:
+                for rate_index, social_rate in enumerate(social_rates):
+                    self.add_series_rows(series, option_id, options.get_option_name(option_id), year_array, social_rate,
+                                         series_periods, all_costs, series_values[rate_index, option_id])
 
-    def get_attribute_value(self, key, attribute_name):
+    def add_series_rows(self, series, option_id, option_name, year_ids, rate, periods, args, values):
         """
 
         Parameters:
-            key: tuple; (series, option_id, year_id, rate), where series is 'AnnualValue', 'PresentValue' or 'AnnualizedValue'.\n
-            attribute_name: str; the attribute for which the value is sought.
+            series: str; 'AnnualValue', 'PresentValue' or 'AnnualizedValue'.\n
+            option_id: int; the option_id.\n
+            option_name: str; the option name.\n
+            year_ids: array; the calendar years.\n
+            rate: Numeric; the discount rate.\n
+            periods: int or array; the number of periods of each year_id.\n
+            args: tuple; the cost attributes.\n
+            values: array; year x arg values of the cost attributes.
 
         Returns:
-            The value associated with the attribute for the given key.
+            Nothing, but adds one row per year_id to the results table.
 
         """
-        return self.results[key][attribute_name]
+        update_dict = {
+            'optionID': option_id,
+            'optionName': option_name,
+            'yearID': year_ids,
+            'DiscountRate': rate,
+            'Series': series,
+            'Periods': periods,
+        }
+        for index, arg in enumerate(args):
+            update_dict[arg] = values[:, index]
+        keys = [(series, option_id, year_id, rate) for year_id in year_ids.tolist()]
+        self.results.add_rows(keys, update_dict)
 
-    def update_object_dict(self, key, update_dict):
+    def get_attribute_value(self, key, attribute_name):
         """
 
         Parameters:
-            key: tuple; ((vehicle_id), option_id, modelyear_id, age_id, discount_rate).\n
-            update_dict: Dictionary; represents the attribute-value pairs to be updated.
+            key: tuple; (series, option_id, year_id, rate), where series is 'AnnualValue', 'PresentValue' or 'AnnualizedValue'.\n
+            attribute_name: str; the attribute for which the value is sought.
 
         Returns:
-            Updates the object dictionary with each attribute updated with the appropriate value.
+            The value associated with the attribute for the given key.
 
         """
-        if key in self.results:
-            for attribute_name, attribute_value in update_dict.items():
-                self.results[key][attribute_name] = attribute_value
+        return self.results.get_attribute_value(key, attribute_name)
 
-        else:
-            self.results.update({key: {}})
-            for attribute_name, attribute_value in update_dict.items():
-                self.results[key].update({attribute_name: attribute_value})
-
-    @staticmethod
-    def calc_annualized_value(present_value, rate, periods, annualized_offset):
+    def update_object_dict(self, key, update_dict):
         """
 
         Parameters:
-            present_value: Numeric; the present value to be annualized.\n
-            rate: Numeric; the discount rate to use.\n
-            periods: int; the number of periods over which to annualize present_value.\n
-            annualized_offset: int; 0 or 1 reflecting whether costs are assumed to occur at the start of the year or the end of the year.
+            key: tuple; ((vehicle_id), option_id, modelyear_id, age_id, discount_rate).\n
+            update_dict: Dictionary; represents the attribute-value pairs to be updated.
 
         Returns:
-            A single annualized value of present_value discounted at rate over periods number of year_ids.
+            Updates the object dictionary with each attribute updated with the appropriate value.
 
         """
-        return present_value * rate * (1 + rate) ** periods \
-               / ((1 + rate) ** (periods + annualized_offset) - 1)
+        self.results.update_object_dict(key, update_dict)
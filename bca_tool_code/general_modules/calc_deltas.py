@@ -1,3 +1,5 @@
+import sys
+import numpy as np
 
 
 def calc_deltas(settings, data_object, options):
@@ -10,84 +12,57 @@ def calc_deltas(settings, data_object, options):
         options: object; the options object associated with the data_object.
 
     Returns:
-        Updates the data_object dictionary with deltas relative to the no_action_alt. OptionIDs (numeric) for the deltas
+        Updates the data_object results with deltas relative to the no_action_alt. OptionIDs (numeric) for the deltas
         will be the alt_id followed by the no_action_alt. For example, deltas for optionID=1 relative to optionID=0 will
         have optionID=10. OptionNames will also show as 'OptionID=1_name minus OptionID=0_name'.
 
+    Note:
+        The data_object results must be a ResultsTable keyed with option_id as the second element of the key, i.e.,
+        (vehicle_id, option_id, modelyear_id, age_id, discount_rate) for the fleet or (series, option_id, year_id, rate)
+        for the annual summary. Each action row is aligned to the no action row with the same key other than option_id
+        and the deltas are calculated for all rows at once, one attribute at a time.
+
     """
     print('\nCalculating deltas...')
 
-    # Note: copy data_object results dictionary because that dictionary cannot be used in the loop that follows since
-    # it changes size in the loop which is a looping no-no.
-    dict_for_deltas = data_object.results.copy()
-
-    st = rc = ft = st_name = rc_name = ft_name = None
-    for key, value in dict_for_deltas.items():
-        vehicle_id = modelyear_id = age_id = year_id = series = None
-        fleet_object_flag = None
-        try:
-            # for fleet dictionary deltas
-            vehicle_id, option_id, modelyear_id, age_id, discount_rate = key
-            st, rc, ft = vehicle_id
-            st_name = dict_for_deltas[key]['sourceTypeName']
-            rc_name = dict_for_deltas[key]['regClassName']
-            ft_name = dict_for_deltas[key]['fuelTypeName']
-            fleet_object_flag = 1
-        except ValueError:
-            # for annual_summary dictionary deltas
-            series, option_id, year_id, discount_rate = key
-
-        args_to_delta = [k for k, v in value.items()
-                         if 'ID' not in k
-                         and 'Name' not in k
-                         and 'DiscountRate' not in k
-                         and 'Series' not in k
-                         and 'Periods' not in k]
-
-        if option_id != settings.no_action_alt:
-            delta_option_id = options.create_option_id(option_id, settings.no_action_alt)
-            delta_option_name = options.create_option_name(option_id, settings.no_action_alt)
-
-            # note that annual summary doesn't have vehicle_id data
-            if fleet_object_flag:
-                update_dict_key = (vehicle_id, delta_option_id, modelyear_id, age_id, discount_rate)
-                update_dict = {'DiscountRate': discount_rate,
-                               'yearID': modelyear_id + age_id,
-                               'sourceTypeID': st,
-                               'regClassID': rc,
-                               'fuelTypeID': ft,
-                               'optionID': delta_option_id,
-                               'modelYearID': modelyear_id,
-                               'ageID': age_id,
-                               'optionName': delta_option_name,
-                               'sourceTypeName': st_name,
-                               'regClassName': rc_name,
-                               'fuelTypeName': ft_name,
-                               }
-
-            else:
-                update_dict_key = (series, delta_option_id, year_id, discount_rate)
-                update_dict = {'optionID': delta_option_id,
-                               'optionName': delta_option_name,
-                               'yearID': year_id,
-                               'DiscountRate': discount_rate,
-                               'Series': series,
-                               'Periods': 1,
-                               }
-
-            for arg in args_to_delta:
-                if fleet_object_flag:
-                    no_action_arg_value = dict_for_deltas[(vehicle_id, settings.no_action_alt, modelyear_id, age_id, discount_rate)][arg]
-                else:
-                    # this works for annual summary
-                    no_action_arg_value = dict_for_deltas[(series, settings.no_action_alt, year_id, discount_rate)][arg]
-                    delta_periods = dict_for_deltas[(series, settings.no_action_alt, year_id, discount_rate)]['Periods']
-                    update_dict.update({'Periods': delta_periods})
-                action_arg_value = dict_for_deltas[key][arg]
-                delta_arg_value = action_arg_value - no_action_arg_value
-                update_dict.update({arg: delta_arg_value})
-
-            data_object.update_object_dict(update_dict_key, update_dict)
+    table = data_object.results
+    no_action_alt = settings.no_action_alt
+
+    option_ids = table.get_column('optionID').copy()
+    action_rows = np.flatnonzero(option_ids != no_action_alt)
+    action_key_codes = table.get_key_codes(action_rows)
+    no_action_rows = table.find_rows(table.replace_key_element(action_key_codes, 1, no_action_alt))
+    if (no_action_rows < 0).any():
+        key = table.get_keys(action_rows[np.flatnonzero(no_action_rows < 0)[:1]])[0]
+        print(f'\nNo action data not found for {key} when calculating deltas.')
+        sys.exit()
+
+    delta_option_ids = dict()
+    delta_option_names = dict()
+    for option_id in np.unique(option_ids[action_rows]).tolist():
+        delta_option_ids[option_id] = options.create_option_id(option_id, no_action_alt)
+        delta_option_names[option_id] = options.create_option_name(option_id, no_action_alt)
+
+    args_to_delta = [k for k in table.column_names
+                     if 'ID' not in k
+                     and 'Name' not in k
+                     and 'DiscountRate' not in k
+                     and 'Series' not in k
+                     and 'Periods' not in k]
+
+    action_option_ids = option_ids[action_rows].tolist()
+    update_dict = {
+        'optionID': np.array([delta_option_ids[option_id] for option_id in action_option_ids], dtype=np.int64),
+        'optionName': [delta_option_names[option_id] for option_id in action_option_ids],
+    }
+    if 'Periods' in table.column_names:
+        update_dict['Periods'] = table.get_column('Periods')[no_action_rows]
+    for arg in args_to_delta:
+        values = table.get_column(arg)
+        update_dict[arg] = values[action_rows] - values[no_action_rows]
+
+    delta_key_codes = table.replace_key_element(action_key_codes, 1, update_dict['optionID'])
+    table.copy_rows(action_rows, delta_key_codes, update_dict)
 
 
 def calc_deltas_weighted(settings, dict_for_deltas, options):
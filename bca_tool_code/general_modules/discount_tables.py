@@ -0,0 +1,213 @@
+import re
+import sys
+import numpy as np
+
+
+class DiscountTables:
+    """
+
+    The DiscountTables class holds rate x year arrays of the discount factors and annuity factors for each discount
+    rate in use (i.e., 0, the social discount rates and the emission cost discount rates), along with the number of
+    periods of each year.
+
+    Note:
+        A value in a year is discounted by multiplying it by the discount factor for its rate and year, i.e.,
+        1 / (1 + rate) ** periods; a present value through a year is annualized by multiplying it by the annuity factor
+        for its rate and year, i.e., rate * (1 + rate) ** periods / ((1 + rate) ** (periods + annualized_offset) - 1).
+        Rates not yet in the arrays (e.g., an emission cost rate found in an attribute name) are added as they are
+        requested.
+
+    """
+    emission_rates = (0.025, 0.03, 0.05, 0.07)  # the emission cost discount rates included by default
+
+    def __init__(self):
+        self.social_rates = list()
+        self.rates = list()
+        self.rate_index = dict()
+        self.year_id_min = None
+        self.year_ids = np.zeros(0, dtype=np.int64)
+        self.discount_to_year = None
+        self.discount_offset = 0
+        self.annualized_offset = 1
+        self.periods = np.zeros(0, dtype=np.int64)
+        self.discount_factors = np.zeros((0, 0))
+        self.annuity_factors = np.zeros((0, 0))
+
+    def init_from_general_inputs(self, general_inputs, year_ids):
+        """
+
+        Parameters:
+            general_inputs: object; the GeneralInputs class object.\n
+            year_ids: range; the calendar years for which factors are needed.
+
+        Returns:
+            Nothing, but builds the discount and annuity factor arrays for the social discount rates set in the general
+            inputs and for the emission cost discount rates.
+
+        Note:
+            The costs_start entry of the BCA_General_Inputs file should be set to 'start-year' or 'end-year', where
+            start-year represents costs starting at time t=0 (i.e., first year costs are undiscounted), and end-year
+            represents costs starting at time t=1 (i.e., first year costs are discounted).
+
+        """
+        costs_start = general_inputs.get_attribute_value('costs_start')
+        self.discount_to_year = general_inputs.config.discount_to_yearID
+        if costs_start == 'end-year':
+            self.discount_offset = 1
+            self.annualized_offset = 0
+        else:
+            self.discount_offset = 0
+            self.annualized_offset = 1
+            if costs_start != 'start-year':
+                print('costs_start entry in General Inputs file not set properly.')
+
+        self.social_rates = self.get_social_rates(general_inputs)
+
+        self.year_id_min = min(year_ids)
+        self.year_ids = np.arange(self.year_id_min, max(year_ids) + 1)
+        self.periods = self.year_ids - self.discount_to_year + self.discount_offset
+
+        self.rates = list()
+        self.rate_index = dict()
+        self.discount_factors = np.zeros((0, len(self.year_ids)))
+        self.annuity_factors = np.zeros((0, len(self.year_ids)))
+        self.add_rates([0, *self.social_rates, *self.emission_rates])
+
+    @staticmethod
+    def get_social_rates(general_inputs):
+        """
+
+        Parameters:
+            general_inputs: object; the GeneralInputs class object.
+
+        Returns:
+            A list of the social discount rates, in the order entered, from the social_discount_rates entry (e.g.,
+            "0.03, 0.07, 0.02") or, if there is no such entry, from the social_discount_rate_1, social_discount_rate_2,
+            etc., entries.
+
+        """
+        if 'social_discount_rates' in general_inputs._dict:
+            rates = general_inputs.config.social_discount_rates
+        else:
+            numbered = list()
+            for attribute_name in general_inputs._dict:
+                match = re.fullmatch(r'social_discount_rate_(\d+)', attribute_name)
+                if match:
+                    numbered.append((int(match.group(1)), getattr(general_inputs.config, attribute_name)))
+            rates = [rate for number, rate in sorted(numbered)]
+
+        return list(dict.fromkeys(rate for rate in rates if rate != 0))
+
+    def add_rates(self, rates):
+        """
+
+        Parameters:
+            rates: List; the discount rates to add.
+
+        Returns:
+            Nothing, but adds a row of discount and annuity factors for each rate not already in the arrays.
+
+        """
+        new_rates = [rate for rate in dict.fromkeys(rates) if rate not in self.rate_index]
+        if not new_rates:
+            return
+
+        rate_array = np.array(new_rates, dtype=float).reshape(-1, 1)
+        periods = self.periods.reshape(1, -1)
+        discount_factors = 1 / (1 + rate_array) ** periods
+        with np.errstate(divide='ignore', invalid='ignore'):
+            annuity_factors = rate_array * (1 + rate_array) ** periods \
+                              / ((1 + rate_array) ** (periods + self.annualized_offset) - 1)
+
+        for rate in new_rates:
+            self.rate_index[rate] = len(self.rates)
+            self.rates.append(rate)
+        self.discount_factors = np.vstack([self.discount_factors, discount_factors])
+        self.annuity_factors = np.vstack([self.annuity_factors, annuity_factors])
+
+    def get_rate_index(self, rates):
+        """
+
+        Parameters:
+            rates: Numeric or array; the discount rates.
+
+        Returns:
+            The row index (or array of indexes) of the rates in the factor arrays, adding any rates not yet included.
+
+        """
+        rate_array = np.asarray(rates, dtype=float)
+        self.add_rates(np.unique(rate_array).tolist())
+        if not rate_array.ndim:
+            return self.rate_index[float(rate_array)]
+
+        unique_rates, inverse = np.unique(rate_array, return_inverse=True)
+        indexes = np.array([self.rate_index[rate] for rate in unique_rates.tolist()], dtype=np.int64)
+
+        return indexes[inverse].reshape(rate_array.shape)
+
+    def get_year_index(self, year_ids):
+        """
+
+        Parameters:
+            year_ids: int or array; the calendar years.
+
+        Returns:
+            The column index (or array of indexes) of the year_ids in the factor arrays.
+
+        Note:
+            If any of the year_ids is outside the years of the factor arrays, the code issues an exit command and stops.
+
+        """
+        year_ids = np.asarray(year_ids)
+        year_index = year_ids - self.year_id_min
+        out_of_range = (year_index < 0) | (year_index >= len(self.year_ids))
+        if out_of_range.any():
+            print(f'\nDiscount factors cover calendar years {self.year_id_min} through {self.year_ids[-1]}; factors for '
+                  f'{sorted(set(np.atleast_1d(year_ids[out_of_range]).tolist()))} were sought.')
+            sys.exit()
+
+        return year_index
+
+    def get_periods(self, year_ids):
+        """
+
+        Parameters:
+            year_ids: int or array; the calendar years.
+
+        Returns:
+            The number of periods (or array of periods) from the discount_to year through the year_ids.
+
+        """
+        return self.periods[self.get_year_index(year_ids)]
+
+    def get_discount_factors(self, rates, year_ids):
+        """
+
+        Parameters:
+            rates: Numeric or array; the discount rate(s).\n
+            year_ids: int or array; the calendar years.
+
+        Returns:
+            The discount factor (or array of factors, broadcast over rates and year_ids) for the rates and year_ids; 1
+            where the rate is 0.
+
+        """
+        rate_index = self.get_rate_index(rates)  # first, as rates not yet included are added to the arrays
+
+        return self.discount_factors[rate_index, self.get_year_index(year_ids)]
+
+    def get_annuity_factors(self, rates, year_ids):
+        """
+
+        Parameters:
+            rates: Numeric or array; the discount rate(s).\n
+            year_ids: int or array; the calendar years.
+
+        Returns:
+            The annuity factor (or array of factors, broadcast over rates and year_ids) that annualizes a present value
+            through the year_ids at the rates.
+
+        """
+        rate_index = self.get_rate_index(rates)  # first, as rates not yet included are added to the arrays
+
+        return self.annuity_factors[rate_index, self.get_year_index(year_ids)]
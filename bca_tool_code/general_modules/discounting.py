@@ -1,97 +1,164 @@
+import re
+import numpy as np
 import pandas as pd
 
 
 def discount_values(settings, data_object):
     """
 
-    The discount function determines metrics appropriate for discounting (those contained in data_object dictionary)
-    and does the discounting calculation to a given year and point within that year.
+    The discount function determines metrics appropriate for discounting (those contained in data_object results)
+    and sets up the discounting calculation using the discount factors of settings.discount_tables.
 
     Parameters:
         settings: object; the SetInputs class object.\n
         data_object: object; the fleet data object.
 
     Returns:
-        Updates the data_object dictionary with new key, value pairs where keys stipulate the discount rate and
-        monetized values are discounted at the same rate as the discount rate of the input stream of values.
-
-    Note:
-        The costs_start entry of the BCA_General_Inputs file should be set to 'start-year' or 'end-year', where
-        start-year represents costs starting at time t=0 (i.e., first year costs are undiscounted), and end-year
-        represents costs starting at time t=1 (i.e., first year costs are discounted).
+        A DiscountedResults object that provides the data_object results at each social discount rate, where monetized
+        values are discounted at the discount rate of the row; emission costs are discounted at the rate in their
+        attribute name.
 
     """
     print(f'\nDiscounting values...')
 
-    # get cost attributes
-    nested_dict = [n_dict for key, n_dict in data_object.results.items()][0]
-    all_costs = tuple([k for k, v in nested_dict.items() if 'Cost' in k])
-    emission_cost_args_25 = tuple([item for item in all_costs if '_0.025' in item])
-    emission_cost_args_3 = tuple([item for item in all_costs if '_0.03' in item])
-    emission_cost_args_5 = tuple([item for item in all_costs if '_0.05' in item])
-    emission_cost_args_7 = tuple([item for item in all_costs if '_0.07' in item])
-    non_emission_cost_args = tuple([item for item in all_costs if '_0.0' not in item])
-
-    costs_start = settings.general_inputs.get_attribute_value('costs_start')
-    discount_to_year = pd.to_numeric(settings.general_inputs.get_attribute_value('discount_to_yearID'))
-    discount_offset = 0
-    if costs_start == 'end-year':
-        discount_offset = 1
-    else:
-        print('costs_start entry in General Inputs file not set properly.')
-
-    # Note: there is no need to discount values where the discount rate is 0
-    non0_dr_keys = [k for k, v in data_object.results.items() if v['DiscountRate'] != 0]
-    for key in non0_dr_keys:
-        vehicle_id, option_id, modelyear_id, age_id, rate = key
-        year = modelyear_id + age_id
-
-        update_dict = dict()
-
-        for arg in non_emission_cost_args:
-            arg_value = data_object.results[key][arg]
-            arg_value_discounted = discount_value(arg_value, rate, year, discount_to_year, discount_offset)
-            update_dict[arg] = arg_value_discounted
-
-        emission_rate = 0.025
-        for arg in emission_cost_args_25:
-            arg_value = data_object.results[key][arg]
-            arg_value_discounted = discount_value(arg_value, emission_rate, year, discount_to_year, discount_offset)
-            update_dict[arg] = arg_value_discounted
-
-        emission_rate = 0.03
-        for arg in emission_cost_args_3:
-            arg_value = data_object.results[key][arg]
-            arg_value_discounted = discount_value(arg_value, emission_rate, year, discount_to_year, discount_offset)
-            update_dict[arg] = arg_value_discounted
-
-        emission_rate = 0.05
-        for arg in emission_cost_args_5:
-            arg_value = data_object.results[key][arg]
-            arg_value_discounted = discount_value(arg_value, emission_rate, year, discount_to_year, discount_offset)
-            update_dict[arg] = arg_value_discounted
-
-        emission_rate = 0.07
-        for arg in emission_cost_args_7:
-            arg_value = data_object.results[key][arg]
-            arg_value_discounted = discount_value(arg_value, emission_rate, year, discount_to_year, discount_offset)
-            update_dict[arg] = arg_value_discounted
-
-        data_object.update_object_dict(key, update_dict)
+    discount_tables = settings.discount_tables
+
+    return DiscountedResults(data_object.results, discount_tables.social_rates, discount_tables)
+
+
+def get_attribute_rate(attribute_name, rate):
+    """
+
+    Parameters:
+        attribute_name: str; the attribute to be discounted.\n
+        rate: Numeric; the social discount rate of the row.
+
+    Returns:
+        The rate at which to discount the attribute, i.e., 0 for undiscounted rows, the rate in the attribute name for
+        emission costs (e.g., 0.03 for 'NOxCost_tailpipe_0.03' or 'GHGCost_tailpipe_0.03_95') or the social discount
+        rate otherwise.
+
+    """
+    if rate == 0:
+        return 0
+    match = re.search(r'_(\d*\.\d+)', attribute_name)
+    if match:
+        return float(match.group(1))
+
+    return rate
+
+
+class DiscountedResults:
+    """
+
+    The DiscountedResults class provides the undiscounted (rate 0) rows of a ResultsTable at each social discount rate
+    without storing discounted copies; monetized values (attributes containing 'Cost') are discounted as they are
+    requested, as the undiscounted value times the factor for the row's year and rate.
+
+    """
+    def __init__(self, results, rates, discount_tables):
+        self.results = results
+        self.rates = rates
+        self.discount_tables = discount_tables
+
+    def get_cost_attributes(self):
+        """
+
+        Returns:
+            A list of the monetized attributes, i.e., those to be discounted.
+
+        """
+        return [attribute_name for attribute_name in self.results.column_names if 'Cost' in attribute_name]
+
+    def get_factors(self, attribute_name, rate, year_ids):
+        """
+
+        Parameters:
+            attribute_name: str; the attribute to be discounted.\n
+            rate: Numeric; the social discount rate.\n
+            year_ids: int or array; the calendar years.
+
+        Returns:
+            The discount factor (or array of factors) applicable to the attribute in the year_ids at the rate.
+
+        """
+        return self.discount_tables.get_discount_factors(get_attribute_rate(attribute_name, rate), year_ids)
+
+    def get_column(self, attribute_name, rate):
+        """
+
+        Parameters:
+            attribute_name: str; the attribute sought.\n
+            rate: Numeric; the social discount rate.
+
+        Returns:
+            An array of the attribute values for every row discounted at the rate.
+
+        """
+        values = self.results.get_column(attribute_name)
+        if rate == 0 or 'Cost' not in attribute_name:
+            return values
+        year_ids = self.results.get_column('modelYearID') + self.results.get_column('ageID')
+
+        return values * self.get_factors(attribute_name, rate, year_ids)
+
+    def get_attribute_value(self, key, attribute_name):
+        """
+
+        Parameters:
+            key: tuple; the row key with the discount rate as its last element.\n
+            attribute_name: str; the attribute name for which a value is sought.
+
+        Returns:
+            The attribute value associated with attribute_name for the given key.
+
+        """
+        *row_key, rate = key
+        row = self.results.get_row_index((*row_key, 0), required=True)
+        value = self.results.get_value(row, attribute_name)
+        if attribute_name == 'DiscountRate':
+            return rate
+        if rate == 0 or 'Cost' not in attribute_name:
+            return value
+        year_id = self.results.get_value(row, 'modelYearID') + self.results.get_value(row, 'ageID')
+
+        return value * self.get_factors(attribute_name, rate, year_id)
+
+    def to_dataframe(self):
+        """
+
+        Returns:
+            A DataFrame of the undiscounted rows followed by the rows at each social discount rate.
+
+        """
+        df = self.results.to_dataframe()
+        year_ids = df['modelYearID'].to_numpy() + df['ageID'].to_numpy()
+        cost_attributes = self.get_cost_attributes()
+        cost_values = df[cost_attributes].to_numpy(dtype=float)
+        frames = [df]
+        for rate in self.rates:
+            attribute_rates = np.array([get_attribute_rate(attribute_name, rate) for attribute_name in cost_attributes])
+            factors = self.discount_tables.get_discount_factors(attribute_rates.reshape(1, -1), year_ids.reshape(-1, 1))
+            df_rate = df.copy()
+            df_rate['DiscountRate'] = rate
+            df_rate[cost_attributes] = cost_values * factors
+            frames.append(df_rate)
+
+        return pd.concat(frames, axis=0, ignore_index=True)
 
 
 def discount_value(arg_value, rate, year, discount_to, offset):
     """
 
     Parameters:
-        arg_value: Numeric; the value to be discounted.\n
-        rate: Numeric; the discount rate to use.\n
-        year: int; the calendar year associated with arg_value.\n
+        arg_value: Numeric or array; the value(s) to be discounted.\n
+        rate: Numeric or array; the discount rate to use.\n
+        year: int or array; the calendar year associated with arg_value.\n
         discount_to: int; the calendar year to which to discount the value.\n
         offset: int; 0 or 1 reflecting whether costs are assumed to occur at the start of the year or the end of the year.
 
     Returns:
-        A single value representing arg_value discounted to the year discount_to at rate.
+        A single value (or array) representing arg_value discounted to the year discount_to at rate.
 
     """
     return arg_value / ((1 + rate) ** (year - discount_to + offset))
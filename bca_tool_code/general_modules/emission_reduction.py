@@ -1,30 +1,45 @@
+import sys
+
+
+def get_fleet_row(settings, vehicle):
+    """
+
+    Parameters:
+        settings: object; the SetInputs class object. \n
+        vehicle: object; an object of the Vehicle class or a VehicleView of the fleet table.
+
+    Returns:
+        The fleet table row of the passed vehicle; a VehicleView carries its row, other vehicle objects are found by
+        their vehicle_id, option_id, modelyear_id and age_id.
+
+    """
+    if hasattr(vehicle, 'row'):
+        return vehicle.row
+    rows = settings.fleet.table.find_rows(vehicle.vehicle_id, vehicle.option_id, vehicle.modelyear_id, vehicle.age_id)
+    if not len(rows):
+        print(f'\nVehicle {vehicle.vehicle_id}, optionID {vehicle.option_id}, modelYearID {vehicle.modelyear_id} and '
+              f'ageID {vehicle.age_id} is not in the fleet.')
+        sys.exit()
+
+    return rows[0]
+
 
 def calc_nox_reduction(settings, vehicle):
     """
 
     Parameters:
         settings: object; the SetInputs class object. \n
-        vehicle: object; an object of the Vehicle class.
+        vehicle: object; an object of the Vehicle class or a VehicleView of the fleet table.
 
     Returns:
         The NOx reduction for the passed vehicle.
 
     Note:
         The nox_reduction calculation should be done such that it is positive if action has lower nox than no action.
+        Reductions for the whole fleet are calculated once, aligned to the no-action rows, by the fleet table.
 
     """
-    if vehicle.option_id == settings.no_action_alt:
-        nox_reduction = 0
-    else:
-        nox_no_action = [v.nox_ustons for v in settings.fleet.vehicles_no_action
-                         if v.vehicle_id == vehicle.vehicle_id
-                         and v.option_id == settings.no_action_alt
-                         and v.modelyear_id == vehicle.modelyear_id
-                         and v.age_id == vehicle.age_id][0]
-        nox_action = vehicle.nox_ustons
-        nox_reduction = nox_no_action - nox_action
-
-    return nox_reduction
+    return settings.fleet.table.get_reductions('nox_ustons')[get_fleet_row(settings, vehicle)]
 
 
 def calc_thc_reduction(settings, vehicle):
@@ -32,24 +47,14 @@ def calc_thc_reduction(settings, vehicle):
 
     Parameters:
         settings: object; the SetInputs class object. \n
-        vehicle: object; an object of the Vehicle class.
+        vehicle: object; an object of the Vehicle class or a VehicleView of the fleet table.
 
     Returns:
         The THC reduction for the given vehicle object.
 
     Note:
         The thc_reduction calculation should be done such that it is positive if action has lower thc than no action.
+        Reductions for the whole fleet are calculated once, aligned to the no-action rows, by the fleet table.
 
     """
-    if vehicle.option_id == settings.no_action_alt:
-        thc_reduction = 0
-    else:
-        thc_no_action = [v.thc_ustons for v in settings.fleet.vehicles_no_action
-                         if v.vehicle_id == vehicle.vehicle_id
-                         and v.option_id == settings.no_action_alt
-                         and v.modelyear_id == vehicle.modelyear_id
-                         and v.age_id == vehicle.age_id][0]
-        thc_action = vehicle.thc_ustons
-        thc_reduction = thc_no_action - thc_action
-
-    return thc_reduction
+    return settings.fleet.table.get_reductions('thc_ustons')[get_fleet_row(settings, vehicle)]
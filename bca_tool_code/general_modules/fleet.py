@@ -1,12 +1,17 @@
 from sys import exit
+import numpy as np
 
 from bca_tool_code.general_modules.vehicle import Vehicle
+from bca_tool_code.general_modules.fleet_table import FleetTable, VehicleView
+from bca_tool_code.general_modules.shared_arrays import SharedArrays
 
 
 class Fleet:
 
     def __init__(self):
         self.sales_by_start_year = dict() # stores sales and cumulative sales per implementation start year
+        self.table = FleetTable()
+        self.shared_arrays = None  # the shared memory block holding the fleet table arrays, if shared
         self.vehicles = list()
         self.vehicles_age0 = list()
         self.vehicles_ft2 = list()
@@ -21,72 +26,110 @@ class Fleet:
             options: object; an object of the Options class.
 
         Returns:
-            Nothing but it creates vehicle objects and lists of vehicle objects.
-
-        """
-        print('Creating vehicle objects...')
-        for index, row in Vehicle.vehicle_df.iterrows():
-            vehicle = Vehicle()
-            vehicle.year_id = int(row['year_id'])
-            vehicle.sourcetype_id = int(row['sourcetype_id'])
-            vehicle.sourcetype_name = vehicle.get_sourcetype_name()
-            vehicle.regclass_id = int(row['regclass_id'])
-            vehicle.regclass_name = vehicle.get_regclass_name()
-            vehicle.fueltype_id = int(row['fueltype_id'])
-            vehicle.fueltype_name = vehicle.get_fueltype_name()
-            vehicle.modelyear_id = int(row['modelyear_id'])
-            vehicle.age_id = int(row['age_id'])
-            vehicle.option_id = int(row['option_id'])
-            vehicle.engine_id = vehicle.set_engine_id()
-            vehicle.vehicle_id = vehicle.set_vehicle_id()
-            vehicle.option_name = options.get_option_name(vehicle.option_id)
-            vehicle.thc_ustons = row['thc_ustons']
-            vehicle.co_ustons = row['co_ustons']
-            vehicle.nox_ustons = row['nox_ustons']
-            vehicle.pm25_exhaust_ustons = row['pm25_exhaust_ustons']
-            vehicle.pm25_brakewear_ustons = row['pm25_brakewear_ustons']
-            vehicle.pm25_tirewear_ustons = row['pm25_tirewear_ustons']
-            vehicle.pm25_ustons = row['pm25_ustons']
-            vehicle.voc_ustons = row['voc_ustons']
-            vehicle.vpop = row['vpop']
-            vehicle.vmt = row['vmt']
-            vehicle.vmt_per_veh = row['vmt_per_veh']
-            vehicle.odometer = row['odometer']
-            vehicle.gallons = row['gallons']
-
-            self.vehicles.append(vehicle)
-            if vehicle.age_id == 0:
-                self.vehicles_age0.append(vehicle)
-            if vehicle.fueltype_id == 2:
-                self.vehicles_ft2.append(vehicle)
-            if vehicle.option_id == no_action_alt:
-                self.vehicles_no_action.append(vehicle)
-
-    def engine_sales(self, vehicle):
+            Nothing but it creates the columnar fleet table and sequences of vehicle views into that table.
+
+        """
+        print('Creating fleet table...')
+        self.table.init_from_df(Vehicle.vehicle_df, no_action_alt, options)
+        self.create_vehicle_rows()
+
+    def create_vehicle_rows(self):
+        """
+
+        Returns:
+            Nothing, but it creates the sequences of vehicle views into the fleet table.
+
+        """
+        self.vehicles = self.table.rows()
+        self.vehicles_age0 = self.table.rows(self.table.age0_index)
+        self.vehicles_ft2 = self.table.rows(self.table.ft2_index)
+        self.vehicles_no_action = self.table.rows(self.table.no_action_index)
+
+    def share_vehicles(self):
+        """
+
+        Returns:
+            A dictionary of the shared memory specs, the table meta data and the Vehicle class attributes with which
+            other processes can attach to the fleet using attach_vehicles.
+
+        Note:
+            The fleet table arrays are moved into a shared memory block and the table then uses views of them; call
+            unshare_vehicles once other processes are done with them.
+
+        """
+        self.shared_arrays = SharedArrays()
+        self.table.set_arrays(self.shared_arrays.init_from_arrays(self.table.get_arrays()))
+        self.create_vehicle_rows()
+
+        return {
+            'specs': self.shared_arrays.get_specs(),
+            'table': self.table.get_meta(),
+            'vehicle': {'year_id_min': int(Vehicle.year_id_min), 'year_id_max': int(Vehicle.year_id_max)},
+        }
+
+    def unshare_vehicles(self):
+        """
+
+        Returns:
+            Nothing, but moves the fleet table arrays back out of the shared memory block and frees the block.
+
+        """
+        if self.shared_arrays is None:
+            return
+        self.table.set_arrays({name: array.copy() for name, array in self.table.get_arrays().items()})
+        self.create_vehicle_rows()
+        self.shared_arrays.close()
+        self.shared_arrays.unlink()
+        self.shared_arrays = None
+
+    def attach_vehicles(self, shared_fleet):
         """
 
         Parameters:
-            vehicle: object; an object of the Vehicle class..
+            shared_fleet: Dictionary; the shared fleet returned by share_vehicles in another process.
+
+        Returns:
+            Nothing, but it creates the fleet table from views of the arrays shared by the other process, without
+            copying them, and the sequences of vehicle views into that table.
+
+        """
+        self.shared_arrays = SharedArrays()
+        self.table.init_from_arrays(self.shared_arrays.attach(shared_fleet['specs']), shared_fleet['table'])
+        self.create_vehicle_rows()
+
+    def engine_sales(self):
+        """
 
         Returns:
             Nothing, but it updates the sales by start year object dictionary with engine sales data.
 
+        Note:
+            Sales are summed in a single pass over the age_id=0 rows of the fleet table, keyed by (engine_id, option_id,
+            modelyear_id), so the cost grows linearly with fleet size. Keys are added to the sales by start year
+            dictionary in the order in which they first appear in the fleet.
+
         """
-        if vehicle.age_id != 0:
-            print(f'Improper vehicle object passed to fleet.Fleet.engine_sales method.')
-            exit()
-        sales = 0
-        key = (vehicle.engine_id, vehicle.option_id, vehicle.modelyear_id)
-        if key in self.sales_by_start_year:
-            sales = self.sales_by_start_year[key]['engine_sales']
-        else:
-            sales = sum([
-                v.vpop for v in self.vehicles
-                if v.engine_id == vehicle.engine_id
-                   and v.option_id == vehicle.option_id
-                   and v.modelyear_id == vehicle.modelyear_id
-                   and v.age_id == 0
-            ])
+        table = self.table
+        age0_index = table.age0_index
+
+        sales_by_key = dict()
+        first_row_by_key = dict()
+        for row, engine_code, option_id, modelyear_id, vpop in zip(
+                age0_index.tolist(),
+                table.engine_codes[age0_index].tolist(),
+                table.columns['option_id'][age0_index].tolist(),
+                table.columns['modelyear_id'][age0_index].tolist(),
+                table.columns['vpop'][age0_index].tolist(),
+        ):
+            key = engine_code, option_id, modelyear_id
+            if key in sales_by_key:
+                sales_by_key[key] += vpop
+            else:
+                sales_by_key[key] = vpop
+                first_row_by_key[key] = row
+
+        for key, row in first_row_by_key.items():
+            vehicle = VehicleView(table, row)
             update_dict = {
                 'optionID': vehicle.option_id,
                 'engineID': vehicle.engine_id,
@@ -96,34 +139,45 @@ class Fleet:
                 'optionName': vehicle.option_name,
                 'regClassName': vehicle.regclass_name,
                 'fuelTypeName': vehicle.fueltype_name,
-                'engine_sales': sales,
+                'engine_sales': sales_by_key[key],
             }
 
             self.update_object_dict(vehicle, vehicle.engine_id, update_dict)
 
-    def cumulative_engine_sales(self, vehicle, start_year):
+    def cumulative_engine_sales(self, start_years):
         """
 
         Parameters:
-            vehicle: object; an object of the Vehicle class.
-            start_year: int; the implementation step for which cumulative sales are sought.
+            start_years: list; the implementation steps for which cumulative sales are sought.
 
         Returns:
             Nothing, but it updates the sales by start year object dictionary with cumulative engine sales data.
 
-        """
-        if vehicle.age_id != 0:
-            print(f'Improper vehicle object passed to fleet.Fleet.cumulative_engine_sales method.')
-            exit()
-        sales = sum([
-            v['engine_sales'] for k, v in self.sales_by_start_year.items()
-            if v['engineID'] == vehicle.engine_id
-               and v['optionID'] == vehicle.option_id
-               and (v['modelYearID'] >= start_year and v['modelYearID'] <= vehicle.modelyear_id)
-        ])
+        Note:
+            The engine sales of each (engine_id, option_id) are sorted by model year and summed cumulatively once; the
+            cumulative sales since a given start year are then the running total at the model year less the running
+            total just before the start year, so the summing does not repeat for each start year.
 
-        update_dict = {f'cumulative_engine_sales_{start_year}_std': sales}
-        self.update_object_dict(vehicle, vehicle.engine_id, update_dict)
+        """
+        sales_by_engine = dict()
+        for key, sales_dict in self.sales_by_start_year.items():
+            engine_id, option_id, modelyear_id = key
+            sales_by_engine.setdefault((engine_id, option_id), list()).append((modelyear_id, sales_dict['engine_sales']))
+
+        for (engine_id, option_id), sales_list in sales_by_engine.items():
+            sales_list.sort()
+            modelyear_ids = np.array([modelyear_id for modelyear_id, sales in sales_list])
+            running_sales = np.cumsum([sales for modelyear_id, sales in sales_list])
+
+            for start_year in start_years:
+                position = np.searchsorted(modelyear_ids, start_year, side='left')
+                prior_sales = running_sales[position - 1] if position else 0
+                cumulative_sales = running_sales - prior_sales
+                cumulative_sales[:position] = 0
+
+                attribute_name = f'cumulative_engine_sales_{start_year}_std'
+                for modelyear_id, sales in zip(modelyear_ids.tolist(), cumulative_sales.tolist()):
+                    self.sales_by_start_year[engine_id, option_id, modelyear_id][attribute_name] = sales
 
     def cumulative_vehicle_sales(self, vehicle, start_year):
         """
@@ -198,11 +252,8 @@ class Fleet:
         else:
             # Note: can't get appropriate typical VMT if modelyear+vmt_thru_age_id>year_max
             year = min(vehicle.modelyear_id, year_max - vmt_thru_age_id)
-            odometer = [v.odometer for v in self.vehicles
-                        if v.vehicle_id == vehicle.vehicle_id
-                        and v.option_id == vehicle.option_id
-                        and v.modelyear_id == year
-                        and v.age_id == vmt_thru_age_id][0]
+            row = self.table.find_rows(vehicle.vehicle_id, vehicle.option_id, year, vmt_thru_age_id)[0]
+            odometer = self.table.columns['odometer'][row]
             typical_vmt = odometer / (vmt_thru_age_id + 1)
             self.typical_vmt_dict[key] = typical_vmt
 
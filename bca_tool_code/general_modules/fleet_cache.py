@@ -0,0 +1,141 @@
+import os
+import hashlib
+import json
+import pandas as pd
+from pathlib import PurePath
+
+try:
+    import pyarrow  # Feather read/write requires pyarrow
+    pyarrow_available = True
+except ImportError:
+    pyarrow_available = False
+
+
+def update_hash(sha, filepaths):
+    """
+
+    Parameters:
+        sha: object; a hashlib hash object.\n
+        filepaths: List; the paths of the files to hash.
+
+    Returns:
+        Nothing, but updates sha with the name, size and contents of each file.
+
+    Note:
+        Each file's name and size are hashed ahead of its contents so that the boundary between files is part of the
+        hash (e.g., bytes moved from the end of one file to the start of the next change the hash).
+
+    """
+    for filepath in filepaths:
+        sha.update(f'\nfile={PurePath(filepath).name};bytes={os.path.getsize(filepath)}\n'.encode())
+        with open(filepath, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                sha.update(chunk)
+
+
+class FleetCache:
+    """
+
+    The FleetCache class stores the final Vehicle.vehicle_df (i.e., the parsed, filtered and adjusted MOVES fleet) in a
+    Feather file keyed on the content of the input files used to build it so that repeat runs can skip those steps.
+
+    Note:
+        The cache is skipped if pyarrow is not installed. Any change to the contents of the passed input files results
+        in a new key and, therefore, a rebuild of the cached fleet.
+
+    """
+    cache_version = 2  # increment when changes to Vehicle.create_vehicle_df would change the cached result
+
+    def __init__(self, path_cache, filepaths):
+        self.path_cache = path_cache
+        self.filepaths = filepaths
+        self.available = pyarrow_available
+        self.key = None
+
+    def get_key(self):
+        """
+
+        Returns:
+            A hex string hash of the cache_version and the names, sizes and contents of the input files used to build the
+            fleet (see update_hash).
+
+        """
+        if self.key is None:
+            sha = hashlib.sha256(f'cache_version={self.cache_version}'.encode())
+            update_hash(sha, self.filepaths)
+            self.key = sha.hexdigest()[:16]
+
+        return self.key
+
+    def get_paths(self):
+        """
+
+        Returns:
+            The paths of the Feather data file and the JSON sidecar file for the current key.
+
+        """
+        key = self.get_key()
+
+        return self.path_cache / f'fleet_{key}.feather', self.path_cache / f'fleet_{key}.json'
+
+    def load(self):
+        """
+
+        Returns:
+            A tuple of the cached vehicle DataFrame and a dictionary of the cached Vehicle class attributes, or None if
+            no cache exists for the current key or the cache cannot be read.
+
+        """
+        if not self.available:
+            return None
+
+        try:
+            path_data, path_meta = self.get_paths()
+            if not path_data.exists() or not path_meta.exists():
+                return None
+            with open(path_meta, 'r') as file:
+                meta = json.load(file)
+            df = pd.read_feather(path_data).astype(meta['dtypes'])
+        except (OSError, KeyError, ValueError) as e:
+            print(f'Fleet cache could not be read ({e}); rebuilding the fleet.')
+            return None
+
+        print(f'Fleet loaded from cache {path_data}.')
+
+        return df, meta['attributes']
+
+    def save(self, df, attributes):
+        """
+
+        Parameters:
+            df: DataFrame; the vehicle DataFrame to cache (i.e., Vehicle.vehicle_df).\n
+            attributes: Dictionary; the Vehicle class attributes to restore with the cached DataFrame.
+
+        Returns:
+            Nothing, but writes the Feather data file and JSON sidecar file and removes cache files for other keys.
+
+        """
+        if not self.available:
+            return
+
+        try:
+            self.path_cache.mkdir(exist_ok=True)
+            path_data, path_meta = self.get_paths()
+            for stale_file in self.path_cache.glob('fleet_*'):
+                if stale_file not in (path_data, path_meta):
+                    stale_file.unlink()
+
+            df.reset_index(drop=True).to_feather(path_data)
+            meta = {
+                'key': self.get_key(),
+                'files': [str(filepath) for filepath in self.filepaths],
+                'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()},
+                'attributes': attributes,
+            }
+            with open(path_meta, 'w') as file:
+                json.dump(meta, file, indent=2)
+        except OSError as e:
+            print(f'Fleet cache could not be written ({e}).')
+            return
+
+        print(f'Fleet saved to cache {path_data}.')
@@ -0,0 +1,375 @@
+import sys
+import numpy as np
+
+from bca_tool_code.general_modules.vehicle import Vehicle
+
+
+class FleetTable:
+    """
+
+    The FleetTable class stores the fleet data (i.e., Vehicle.vehicle_df) in columnar form with one NumPy array per
+    attribute. Subsets of the fleet (age_id=0, diesel, no-action) are stored as arrays of row indexes rather than as
+    separate lists of objects.
+
+    """
+    id_attributes = (
+        'year_id',
+        'sourcetype_id',
+        'regclass_id',
+        'fueltype_id',
+        'modelyear_id',
+        'age_id',
+        'option_id',
+    )
+    value_attributes = (
+        'thc_ustons',
+        'co_ustons',
+        'nox_ustons',
+        'pm25_exhaust_ustons',
+        'pm25_brakewear_ustons',
+        'pm25_tirewear_ustons',
+        'pm25_ustons',
+        'voc_ustons',
+        'vpop',
+        'vmt',
+        'vmt_per_veh',
+        'odometer',
+        'gallons',
+    )
+    index_arrays = (  # the per row and subset index arrays
+        'vehicle_codes',
+        'engine_codes',
+        'age0_index',
+        'ft2_index',
+        'no_action_index',
+        'no_action_rows',
+    )
+
+    def __init__(self):
+        self.columns = dict()
+        self.num_rows = 0
+        self.vehicle_ids = list()  # unique (sourcetype_id, regclass_id, fueltype_id) tuples
+        self.vehicle_codes = np.zeros(0, dtype=np.int64)  # per row position within vehicle_ids
+        self.engine_ids = list()  # unique (regclass_id, fueltype_id) tuples
+        self.engine_codes = np.zeros(0, dtype=np.int64)  # per row position within engine_ids
+        self.option_names = dict()
+        self.age0_index = np.zeros(0, dtype=np.int64)
+        self.ft2_index = np.zeros(0, dtype=np.int64)
+        self.no_action_index = np.zeros(0, dtype=np.int64)
+        self.no_action_rows = np.zeros(0, dtype=np.int64)  # per row the aligned no-action row, -1 if none
+        self.reductions = dict()
+
+    def init_from_df(self, df, no_action_alt, options):
+        """
+
+        Parameters:
+            df: DataFrame; the fleet data (i.e., Vehicle.vehicle_df).\n
+            no_action_alt: int; the no-action option_id number.\n
+            options: object; an object of the Options class.
+
+        Returns:
+            Nothing, but it populates the attribute arrays and the subset index arrays.
+
+        """
+        self.num_rows = len(df)
+        for attribute in self.id_attributes:
+            self.columns[attribute] = np.ascontiguousarray(df[attribute].to_numpy(dtype=np.int64))
+        for attribute in self.value_attributes:
+            self.columns[attribute] = np.ascontiguousarray(df[attribute].to_numpy(dtype=np.float64))
+
+        self.vehicle_ids, self.vehicle_codes \
+            = self.encode_ids('sourcetype_id', 'regclass_id', 'fueltype_id')
+        self.engine_ids, self.engine_codes \
+            = self.encode_ids('regclass_id', 'fueltype_id')
+
+        self.option_names = {
+            int(option_id): options.get_option_name(int(option_id))
+            for option_id in np.unique(self.columns['option_id'])
+        }
+
+        self.age0_index = np.flatnonzero(self.columns['age_id'] == 0)
+        self.ft2_index = np.flatnonzero(self.columns['fueltype_id'] == 2)
+        self.no_action_index = np.flatnonzero(self.columns['option_id'] == no_action_alt)
+        self.no_action_rows = self.align_to_no_action()
+        self.reductions = dict()
+
+    def get_arrays(self):
+        """
+
+        Returns:
+            A dictionary of the attribute arrays, the index arrays and the reductions calculated so far, each named by
+            its kind and attribute (e.g., 'column_vpop', 'vehicle_codes', 'reductions_nox_ustons').
+
+        """
+        arrays = {f'column_{attribute}': column for attribute, column in self.columns.items()}
+        arrays.update({name: getattr(self, name) for name in self.index_arrays})
+        arrays.update({f'reductions_{attribute}': reductions for attribute, reductions in self.reductions.items()})
+
+        return arrays
+
+    def set_arrays(self, arrays):
+        """
+
+        Parameters:
+            arrays: Dictionary; arrays named as returned by get_arrays (e.g., views of the arrays in shared memory).
+
+        Returns:
+            Nothing, but replaces the attribute arrays, index arrays and reductions with the passed arrays.
+
+        """
+        self.columns = dict()
+        self.reductions = dict()
+        for name, array in arrays.items():
+            if name.startswith('column_'):
+                self.columns[name[len('column_'):]] = array
+            elif name.startswith('reductions_'):
+                self.reductions[name[len('reductions_'):]] = array
+            else:
+                setattr(self, name, array)
+
+    def get_meta(self):
+        """
+
+        Returns:
+            A dictionary of the number of rows and the id lists that, with the arrays of get_arrays, make up the table.
+
+        """
+        return {
+            'num_rows': self.num_rows,
+            'vehicle_ids': self.vehicle_ids,
+            'engine_ids': self.engine_ids,
+            'option_names': self.option_names,
+        }
+
+    def init_from_arrays(self, arrays, meta):
+        """
+
+        Parameters:
+            arrays: Dictionary; arrays named as returned by get_arrays.\n
+            meta: Dictionary; the number of rows and id lists as returned by get_meta.
+
+        Returns:
+            Nothing, but populates the table from the passed arrays without copying them.
+
+        """
+        self.num_rows = meta['num_rows']
+        self.vehicle_ids = meta['vehicle_ids']
+        self.engine_ids = meta['engine_ids']
+        self.option_names = meta['option_names']
+        self.set_arrays(arrays)
+
+    def align_to_no_action(self):
+        """
+
+        Returns:
+            An array giving, for each row, the row index of the no-action row having the same vehicle_id, modelyear_id
+            and age_id; rows without a no-action counterpart get -1.
+
+        """
+        no_action_rows = np.full(self.num_rows, -1, dtype=np.int64)
+        if not len(self.no_action_index):
+            return no_action_rows
+
+        modelyear_ids = self.columns['modelyear_id'] - self.columns['modelyear_id'].min()
+        age_ids = self.columns['age_id'] - self.columns['age_id'].min()
+        keys = np.ravel_multi_index(
+            (self.vehicle_codes, modelyear_ids, age_ids),
+            (len(self.vehicle_ids), modelyear_ids.max() + 1, age_ids.max() + 1)
+        )
+        no_action_keys = keys[self.no_action_index]
+        order = np.argsort(no_action_keys, kind='stable')
+        sorted_keys = no_action_keys[order]
+
+        positions = np.searchsorted(sorted_keys, keys).clip(max=len(sorted_keys) - 1)
+        matched = sorted_keys[positions] == keys
+        no_action_rows[matched] = self.no_action_index[order[positions[matched]]]
+
+        return no_action_rows
+
+    def get_no_action_values(self, attribute, index=None):
+        """
+
+        Parameters:
+            attribute: str; the attribute for which no-action values are sought (e.g., 'nox_ustons').\n
+            index: array; the row indexes for which values are sought; None returns values for all rows.
+
+        Returns:
+            An array of the attribute values of the no-action rows aligned to the passed rows.
+
+        Note:
+            This is the alignment to use for any "action minus no-action" calculation.
+
+        """
+        no_action_rows = self.no_action_rows if index is None else self.no_action_rows[index]
+        if (no_action_rows < 0).any():
+            print(f'\nNo-action data not found for some vehicles when aligning {attribute} in {self}.')
+            sys.exit()
+
+        return self.columns[attribute][no_action_rows]
+
+    def get_reductions(self, attribute):
+        """
+
+        Parameters:
+            attribute: str; the attribute for which reductions are sought (e.g., 'nox_ustons').
+
+        Returns:
+            An array, aligned to all rows, of the no-action value less the row's value; the reduction is positive where
+            the action has a lower value than no action and is 0 for no-action rows.
+
+        """
+        if attribute not in self.reductions:
+            reductions = np.zeros(self.num_rows)
+            action_index = np.flatnonzero(self.no_action_rows != np.arange(self.num_rows))
+            reductions[action_index] \
+                = self.get_no_action_values(attribute, action_index) - self.columns[attribute][action_index]
+            self.reductions[attribute] = reductions
+
+        return self.reductions[attribute]
+
+    def encode_ids(self, *attributes):
+        """
+
+        Parameters:
+            attributes: str(s); the id attributes that make up the compound id (e.g., regclass_id, fueltype_id).
+
+        Returns:
+            A list of the unique compound id tuples and an array giving, for each row, the position of its compound id
+            within that list.
+
+        """
+        stacked = np.stack([self.columns[attribute] for attribute in attributes], axis=1)
+        if not len(stacked):
+            return list(), np.zeros(0, dtype=np.int64)
+        unique_ids, codes = np.unique(stacked, axis=0, return_inverse=True)
+        unique_ids = [tuple(int(value) for value in unique_id) for unique_id in unique_ids]
+
+        return unique_ids, codes.reshape(-1).astype(np.int64)
+
+    def rows(self, index=None):
+        """
+
+        Parameters:
+            index: array; the row indexes to include; None includes all rows.
+
+        Returns:
+            A VehicleRows sequence of VehicleView objects for the passed index.
+
+        """
+        if index is None:
+            index = np.arange(self.num_rows)
+
+        return VehicleRows(self, index)
+
+    def find_rows(self, vehicle_id, option_id, modelyear_id, age_id):
+        """
+
+        Parameters:
+            vehicle_id: tuple; (sourcetype_id, regclass_id, fueltype_id).\n
+            option_id: int; the option_id.\n
+            modelyear_id: int; the model year.\n
+            age_id: int; the age.
+
+        Returns:
+            An array of the row indexes matching the passed ids.
+
+        """
+        if vehicle_id not in self.vehicle_ids:
+            return np.zeros(0, dtype=np.int64)
+        vehicle_code = self.vehicle_ids.index(vehicle_id)
+
+        return np.flatnonzero((self.vehicle_codes == vehicle_code)
+                              & (self.columns['option_id'] == option_id)
+                              & (self.columns['modelyear_id'] == modelyear_id)
+                              & (self.columns['age_id'] == age_id))
+
+
+class VehicleRows:
+    """
+
+    The VehicleRows class is a sequence of VehicleView objects over a set of FleetTable rows; views are created as they
+    are accessed so no per-row objects are held in memory.
+
+    """
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, position):
+        return VehicleView(self.table, int(self.index[position]))
+
+    def __iter__(self):
+        table = self.table
+        for row in self.index.tolist():
+            yield VehicleView(table, row)
+
+    def get_values(self, attribute):
+        """
+
+        Parameters:
+            attribute: str; a FleetTable attribute (e.g., 'year_id').
+
+        Returns:
+            An array of the attribute values of the rows, in order.
+
+        """
+        return self.table.columns[attribute][self.index]
+
+
+class VehicleView(Vehicle):
+    """
+
+    The VehicleView class is a read-only view of a single FleetTable row that presents the same attributes as a
+    Vehicle object so that functions written for Vehicle objects work unchanged.
+
+    """
+    so2_ustons = 0
+    co2_ustons = 0
+    ch4_ustons = 0
+    n2o_ustons = 0
+    energy_kj = 0
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+
+    @property
+    def vehicle_id(self):
+        return self.table.vehicle_ids[self.table.vehicle_codes[self.row]]
+
+    @property
+    def engine_id(self):
+        return self.table.engine_ids[self.table.engine_codes[self.row]]
+
+    @property
+    def option_name(self):
+        return self.table.option_names[self.option_id]
+
+    @property
+    def sourcetype_name(self):
+        return self.get_sourcetype_name()
+
+    @property
+    def regclass_name(self):
+        return self.get_regclass_name()
+
+    @property
+    def fueltype_name(self):
+        return self.get_fueltype_name()
+
+
+def _id_property(attribute):
+    return property(lambda self: int(self.table.columns[attribute][self.row]))
+
+
+def _value_property(attribute):
+    return property(lambda self: self.table.columns[attribute][self.row])
+
+
+for _attribute in FleetTable.id_attributes:
+    setattr(VehicleView, _attribute, _id_property(_attribute))
+for _attribute in FleetTable.value_attributes:
+    setattr(VehicleView, _attribute, _value_property(_attribute))
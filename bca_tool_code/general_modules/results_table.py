@@ -0,0 +1,611 @@
+import sys
+import numpy as np
+import pandas as pd
+from bisect import bisect_right
+
+
+class ResultsTable:
+    """
+
+    The ResultsTable class stores results in columnar form with one NumPy array per attribute and one integer key code
+    per row. Each element of the row key (e.g., (vehicle_id, option_id, modelyear_id, age_id, discount_rate)) is coded
+    as its position in a list of the values of that element, and the element codes are combined into the row's key code
+    with np.ravel_multi_index; rows are found by a search of the sorted key codes. String attributes (e.g., optionName)
+    are stored as integer codes into a list of categories.
+
+    Note:
+        Attributes named with an 'ID' suffix or included in int_columns are stored as int64, string attributes as
+        categories and all other attributes as float64. Attributes not set for a row are NaN (or 0 for int64 columns).
+        The class provides the update_object_dict and get_attribute_value methods of the dictionary-based results it
+        replaces and a read-only mapping interface (results[key], keys(), items()) that returns each row as a dictionary.
+        Rows added since the key codes were last sorted are found through a dictionary of their key codes; all key codes
+        are sorted again once those rows number more than a quarter of the sorted rows, so rows can be added one at a
+        time or in batches.
+
+    """
+    initial_capacity = 1024
+
+    def __init__(self, key_names, int_columns=None):
+        self.key_names = tuple(key_names)
+        self.int_columns = set(int_columns) if int_columns else set()
+        self.key_values = [[list(), dict()] for key_name in self.key_names]  # per key element: [values, value: code]
+        self.key_bits = 63 // max(len(self.key_names), 1)  # the bits of the key code given to each key element
+        self.key_dims = (1 << self.key_bits,) * len(self.key_names)
+        self.key_codes = np.zeros(0, dtype=np.int64)
+        self.sorted_key_codes = np.zeros(0, dtype=np.int64)
+        self.sorted_rows = np.zeros(0, dtype=np.int64)
+        self.sorted_key_list = None  # the sorted key codes as a list, for single key lookups
+        self.sorted_num_rows = 0  # the rows included in the sorted key codes
+        self.new_rows = dict()  # key code: row of the rows added since the key codes were sorted
+        self.indexed_rows = 0  # the rows included in the sorted key codes or in new_rows
+        self.columns = dict()
+        self.categories = dict()  # column name: [list of categories, dict of category to code]
+        self.num_rows = 0
+        self.capacity = 0
+
+    def __len__(self):
+        return self.num_rows
+
+    def __contains__(self, key):
+        return self.get_row_index(key) is not None
+
+    def __iter__(self):
+        return iter(self.get_keys())
+
+    def __getitem__(self, key):
+        return self.get_row(self.get_row_index(key, required=True))
+
+    def keys(self):
+        return self.get_keys()
+
+    def items(self):
+        for row, key in enumerate(self.get_keys()):
+            yield key, self.get_row(row)
+
+    @property
+    def column_names(self):
+        return list(self.columns)
+
+    def get_column_kind(self, column_name, value):
+        """
+
+        Parameters:
+            column_name: str; the name of the column.\n
+            value: the first value to be stored in the column.
+
+        Returns:
+            'category', 'int' or 'float' denoting how the column will be stored.
+
+        """
+        if isinstance(value, (list, tuple, np.ndarray, pd.Series, pd.Categorical)):
+            values = np.asarray(value)
+            if values.dtype.kind in 'OU' and len(values) and isinstance(values[0], str):
+                return 'category'
+        elif isinstance(value, str):
+            return 'category'
+        if column_name.endswith('ID') or column_name in self.int_columns:
+            return 'int'
+
+        return 'float'
+
+    def add_column(self, column_name, value):
+        """
+
+        Parameters:
+            column_name: str; the name of the column to add.\n
+            value: the first value to be stored in the column; used to set how the column is stored.
+
+        Returns:
+            Nothing, but adds an empty column of the appropriate dtype.
+
+        """
+        kind = self.get_column_kind(column_name, value)
+        if kind == 'category':
+            self.columns[column_name] = np.full(self.capacity, -1, dtype=np.int32)
+            self.categories[column_name] = [list(), dict()]
+        elif kind == 'int':
+            self.columns[column_name] = np.zeros(self.capacity, dtype=np.int64)
+        else:
+            self.columns[column_name] = np.full(self.capacity, np.nan)
+
+    def ensure_capacity(self, num_rows):
+        """
+
+        Parameters:
+            num_rows: int; the number of rows the table must be able to hold.
+
+        Returns:
+            Nothing, but grows every column, to twice the current capacity or to num_rows if greater, if the current
+            capacity is too small.
+
+        """
+        if num_rows <= self.capacity:
+            return
+        capacity = max(self.initial_capacity, 2 * self.capacity, num_rows)
+        for column_name, column in self.columns.items():
+            if column_name in self.categories:
+                fill_value = -1
+            elif column.dtype == np.int64:
+                fill_value = 0
+            else:
+                fill_value = np.nan
+            new_column = np.full(capacity, fill_value, dtype=column.dtype)
+            new_column[:self.num_rows] = column[:self.num_rows]
+            self.columns[column_name] = new_column
+        key_codes = np.zeros(capacity, dtype=np.int64)
+        key_codes[:self.num_rows] = self.key_codes[:self.num_rows]
+        self.key_codes = key_codes
+        self.capacity = capacity
+
+    def encode(self, column_name, values):
+        """
+
+        Parameters:
+            column_name: str; the name of a category column.\n
+            values: str or list of str; the values to encode.
+
+        Returns:
+            The integer code (or array of codes) of the passed values, adding any new categories.
+
+        """
+        categories, codes = self.categories[column_name]
+        if isinstance(values, str):
+            values = [values]
+            single = True
+        else:
+            single = False
+        encoded = np.empty(len(values), dtype=np.int32)
+        for index, value in enumerate(values):
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(categories)
+                categories.append(value)
+            encoded[index] = code
+
+        return encoded[0] if single else encoded
+
+    def get_key_element_code(self, position, value, add=True):
+        """
+
+        Parameters:
+            position: int; the position of the element within the row key.\n
+            value: the value of the key element.\n
+            add: bool; True adds the value if it is new, False returns -1 for a new value.
+
+        Returns:
+            The integer code of the value of the key element.
+
+        """
+        values, codes = self.key_values[position]
+        code = codes.get(value)
+        if code is None:
+            if not add:
+                return -1
+            if len(values) == self.key_dims[position]:
+                print(f'\n{self.key_names[position]} has more than {self.key_dims[position]} values, the most a '
+                      f'{len(self.key_names)} element key can code.')
+                sys.exit()
+            code = codes[value] = len(values)
+            values.append(value)
+
+        return code
+
+    def encode_key_element(self, position, values):
+        """
+
+        Parameters:
+            position: int; the position of the element within the row key.\n
+            values: scalar, array or tuple; a value for every row, an array of the value of each row, or a (list of
+            unique values, array of the position of each row's value within that list) pair, e.g., (FleetTable.vehicle_ids,
+            FleetTable.vehicle_codes).
+
+        Returns:
+            The integer code, or an array of the integer codes, of the values of the key element.
+
+        """
+        if isinstance(values, tuple):
+            unique_values, positions = values
+        elif np.ndim(values):
+            unique_values, positions = np.unique(np.asarray(values), return_inverse=True)
+            unique_values = unique_values.tolist()
+        else:
+            return self.get_key_element_code(position, values)
+        codes = np.array([self.get_key_element_code(position, value) for value in unique_values], dtype=np.int64)
+
+        return codes[np.asarray(positions, dtype=np.int64)]
+
+    def encode_key_columns(self, *key_columns):
+        """
+
+        Parameters:
+            key_columns: the values of each element of the row keys, in key order, each as passed to
+            encode_key_element.
+
+        Returns:
+            An array of the key codes of the rows.
+
+        """
+        element_codes = [self.encode_key_element(position, values) for position, values in enumerate(key_columns)]
+
+        return np.ravel_multi_index(np.broadcast_arrays(*element_codes), self.key_dims)
+
+    def encode_keys(self, keys):
+        """
+
+        Parameters:
+            keys: List; row keys.
+
+        Returns:
+            An array of the key codes of the passed keys.
+
+        """
+        element_codes = np.array([[self.get_key_element_code(position, value) for position, value in enumerate(key)]
+                                  for key in keys], dtype=np.int64).reshape(-1, len(self.key_names))
+
+        return np.ravel_multi_index(tuple(element_codes.T), self.key_dims)
+
+    def replace_key_element(self, key_codes, position, values):
+        """
+
+        Parameters:
+            key_codes: array; key codes.\n
+            position: int; the position of the element within the row key to replace.\n
+            values: the new values of the key element, as passed to encode_key_element.
+
+        Returns:
+            An array of the key codes with the element at position replaced by the passed values (e.g., the key codes of
+            the no action rows aligned with action rows).
+
+        """
+        element_codes = list(np.unravel_index(key_codes, self.key_dims))
+        element_codes[position] = self.encode_key_element(position, values)
+
+        return np.ravel_multi_index(np.broadcast_arrays(*element_codes), self.key_dims)
+
+    def get_keys(self, rows=None):
+        """
+
+        Parameters:
+            rows: array; the row indexes; None returns the keys of all rows.
+
+        Returns:
+            A list of the row keys of the rows.
+
+        """
+        key_codes = self.get_key_codes(rows)
+        element_codes = np.unravel_index(key_codes, self.key_dims)
+        elements = [[values[code] for code in codes.tolist()]
+                    for (values, value_codes), codes in zip(self.key_values, element_codes)]
+
+        return list(zip(*elements))
+
+    def get_key_codes(self, rows=None):
+        """
+
+        Parameters:
+            rows: array; the row indexes; None returns the key codes of all rows.
+
+        Returns:
+            An array of the key codes of the rows.
+
+        """
+        key_codes = self.key_codes[:self.num_rows]
+
+        return key_codes if rows is None else key_codes[rows]
+
+    def get_key_columns(self, rows=None):
+        """
+
+        Parameters:
+            rows: array; the row indexes; None returns the key elements of all rows.
+
+        Returns:
+            A list, per key element, of the (list of unique values, array of the position of each row's value within
+            that list) pair of the rows, as passed to encode_key_element.
+
+        """
+        element_codes = np.unravel_index(self.get_key_codes(rows), self.key_dims)
+
+        return [(values, codes) for (values, value_codes), codes in zip(self.key_values, element_codes)]
+
+    def update_index(self):
+        """
+
+        Returns:
+            Nothing, but adds the rows added since the last update to new_rows or, once new_rows would hold more than a
+            quarter of the sorted rows, sorts the key codes of all rows, with the row index of each.
+
+        """
+        if self.indexed_rows == self.num_rows:
+            return
+        if self.num_rows - self.sorted_num_rows > max(self.initial_capacity, self.sorted_num_rows // 4):
+            order = np.argsort(self.get_key_codes(), kind='stable')
+            self.sorted_key_codes = self.get_key_codes()[order]
+            self.sorted_rows = order
+            self.sorted_key_list = None
+            self.sorted_num_rows = self.num_rows
+            self.new_rows = dict()
+        else:
+            self.new_rows.update(zip(self.key_codes[self.indexed_rows:self.num_rows].tolist(),
+                                     range(self.indexed_rows, self.num_rows)))
+        self.indexed_rows = self.num_rows
+
+    def find_rows(self, key_codes):
+        """
+
+        Parameters:
+            key_codes: array; key codes.
+
+        Returns:
+            An array of the row index of each key code; -1 where the table has no such row.
+
+        Note:
+            Where rows share a key, the last row added is found, as a dictionary keyed by row would hold it.
+
+        """
+        self.update_index()
+        key_codes = np.asarray(key_codes, dtype=np.int64)
+        rows = np.full(key_codes.shape, -1, dtype=np.int64)
+        if len(self.sorted_key_codes):
+            positions = (np.searchsorted(self.sorted_key_codes, key_codes, side='right') - 1).clip(min=0)
+            found = self.sorted_key_codes[positions] == key_codes
+            rows[found] = self.sorted_rows[positions[found]]
+        if self.new_rows:
+            new_key_codes = np.fromiter(self.new_rows, dtype=np.int64, count=len(self.new_rows))
+            new_rows = np.fromiter(self.new_rows.values(), dtype=np.int64, count=len(self.new_rows))
+            order = np.argsort(new_key_codes)
+            positions = np.searchsorted(new_key_codes[order], key_codes).clip(max=len(order) - 1)
+            found = new_key_codes[order][positions] == key_codes
+            rows[found] = new_rows[order][positions[found]]
+
+        return rows
+
+    def get_row_index(self, key, required=False):
+        """
+
+        Parameters:
+            key: tuple; the row key.\n
+            required: bool; True raises a KeyError if the table has no row with the key.
+
+        Returns:
+            The row index of the key, or None if the table has no row with the key.
+
+        Note:
+            This single key lookup codes the key in Python, as np.ravel_multi_index would, and looks it up in new_rows or
+            searches a list of the sorted key codes to avoid the overhead of array calls.
+
+        """
+        key_code = 0
+        for (values, codes), value in zip(self.key_values, key):
+            element_code = codes.get(value)
+            if element_code is None:
+                key_code = -1
+                break
+            key_code = (key_code << self.key_bits) | element_code
+
+        row = None
+        if key_code >= 0 and len(key) == len(self.key_names):
+            self.update_index()
+            row = self.new_rows.get(key_code)
+            if row is None:
+                if self.sorted_key_list is None:
+                    self.sorted_key_list = self.sorted_key_codes.tolist()
+                position = bisect_right(self.sorted_key_list, key_code) - 1
+                if position >= 0 and self.sorted_key_list[position] == key_code:
+                    row = int(self.sorted_rows[position])
+        if row is None and required:
+            raise KeyError(key)
+
+        return row
+
+    def add_rows(self, keys, update_dict):
+        """
+
+        Parameters:
+            keys: List or array; the keys of the rows to add, none of which may already be in the table, or an array of
+            their key codes (see encode_key_columns).\n
+            update_dict: Dictionary; attribute names and a value (applied to every row) or an array of values (one
+            per row).
+
+        Returns:
+            Nothing, but appends the rows to the table.
+
+        """
+        key_codes = keys if isinstance(keys, np.ndarray) else self.encode_keys(list(keys))
+        start = self.num_rows
+        end = start + len(key_codes)
+        self.ensure_capacity(end)
+        self.key_codes[start:end] = key_codes
+        self.num_rows = end
+        for attribute_name, attribute_value in update_dict.items():
+            self.set_values(slice(start, end), attribute_name, attribute_value)
+
+    def copy_rows(self, rows, new_keys, update_dict=None):
+        """
+
+        Parameters:
+            rows: array; the row indexes to copy.\n
+            new_keys: List or array; the keys of the new rows, one per row in rows, or an array of their key codes.\n
+            update_dict: Dictionary; attribute names and values to set in the new rows (e.g., a new discount rate).
+
+        Returns:
+            Nothing, but appends copies of the passed rows with the new keys.
+
+        """
+        rows = np.asarray(rows)
+        start = self.num_rows
+        end = start + len(rows)
+        self.ensure_capacity(end)
+        for column in self.columns.values():
+            column[start:end] = column[rows]
+        self.key_codes[start:end] = new_keys if isinstance(new_keys, np.ndarray) else self.encode_keys(list(new_keys))
+        self.num_rows = end
+        if update_dict:
+            for attribute_name, attribute_value in update_dict.items():
+                self.set_values(slice(start, end), attribute_name, attribute_value)
+
+    def set_values(self, rows, attribute_name, values):
+        """
+
+        Parameters:
+            rows: int, slice or array; the rows to set.\n
+            attribute_name: str; the attribute to set.\n
+            values: the value or values to set.
+
+        Returns:
+            Nothing, but sets the values, adding the column if needed.
+
+        """
+        if attribute_name not in self.columns:
+            self.add_column(attribute_name, values)
+        if attribute_name in self.categories:
+            values = self.encode(attribute_name, values)
+        self.columns[attribute_name][rows] = values
+
+    def set_column(self, attribute_name, values):
+        """
+
+        Parameters:
+            attribute_name: str; the attribute to set.\n
+            values: array; the values for every row in the table.
+
+        Returns:
+            Nothing, but sets the attribute for every row, adding the column if needed.
+
+        """
+        self.set_values(slice(0, self.num_rows), attribute_name, values)
+
+    def get_column(self, attribute_name):
+        """
+
+        Parameters:
+            attribute_name: str; the attribute sought.
+
+        Returns:
+            An array of the attribute values for every row; a view, not a copy, for numeric columns.
+
+        """
+        column = self.columns[attribute_name][:self.num_rows]
+        if attribute_name in self.categories:
+            categories = self.categories[attribute_name][0]
+            return np.array(categories, dtype=object)[column]
+
+        return column
+
+    def get_row(self, row):
+        """
+
+        Parameters:
+            row: int; the row index.
+
+        Returns:
+            A dictionary of the attribute values of the row.
+
+        """
+        return {attribute_name: self.get_value(row, attribute_name) for attribute_name in self.columns}
+
+    def get_value(self, row, attribute_name):
+        """
+
+        Parameters:
+            row: int; the row index.\n
+            attribute_name: str; the attribute sought.
+
+        Returns:
+            The value of the attribute in the row.
+
+        """
+        value = self.columns[attribute_name][row]
+        if attribute_name in self.categories:
+            return self.categories[attribute_name][0][value] if value >= 0 else None
+
+        return value
+
+    def update_object_dict(self, key, update_dict):
+        """
+
+        Parameters:
+            key: tuple; the row key (e.g., (vehicle_id, option_id, modelyear_id, age_id, discount_rate)).\n
+            update_dict: Dictionary; represents the attribute-value pairs to be updated.
+
+        Returns:
+            Updates the row with each attribute updated with the appropriate value; adds the row if the key is new.
+
+        """
+        row = self.get_row_index(key)
+        if row is None:
+            self.add_rows([key], update_dict)
+            return
+        for attribute_name, attribute_value in update_dict.items():
+            self.set_values(row, attribute_name, attribute_value)
+
+    def get_attribute_value(self, key, attribute_name):
+        """
+
+        Parameters:
+            key: tuple; the row key.\n
+            attribute_name: str; the attribute name for which a value is sought.
+
+        Returns:
+            The attribute value associated with attribute_name for the given key.
+
+        """
+        return self.get_value(self.get_row_index(key, required=True), attribute_name)
+
+    def get_attribute_values(self, key, *attribute_names):
+        """
+
+        Parameters:
+            key: tuple; the row key.\n
+            attribute_names: str(s); the attribute names for which values are sought.
+
+        Returns:
+            A list of attribute values associated with attribute_names for the given key.
+
+        """
+        row = self.get_row_index(key, required=True)
+
+        return [self.get_value(row, attribute_name) for attribute_name in attribute_names]
+
+    def get_rows(self, keys):
+        """
+
+        Parameters:
+            keys: List; row keys.
+
+        Returns:
+            An array of the row indexes of the passed keys.
+
+        """
+        rows = self.find_rows(self.encode_keys(keys))
+        if (rows < 0).any():
+            raise KeyError(keys[int(np.flatnonzero(rows < 0)[0])])
+
+        return rows
+
+    def to_dataframe(self):
+        """
+
+        Returns:
+            A DataFrame of the table with one row per key in insertion order and one column per attribute.
+
+        """
+        data = dict()
+        for attribute_name, column in self.columns.items():
+            if attribute_name in self.categories:
+                data[attribute_name] = pd.Categorical.from_codes(column[:self.num_rows],
+                                                                 self.categories[attribute_name][0])
+            else:
+                data[attribute_name] = column[:self.num_rows].copy()
+
+        return pd.DataFrame(data)
+
+    def memory_usage(self):
+        """
+
+        Returns:
+            The number of bytes held by the table columns and key codes.
+
+        """
+        return sum(column.nbytes for column in self.columns.values()) + self.key_codes.nbytes \
+            + self.sorted_key_codes.nbytes + self.sorted_rows.nbytes
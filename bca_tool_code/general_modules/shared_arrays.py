@@ -0,0 +1,155 @@
+import sys
+import numpy as np
+from multiprocessing import shared_memory
+from time import time
+
+try:
+    import resource  # not available on Windows
+except ImportError:
+    resource = None
+
+
+class SharedArrays:
+    """
+
+    The SharedArrays class places named NumPy arrays in a single multiprocessing.shared_memory block so that other
+    processes can attach to them, by the block name, without copying or pickling the array data.
+
+    Note:
+        The process that creates the block owns it and must unlink it once all processes are done with it; arrays
+        attached to the block are views and must not be used after the block is closed.
+
+    """
+    alignment = 64  # the byte alignment of each array within the block
+
+    def __init__(self):
+        self.block = None
+        self.specs = dict()
+        self.attach_time = 0
+
+    def init_from_arrays(self, arrays):
+        """
+
+        Parameters:
+            arrays: Dictionary; array names and the NumPy arrays to share.
+
+        Returns:
+            A dictionary of the array names and views of the arrays, holding copies of the passed arrays, in the
+            shared memory block.
+
+        """
+        offsets = dict()
+        size = 0
+        for name, array in arrays.items():
+            offsets[name] = size
+            size += -(-array.nbytes // self.alignment) * self.alignment
+
+        self.block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.specs = {
+            'block': self.block.name,
+            'arrays': {name: (offsets[name], array.shape, array.dtype.str) for name, array in arrays.items()},
+        }
+        views = self.get_views()
+        for name, array in arrays.items():
+            views[name][...] = array
+
+        return views
+
+    def attach(self, specs):
+        """
+
+        Parameters:
+            specs: Dictionary; the specs of a block, as returned by get_specs in the process that created it.
+
+        Returns:
+            A dictionary of the array names and views of the arrays in the shared memory block; the time taken to
+            attach is stored in attach_time.
+
+        """
+        start_time = time()
+        self.specs = specs
+        self.block = shared_memory.SharedMemory(name=specs['block'])
+        views = self.get_views()
+        self.attach_time = time() - start_time
+
+        return views
+
+    def get_specs(self):
+        """
+
+        Returns:
+            A dictionary of the block name and the offset, shape and dtype of each array; small enough to pass to other
+            processes.
+
+        """
+        return self.specs
+
+    def get_views(self):
+        """
+
+        Returns:
+            A dictionary of the array names and views of the arrays in the shared memory block.
+
+        """
+        return {name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=self.block.buf, offset=offset)
+                for name, (offset, shape, dtype) in self.specs['arrays'].items()}
+
+    def get_size(self):
+        """
+
+        Returns:
+            The size, in bytes, of the shared memory block.
+
+        """
+        return self.block.size if self.block else 0
+
+    def close(self):
+        """
+
+        Returns:
+            Nothing, but closes this process's access to the block.
+
+        """
+        if self.block:
+            self.block.close()
+
+    def unlink(self):
+        """
+
+        Returns:
+            Nothing, but frees the block; only the process that created the block should unlink it.
+
+        """
+        if self.block:
+            self.block.unlink()
+            self.block = None
+
+
+def get_process_memory():
+    """
+
+    Returns:
+        A dictionary of the resident set size (rss) of this process and its unique set size (uss), i.e., the memory
+        not shared with other processes, in bytes; values that cannot be determined on the platform are None.
+
+    Note:
+        On Linux, both are read from /proc; elsewhere the rss is the peak rss reported by the resource module, if
+        available.
+
+    """
+    memory = {'rss': None, 'uss': None}
+    try:
+        with open('/proc/self/smaps_rollup') as file:
+            values = dict()
+            for line in file:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == 'kB':
+                    values[parts[0].rstrip(':')] = int(parts[1]) * 1024
+        memory['rss'] = values.get('Rss')
+        memory['uss'] = values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+    except OSError:
+        if resource:
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            memory['rss'] = maxrss if sys.platform == 'darwin' else maxrss * 1024  # bytes on macOS, kilobytes elsewhere
+
+    return memory
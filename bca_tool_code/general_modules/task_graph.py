@@ -0,0 +1,210 @@
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from time import time
+
+
+class TaskGraph:
+    """
+
+    The TaskGraph class holds named tasks and the names of the tasks each depends on, runs them on a thread pool as
+    soon as their dependencies are complete, and records the start and end time of each task.
+
+    Note:
+        Dependencies must be added before the tasks that depend on them so the graph cannot contain cycles; running
+        with max_workers=1 runs the tasks one after another in the order they were added. Threads overlap only work
+        that releases the GIL (e.g., reading files), so pure Python tasks gain nothing from a thread pool.
+
+    """
+    def __init__(self, name='tasks'):
+        self.name = name
+        self.tasks = dict()
+        self.task_times = dict()
+        self.elapsed_time = 0
+
+    def add_task(self, task_name, function, dependencies=None):
+        """
+
+        Parameters:
+            task_name: str; a unique name for the task.\n
+            function: callable; the function, taking no arguments, that carries out the task.\n
+            dependencies: List; the names of tasks that must be complete before this task starts.
+
+        Returns:
+            Nothing, but adds the task to the graph.
+
+        """
+        dependencies = list(dependencies) if dependencies else list()
+        for dependency in dependencies:
+            if dependency not in self.tasks:
+                raise ValueError(f'{task_name} depends on {dependency}, which has not been added to {self.name}.')
+        self.tasks[task_name] = {'function': function, 'dependencies': dependencies}
+
+    def add_stages(self, stages):
+        """
+
+        Parameters:
+            stages: List; dictionaries, one per stage, of the stage 'name', the 'function' that carries it out and the
+            names of the 'inputs' it reads and the 'outputs' it writes.
+
+        Returns:
+            Nothing, but adds a task for each stage that depends on the stages writing its inputs; stages can be passed
+            in any order and are added in dependency order.
+
+        Note:
+            Inputs not written by any of the passed stages (e.g., fleet data) are assumed to be available; each output
+            can be written by only one stage.
+
+        """
+        writers = dict()
+        for stage in stages:
+            for output in stage['outputs']:
+                if output in writers:
+                    raise ValueError(f'{output} is written by both {writers[output]} and {stage["name"]}.')
+                writers[output] = stage['name']
+
+        dependencies = dict()
+        for stage in stages:
+            stage_dependencies = [writers[item] for item in stage['inputs']
+                                  if item in writers and writers[item] != stage['name']]
+            dependencies[stage['name']] = list(dict.fromkeys(stage_dependencies))
+
+        remaining = list(stages)
+        while remaining:
+            ready = [stage for stage in remaining
+                     if all(dependency in self.tasks for dependency in dependencies[stage['name']])]
+            if not ready:
+                raise ValueError(f'The inputs and outputs of {[stage["name"] for stage in remaining]} form a cycle.')
+            for stage in ready:
+                self.add_task(stage['name'], stage['function'], dependencies[stage['name']])
+                remaining.remove(stage)
+
+    def run(self, max_workers=None):
+        """
+
+        Parameters:
+            max_workers: int; the number of threads to use; None uses the ThreadPoolExecutor default.
+
+        Returns:
+            Nothing, but runs all tasks and updates task_times with the (start, end) time, relative to the start of the
+            run, of each task.
+
+        """
+        self.task_times = dict()
+        start_time = time()
+
+        if max_workers == 1:
+            for task_name in self.tasks:
+                self.run_task(task_name, start_time)
+        else:
+            remaining = {task_name: set(task['dependencies']) for task_name, task in self.tasks.items()}
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                running = dict()
+                while remaining or running:
+                    ready = [task_name for task_name, dependencies in remaining.items() if not dependencies]
+                    for task_name in ready:
+                        del remaining[task_name]
+                        running[executor.submit(self.run_task, task_name, start_time)] = task_name
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        task_name = running.pop(future)
+                        future.result()  # re-raises any exception from the task
+                        for dependencies in remaining.values():
+                            dependencies.discard(task_name)
+
+        self.elapsed_time = time() - start_time
+
+    def run_task(self, task_name, start_time):
+        """
+
+        Parameters:
+            task_name: str; the name of the task to run.\n
+            start_time: float; the start time of the run.
+
+        Returns:
+            Nothing, but runs the task and records its start and end time relative to start_time.
+
+        """
+        task_start = time() - start_time
+        self.tasks[task_name]['function']()
+        self.task_times[task_name] = (task_start, time() - start_time)
+
+    def get_task_time(self, task_name):
+        """
+
+        Parameters:
+            task_name: str; the name of the task.
+
+        Returns:
+            The wall time, in seconds, taken by the task.
+
+        """
+        task_start, task_end = self.task_times[task_name]
+
+        return task_end - task_start
+
+    def get_dependents(self, task_names):
+        """
+
+        Parameters:
+            task_names: List; the names of tasks.
+
+        Returns:
+            A list, in the order added, of the passed tasks and every task that depends on them directly or indirectly.
+
+        """
+        dependents = set(task_names)
+        for task_name, task in self.tasks.items():
+            if dependents.intersection(task['dependencies']):
+                dependents.add(task_name)
+
+        return [task_name for task_name in self.tasks if task_name in dependents]
+
+    def get_critical_path(self):
+        """
+
+        Returns:
+            A list of task names making up the longest chain of dependent tasks, by recorded wall time, and the total
+            wall time of that chain.
+
+        """
+        path_time = dict()
+        predecessor = dict()
+        for task_name, task in self.tasks.items():
+            if task_name not in self.task_times:
+                continue
+            dependencies = [dependency for dependency in task['dependencies'] if dependency in path_time]
+            longest = max(dependencies, key=lambda dependency: path_time[dependency], default=None)
+            predecessor[task_name] = longest
+            path_time[task_name] = self.get_task_time(task_name) + (path_time[longest] if longest else 0)
+
+        if not path_time:
+            return list(), 0
+
+        task_name = max(path_time, key=lambda name: path_time[name])
+        total_time = path_time[task_name]
+        critical_path = list()
+        while task_name:
+            critical_path.insert(0, task_name)
+            task_name = predecessor[task_name]
+
+        return critical_path, total_time
+
+    def get_summary(self):
+        """
+
+        Returns:
+            A DataFrame, in the Item/Results/Units layout of the summary log, of the wall time of each task, the
+            critical path and the elapsed time of the run.
+
+        """
+        critical_path, critical_path_time = self.get_critical_path()
+        task_names = [task_name for task_name in self.tasks if task_name in self.task_times]
+        items = [f'{self.name} time {task_name}' for task_name in task_names]
+        results = [self.get_task_time(task_name) for task_name in task_names]
+        units = ['seconds' for _ in task_names]
+
+        items += [f'{self.name} critical path', f'{self.name} critical path time', f'{self.name} elapsed time']
+        results += [' > '.join(critical_path), critical_path_time, self.elapsed_time]
+        units += ['', 'seconds', 'seconds']
+
+        return pd.DataFrame(data={'Item': items, 'Results': results, 'Units': units})
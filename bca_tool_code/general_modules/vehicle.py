@@ -1,3 +1,5 @@
+import sys
+import numpy as np
 import pandas as pd
 
 from bca_tool_code.general_input_modules.general_functions import read_input_file
@@ -16,6 +18,62 @@ class Vehicle:
     year_id_max = 0
     year_ids = 0
 
+    # the MOVES fleet file schema; parsing follows these dtypes for the columns present in the file
+    input_dtypes = {'yearID': 'int64',
+                    'sourceTypeID': 'int64',
+                    'regClassID': 'int64',
+                    'fuelTypeID': 'int64',
+                    'modelYearID': 'int64',
+                    'Alternative': 'int64',
+                    'VPOP': 'float64',
+                    'VMT': 'float64',
+                    'Gallons': 'float64',
+                    'Energy_KJ': 'float64',
+                    'THC_UStons': 'float64',
+                    'CO_UStons': 'float64',
+                    'NOx_UStons': 'float64',
+                    'CO2_UStons': 'float64',
+                    'CH4_UStons': 'float64',
+                    'N2O_UStons': 'float64',
+                    'SO2_UStons': 'float64',
+                    'VOC_UStons': 'float64',
+                    'PM25_exhaust_UStons': 'float64',
+                    'PM25_brakewear_UStons': 'float64',
+                    'PM25_tirewear_UStons': 'float64',
+                    }
+
+    fueltype_names = {1: 'Gasoline',
+                      2: 'Diesel',
+                      3: 'CNG',
+                      5: 'E85-Capable',
+                      9: 'Electric',
+                      }
+    regclass_names = {10: 'MC',
+                      20: 'LDV',
+                      30: 'LDT',
+                      41: 'LHD',
+                      42: 'LHD45',
+                      46: 'MHD67',
+                      47: 'HHD8',
+                      48: 'Urban Bus',
+                      49: 'Gliders',
+                      }
+    sourcetype_names = {0: 'NotApplicable',
+                        11: 'Motorcycles',
+                        21: 'Passenger Cars',
+                        31: 'Passenger Trucks',
+                        32: 'Light Commercial Trucks',
+                        41: 'Other Buses',
+                        42: 'Transit Buses',
+                        43: 'School Buses',
+                        51: 'Refuse Trucks',
+                        52: 'Short-Haul Single Unit Trucks',
+                        53: 'Long-Haul Single Unit Trucks',
+                        54: 'Motor Homes',
+                        61: 'Short-Haul Combination Trucks',
+                        62: 'Long-Haul Combination Trucks',
+                        }
+
     def __init__(self):
         self.year_id = 0
         self.sourcetype_id = 0
@@ -83,13 +141,7 @@ class Vehicle:
             The fuel type name for the passed ID.
 
         """
-        fueltype_dict = {1: 'Gasoline',
-                         2: 'Diesel',
-                         3: 'CNG',
-                         5: 'E85-Capable',
-                         9: 'Electric',
-                         }
-        return fueltype_dict[self.fueltype_id]
+        return self.fueltype_names[self.fueltype_id]
 
     def get_regclass_name(self):
         """
@@ -98,17 +150,7 @@ class Vehicle:
             The regclass name for the passed ID.
 
         """
-        regclass_dict = {10: 'MC',
-                         20: 'LDV',
-                         30: 'LDT',
-                         41: 'LHD',
-                         42: 'LHD45',
-                         46: 'MHD67',
-                         47: 'HHD8',
-                         48: 'Urban Bus',
-                         49: 'Gliders',
-                         }
-        return regclass_dict[self.regclass_id]
+        return self.regclass_names[self.regclass_id]
 
     def get_sourcetype_name(self):
         """
@@ -117,36 +159,30 @@ class Vehicle:
             The source type name for the passed ID.
 
         """
-        sourcetype_dict = {0: 'NotApplicable',
-                           11: 'Motorcycles',
-                           21: 'Passenger Cars',
-                           31: 'Passenger Trucks',
-                           32: 'Light Commercial Trucks',
-                           41: 'Other Buses',
-                           42: 'Transit Buses',
-                           43: 'School Buses',
-                           51: 'Refuse Trucks',
-                           52: 'Short-Haul Single Unit Trucks',
-                           53: 'Long-Haul Single Unit Trucks',
-                           54: 'Motor Homes',
-                           61: 'Short-Haul Combination Trucks',
-                           62: 'Long-Haul Combination Trucks',
-                           }
-        return sourcetype_dict[self.sourcetype_id]
-
-    def init_from_file(self, filepath, options, adjustments=None):
+        return self.sourcetype_names[self.sourcetype_id]
+
+    def init_from_file(self, filepath, options, adjustments=None, fleet_cache=None):
         """
 
         Parameters:
             filepath: Path to the specified file.\n
             options: object; an instance of the Options class.\n
-            adjustments: object; an instance of the MovesAdjustments class (if applicable).
+            adjustments: object; an instance of the MovesAdjustments class (if applicable).\n
+            fleet_cache: object; an instance of the FleetCache class (if applicable).
 
         Returns:
             Reads file at filepath; creates a dictionary and other attributes specified in the class __init__.
 
+        Note:
+            If a fleet_cache is passed and holds a fleet built from the same input files, the cached fleet is used and
+            the file at filepath is not parsed.
+
         """
-        df = read_input_file(filepath)
+        if fleet_cache and self.init_from_cache(fleet_cache):
+            InputFiles().input_files_pathlist.append(filepath)
+            return
+
+        df = read_input_file(filepath, dtype=self.input_dtypes, engine='pyarrow')
 
         df = self.rename_attributes(df)
 
@@ -167,8 +203,52 @@ class Vehicle:
 
         self.create_vehicle_df(df, year_min, options, adjustments)
 
+        if fleet_cache:
+            fleet_cache.save(Vehicle.vehicle_df, {'year_id_min': int(year_min),
+                                                  'year_id_max': int(year_max),
+                                                  'attributes_to_adjust': self.attributes_to_adjust,
+                                                  })
+
         InputFiles().input_files_pathlist.append(filepath)
 
+    def init_from_cache(self, fleet_cache):
+        """
+
+        Parameters:
+            fleet_cache: object; an instance of the FleetCache class.
+
+        Returns:
+            True if the cached fleet was loaded and the Vehicle class attributes were set from it; False otherwise.
+
+        """
+        cached = fleet_cache.load()
+        if cached is None:
+            return False
+
+        df, attributes = cached
+        Vehicle.vehicle_df = df
+        Vehicle.year_id_min = attributes['year_id_min']
+        Vehicle.year_id_max = attributes['year_id_max']
+        Vehicle.year_ids = range(Vehicle.year_id_min, Vehicle.year_id_max + 1)
+        self.attributes_to_adjust = attributes['attributes_to_adjust']
+
+        return True
+
+    def init_from_attributes(self, attributes):
+        """
+
+        Parameters:
+            attributes: Dictionary; the year_id_min and year_id_max Vehicle class attributes of a fleet created in
+            another process.
+
+        Returns:
+            Nothing, but sets the Vehicle class year attributes; Vehicle.vehicle_df is left empty.
+
+        """
+        Vehicle.year_id_min = attributes['year_id_min']
+        Vehicle.year_id_max = attributes['year_id_max']
+        Vehicle.year_ids = range(Vehicle.year_id_min, Vehicle.year_id_max + 1)
+
     def get_age0_min_year(self, df, attribute):
         """
 
@@ -217,15 +297,11 @@ class Vehicle:
 
         _df = pd.DataFrame(_df.loc[_df['modelyear_id'] >= year_min, :]).reset_index(drop=True)
 
-        # select only the options included in the options.csv input file
+        # select only the options included in the options.csv input file, in the order of that file
         option_id_list = [key for key in options._dict.keys()]
-        df_alts = dict()
-        df_return = pd.DataFrame()
-        for alt in option_id_list:
-            df_alts[alt] = _df.loc[_df['option_id'] == alt, :]
-            df_return = pd.concat([df_return, df_alts[alt]], axis=0, ignore_index=True)
-
-        df_return.reset_index(drop=True, inplace=True)
+        _df = _df.loc[_df['option_id'].isin(option_id_list), :]
+        option_position = _df['option_id'].map({option_id: position for position, option_id in enumerate(option_id_list)})
+        df_return = _df.iloc[np.argsort(option_position.to_numpy(), kind='stable'), :].reset_index(drop=True)
 
         # sum the PM constituents into a single constituent
         cols = [col for col in df_return.columns if 'pm25' in col]
@@ -233,26 +309,35 @@ class Vehicle:
 
         # make adjustments to MOVES values as needed for analysis
         if adjustments:
-            vehicles = pd.Series(
-                zip(
-                    zip(df_return['sourcetype_id'], df_return['regclass_id'], df_return['fueltype_id']),
-                    df_return['option_id'])
-            ).unique()
-
-            for (vehicle, alt) in vehicles:
-                st, rc, ft = vehicle
-                adjustment = adjustments.get_attribute_value(vehicle, alt, 'percent')
-                growth = adjustments.get_attribute_value(vehicle, alt, 'growth') # remove this from here and input file?
-
-                for arg in self.attributes_to_adjust:
-                    arg_with_tech = df_return.loc[(df_return['option_id'] == alt)
-                                                  & (df_return['sourcetype_id'] == st)
-                                                  & (df_return['regclass_id'] == rc)
-                                                  & (df_return['fueltype_id'] == ft), arg] * adjustment * (1 + growth)
-                    df_return.loc[(df_return['option_id'] == alt)
-                                  & (df_return['sourcetype_id'] == st)
-                                  & (df_return['regclass_id'] == rc)
-                                  & (df_return['fueltype_id'] == ft), f'{arg}'] = arg_with_tech
+            id_cols = ['sourcetype_id', 'regclass_id', 'fueltype_id', 'option_id']
+            adjustments_df = adjustments.adjustments_df.rename(columns={
+                'sourceTypeID': 'sourcetype_id',
+                'regClassID': 'regclass_id',
+                'fuelTypeID': 'fueltype_id',
+                'optionID': 'option_id',
+                'percent': 'adjustment_percent',
+                'growth': 'adjustment_growth',
+            })
+            adjustments_df = adjustments_df[id_cols + ['adjustment_percent', 'adjustment_growth']]
+
+            duplicated = adjustments_df.loc[adjustments_df.duplicated(id_cols), id_cols].drop_duplicates()
+            if len(duplicated):
+                print(f'\nMOVES adjustments entered more than once for (sourcetype_id, regclass_id, fueltype_id, '
+                      f'option_id):\n{duplicated.to_string(index=False)}')
+                sys.exit()
+
+            df_return = df_return.merge(adjustments_df, how='left', on=id_cols, validate='many_to_one')
+
+            missing = df_return.loc[df_return['adjustment_percent'].isna(), id_cols].drop_duplicates()
+            if len(missing):
+                print(f'\nMOVES adjustments not found for (sourcetype_id, regclass_id, fueltype_id, option_id):\n'
+                      f'{missing.to_string(index=False)}')
+                sys.exit()
+
+            df_return[self.attributes_to_adjust] = df_return[self.attributes_to_adjust]\
+                .mul(df_return['adjustment_percent'], axis=0)\
+                .mul(1 + df_return['adjustment_growth'], axis=0)
+            df_return.drop(columns=['adjustment_percent', 'adjustment_growth'], inplace=True)
 
         df_return.insert(len(df_return.columns), 'vmt_per_veh', df_return['vmt'] / df_return['vpop'])
         odometer = self.calc_odometer(df_return)
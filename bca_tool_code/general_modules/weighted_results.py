@@ -1,4 +1,4 @@
-import pandas as pd
+import numpy as np
 
 
 def create_weighted_cost_dict(settings, data_object, year_max, destination_dict, arg_to_weight=None, arg_to_weight_by=None):
@@ -17,7 +17,8 @@ def create_weighted_cost_dict(settings, data_object, year_max, destination_dict,
 
     Note:
         This function is not being used.
-        This function weights 'arg_to_weight' attributes by the 'arg_to_weight_by' attribute.
+        This function weights 'arg_to_weight' attributes by the 'arg_to_weight_by' attribute, summing the weighted
+        results columns of each (vehicle_id, option_id, modelyear_id) with array operations.
         The weighting is limited by the number of year_ids (ages) to be included which is set in the general inputs file.
         The weighting is also limited to model year_ids for which sufficient data exits to include all of those ages. For
         example, if the maximum calendar year included in the input data is 2045, and the maximum numbers of ages of
@@ -27,57 +28,54 @@ def create_weighted_cost_dict(settings, data_object, year_max, destination_dict,
     """
     print(f'\nCalculating weighted {arg_to_weight}...')
 
-    wtd_result_dict = dict()
+    results = data_object.results
+    max_age_included = settings.general_inputs.config.weighted_operating_cost_thru_ageID
 
-    max_age_included = pd.to_numeric(settings.general_inputs.get_attribute_value('weighted_operating_cost_thru_ageID'))
+    rows = np.flatnonzero(results.get_column('DiscountRate') == 0)
+    (vehicle_ids, vehicle_codes), (option_ids, option_codes), (modelyear_ids, modelyear_codes), (age_ids, age_codes) \
+        = results.get_key_columns(rows)[:4]
+    modelyear_id_array = np.array(modelyear_ids, dtype=np.int64)[modelyear_codes]
+    included = (modelyear_id_array <= (year_max - max_age_included - 1)) \
+               & (np.array(age_ids, dtype=np.int64)[age_codes] <= max_age_included)
+    if arg_to_weight == 'DEFCost_PerMile':
+        included &= np.array([vehicle_id[2] for vehicle_id in vehicle_ids], dtype=np.int64)[vehicle_codes] == 2
+    rows = rows[included]
+    vehicle_codes, option_codes, modelyear_codes \
+        = vehicle_codes[included], option_codes[included], modelyear_codes[included]
 
-    keys_dr0 = [k for k,v in data_object.results.items() if v['DiscountRate'] == 0]
+    # group the rows by (vehicle_id, option_id, modelyear_id) in the order each group first appears
+    group_keys = np.ravel_multi_index((vehicle_codes, option_codes, modelyear_codes),
+                                      (len(vehicle_ids), len(option_ids), len(modelyear_ids)))
+    unique_keys, first_index, groups = np.unique(group_keys, return_index=True, return_inverse=True)
+    order = np.argsort(first_index, kind='stable')
+    group_order = np.empty_like(order)
+    group_order[order] = np.arange(len(order))
+    groups = group_order[groups]
+    first_index = first_index[order]
 
-    for key in keys_dr0:
-        vehicle_id, option_id, modelyear_id, age_id, discount_rate = key
+    weight_by = results.get_column(arg_to_weight_by)[rows]
+    numerators = np.bincount(groups, weights=results.get_column(arg_to_weight)[rows] * weight_by,
+                             minlength=len(order))
+    denominators = np.bincount(groups, weights=weight_by, minlength=len(order))
+    last_index = np.zeros(len(order), dtype=np.int64)
+    np.maximum.at(last_index, groups, np.arange(len(rows)))
+    names = {attribute_name: results.get_column(attribute_name)[rows[last_index]]
+             for attribute_name in ['optionName', 'sourceTypeName', 'regClassName', 'fuelTypeName']}
+
+    for group, index in enumerate(first_index.tolist()):
+        vehicle_id = vehicle_ids[vehicle_codes[index]]
+        option_id = option_ids[option_codes[index]]
+        modelyear_id = modelyear_ids[modelyear_codes[index]]
         sourcetype_id, regclass_id, fueltype_id = vehicle_id
-        if arg_to_weight == 'DEFCost_PerMile' and fueltype_id != 2:
-            pass
-        else:
-            if modelyear_id <= (year_max - max_age_included - 1):
-                wtd_result_dict_key = (vehicle_id, option_id, modelyear_id)
-                numerator, denominator = 0, 0
-                if wtd_result_dict_key in wtd_result_dict:
-                    numerator = wtd_result_dict[wtd_result_dict_key]['numerator']
-                    denominator = wtd_result_dict[wtd_result_dict_key]['denominator']
-                else:
-                    pass
-                if age_id <= max_age_included:
-                    arg_weight = data_object.results[key][arg_to_weight]
-                    arg_weight_by = data_object.results[key][arg_to_weight_by]
-                    numerator += arg_weight * arg_weight_by
-                    denominator += data_object.results[key][arg_to_weight_by]
-                    wtd_result_dict[wtd_result_dict_key] = {
-                        'optionID': option_id,
-                        'sourceTypeID': sourcetype_id,
-                        'regClassID': regclass_id,
-                        'fuelTypeID': fueltype_id,
-                        'modelYearID': modelyear_id,
-                        'optionName': data_object.results[key]['optionName'],
-                        'sourceTypeName': data_object.results[key]['sourceTypeName'],
-                        'regClassName': data_object.results[key]['regClassName'],
-                        'fuelTypeName': data_object.results[key]['fuelTypeName'],
-                        'numerator': numerator,
-                        'denominator': denominator
-                    }
-    for key in wtd_result_dict:
-        numerator = wtd_result_dict[key]['numerator']
-        denominator = wtd_result_dict[key]['denominator']
-        cpm = 100 * numerator / denominator
-        destination_dict[key] = {
-            'optionID': wtd_result_dict[key]['optionID'],
-            'sourceTypeID': wtd_result_dict[key]['sourceTypeID'],
-            'regClassID': wtd_result_dict[key]['regClassID'],
-            'fuelTypeID': wtd_result_dict[key]['fuelTypeID'],
-            'modelYearID': wtd_result_dict[key]['modelYearID'],
-            'optionName': wtd_result_dict[key]['optionName'],
-            'sourceTypeName': wtd_result_dict[key]['sourceTypeName'],
-            'regClassName': wtd_result_dict[key]['regClassName'],
-            'fuelTypeName': wtd_result_dict[key]['fuelTypeName'],
-            'cents_per_mile': cpm,
+        destination_dict[(vehicle_id, option_id, modelyear_id)] = {
+            'optionID': option_id,
+            'sourceTypeID': sourcetype_id,
+            'regClassID': regclass_id,
+            'fuelTypeID': fueltype_id,
+            'modelYearID': modelyear_id,
+            'optionName': names['optionName'][group],
+            'sourceTypeName': names['sourceTypeName'][group],
+            'regClassName': names['regClassName'][group],
+            'fuelTypeName': names['fuelTypeName'][group],
+            'cents_per_mile': 100 * numerators[group] / denominators[group],
         }
@@ -1,6 +1,3 @@
-import pandas as pd
-
-
 def calc_def_doserate(settings, vehicle):
     """
 
@@ -20,22 +17,23 @@ def calc_def_doserate(settings, vehicle):
     return base_doserate
 
 
-def calc_def_cost(settings, vehicle, nox_reduction=None):
+def calc_def_cost(settings, vehicle, nox_reduction=None, def_price=None):
     """
 
     Parameters:
         settings: object; the SetInputs class object.\n
         vehicle: object; an object of the Vehicle class.\n
-        nox_reduction: numeric; the nox_reduction, if applicable, for the vehicle relative to its no_action state.
+        nox_reduction: numeric; the nox_reduction, if applicable, for the vehicle relative to its no_action state.\n
+        def_price: numeric; the DEF price per gallon for the vehicle, if already looked up (see DefPrices.get_prices).
 
     Returns:
         The DEF cost per vehicle, the corresponding DEF cost, the DEF cost per mile and the gallons of DEF consumed.
 
     """
-    def_gallons_per_ton_nox_reduction \
-        = pd.to_numeric(settings.general_inputs.get_attribute_value('def_gallons_per_ton_nox_reduction'))
+    def_gallons_per_ton_nox_reduction = settings.general_inputs.config.def_gallons_per_ton_nox_reduction
 
-    def_price = settings.def_prices.get_price(vehicle.year_id)
+    if def_price is None:
+        def_price = settings.def_prices.get_price(vehicle.year_id)
     gallons_fuel = vehicle.gallons
     base_doserate = calc_def_doserate(settings, vehicle)
     # nox_reduction = calc_nox_reduction(settings, vehicle)
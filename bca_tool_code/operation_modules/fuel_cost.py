@@ -1,13 +1,12 @@
-import pandas as pd
-
-
-def calc_fuel_cost(settings, vehicle, thc_reduction=None):
+def calc_fuel_cost(settings, vehicle, thc_reduction=None, prices=None):
     """
 
     Parameters:
         settings: object; the SetInputs class object.\n
         vehicle: object; an object of the Vehicle class.\n
-        thc_reduction: numeric: the thc_reduction, if applicable, for the vehicle relative to its no_action state.
+        thc_reduction: numeric: the thc_reduction, if applicable, for the vehicle relative to its no_action state.\n
+        prices: tuple; the retail and pretax fuel prices for the vehicle, if already looked up (see
+        FuelPrices.get_prices).
 
     Returns:
         Average retail fuel cost per vehicle, retail fuel cost, pretax fuel cost and retail cost per mile, and the
@@ -18,12 +17,14 @@ def calc_fuel_cost(settings, vehicle, thc_reduction=None):
         tool although the inventory impacts are included in the MOVES runs.
 
     """
-    gallons_per_ml = pd.to_numeric(settings.general_inputs.get_attribute_value('gallons_per_ml'))
-    grams_per_short_ton = pd.to_numeric(settings.general_inputs.get_attribute_value('grams_per_short_ton'))
+    gallons_per_ml = settings.general_inputs.config.gallons_per_ml
+    grams_per_short_ton = settings.general_inputs.config.grams_per_short_ton
 
     captured_gallons = 0
-    prices = ['retail_fuel_price', 'pretax_fuel_price']
-    price_retail, price_pretax = settings.fuel_prices.get_price(vehicle.year_id, vehicle.fueltype_id, *prices)
+    if prices is None:
+        prices = settings.fuel_prices.get_price(vehicle.year_id, vehicle.fueltype_id,
+                                                'retail_fuel_price', 'pretax_fuel_price')
+    price_retail, price_pretax = prices
 
     # calculate gallons that would have evaporated without new ORVR, if applicable
     if thc_reduction and vehicle.fueltype_id == 1:
@@ -1,9 +1,11 @@
-import pandas as pd
+import sys
+from pathlib import PurePath
 from time import time
 from datetime import datetime
 
 from bca_tool_code.set_paths import SetPaths
 from bca_tool_code.general_input_modules.input_files import InputFiles
+from bca_tool_code.general_input_modules.general_functions import read_stats
 from bca_tool_code.general_input_modules.runtime_options import RuntimeOptions
 from bca_tool_code.general_input_modules.general_inputs import GeneralInputs
 from bca_tool_code.general_input_modules.deflators import Deflators
@@ -22,8 +24,11 @@ from bca_tool_code.general_input_modules.moves_adjustments import MovesAdjustmen
 
 from bca_tool_code.general_modules.vehicle import Vehicle
 from bca_tool_code.general_modules.fleet import Fleet
+from bca_tool_code.general_modules.fleet_cache import FleetCache
+from bca_tool_code.general_modules.task_graph import TaskGraph
 from bca_tool_code.general_modules.estimated_age_at_event import EstimatedAge
 from bca_tool_code.general_modules.annual_summary import AnnualSummary
+from bca_tool_code.general_modules.discount_tables import DiscountTables
 
 from bca_tool_code.general_input_modules.piece_costs import PieceCosts
 from bca_tool_code.general_input_modules.tech_penetrations import TechPenetrations
@@ -46,10 +51,18 @@ class SetInputs:
     needed within the tool.
 
     """
-    def __init__(self):
+    general_input_loads = {  # general inputs entries read when other inputs are loaded: the file_ids of those inputs
+        'dollar_basis_analysis': ['deflators'],
+        'aeo_fuel_price_case': ['fuel_prices'],
+        'no_action_alt': ['fleet'],
+    }
+
+    def __init__(self, max_workers=None, shared_fleet=None):
         set_paths = SetPaths()
+        self.max_workers = max_workers
         self.start_time = time()
         self.start_time_readable = datetime.now().strftime('%Y%m%d-%H%M%S')
+        read_stats.clear()  # the read stats of a previous run in this process are not part of this run
 
         self.runtime_options = RuntimeOptions()
         self.runtime_options.init_from_file(
@@ -67,139 +80,395 @@ class SetInputs:
         )
 
         # determine what's being run
-        self.no_action_alt = pd.to_numeric(self.general_inputs.get_attribute_value('no_action_alt'))
+        self.no_action_alt = self.general_inputs.config.no_action_alt
         self.project_name = self.general_inputs.get_attribute_value('project_name')
 
         self.input_files_pathlist = self.input_files.input_files_pathlist
 
-        self.deflators = Deflators()
-        self.deflators.init_from_file(
-            set_paths.path_inputs / self.input_files.get_filename('deflators'),
-            self.general_inputs
-        )
-        self.fuel_prices = FuelPrices()
-        self.fuel_prices.init_from_file(
-            set_paths.path_inputs / self.input_files.get_filename('fuel_prices'),
-            self.general_inputs, self.deflators
-        )
-        self.def_prices = DefPrices()
-        self.def_prices.init_from_file(
-            set_paths.path_inputs / self.input_files.get_filename('def_prices'),
-            self.general_inputs, self.deflators
-        )
+        # load the remaining inputs concurrently, each as soon as the inputs it depends on are loaded
+        self.path_inputs = set_paths.path_inputs
+        self.path_cache = set_paths.path_cache
+        self.shared_fleet = shared_fleet  # a fleet shared by another process (see Fleet.share_vehicles), if passed
+        self.base_overrides = None  # the base general inputs and input filenames, saved when overrides are first set
+        self.overrides = dict()
+        self.input_reload_graph = TaskGraph('Input reloading')
+        self.elapsed_time_reload = 0
+        self.input_file_ids = list()
+        self.input_load_graph = TaskGraph('Input loading')
+        self.add_input_tasks()
+
+        first_loaded = len(self.input_files_pathlist)
+        self.input_load_graph.run(max_workers=max_workers)
+        self.restore_load_order(first_loaded)
+
+        self.set_run_objects()
+
+        self.end_time_inputs = time()
+        self.elapsed_time_inputs = self.end_time_inputs - self.start_time
+
+    def set_run_objects(self):
+        """
+
+        Returns:
+            Nothing, but creates the objects that hold the calculations of a run (e.g., cost_calcs, estimated_age) and
+            clears the calculations held by input objects, so that each run starts from the loaded inputs.
+
+        """
+        if not self.runtime_options.calc_cap_costs:
+            return
+
+        self.warranty_cost_approach = self.general_inputs.get_attribute_value('warranty_cost_approach')
+
+        self.emission_repair_cost = EmissionRepairCost()
+        self.estimated_age = EstimatedAge()
+        self.wtd_def_cpm_dict = dict()
+        self.wtd_repair_cpm_dict = dict()
+        self.wtd_cap_fuel_cpm_dict = dict()
+        self.annual_summary_cap = AnnualSummary()
+
+        # build the discount and annuity factors once for use in discounting and in the annual summary
+        self.discount_tables = DiscountTables()
+        self.discount_tables.init_from_general_inputs(self.general_inputs, self.vehicle.year_ids)
+
+        self.engine_costs.package_cost_by_step = dict()
+        if self.replacement_costs:
+            self.replacement_costs.package_cost_by_step = dict()
+        self.markups.contribution_factors = dict()
+
+        # calculate year-over-year engine sales
+        self.fleet.sales_by_start_year = dict()
+        self.fleet.engine_sales()
+
+        # calculate year-over-year cumulative engine sales (for use in learning effects)
+        self.fleet.cumulative_engine_sales(self.engine_costs.standardyear_ids)
+
+        self.cost_calcs = CostCalcs(fused=self.runtime_options.fused_cost_calcs,
+                                    parallel_options=self.runtime_options.parallel_options)
+
+    def set_overrides(self, overrides):
+        """
+
+        Parameters:
+            overrides: Dictionary; BCA_General_Inputs entries (e.g., learning_rate) or Input_Files file_ids (e.g.,
+            engine_costs) and the value or filename to use in place of the base input; an empty dictionary restores the
+            base inputs.
+
+        Returns:
+            Nothing, but sets the general inputs and input filenames to the base inputs updated with the overrides,
+            reloads only the inputs affected by a change from the current overrides (along with the inputs that depend on
+            them) and sets new run objects.
+
+        Note:
+            General inputs entries not read when loading other inputs (see general_input_loads) are read during the
+            calculations, so changing them requires no reload.
+
+        """
+        if self.base_overrides is None:
+            self.base_overrides = {
+                'general_inputs': {item: dict(entry) for item, entry in self.general_inputs._dict.items()},
+                'input_files': {file_id: dict(entry) for file_id, entry in self.input_files._dict.items()},
+            }
+
+        for item in overrides:
+            if item == 'bca_inputs' or (item not in self.input_files._dict and item not in self.general_inputs._dict):
+                print(f'\n{item} is not a BCA_General_Inputs entry or an Input_Files file_id that can be overridden.')
+                sys.exit()
+
+        items = list({**self.overrides, **overrides})
+        previous_values = [self.get_override_value(item) for item in items]
+
+        self.general_inputs._dict = {item: dict(entry)
+                                     for item, entry in self.base_overrides['general_inputs'].items()}
+        self.input_files._dict = {file_id: dict(entry)
+                                  for file_id, entry in self.base_overrides['input_files'].items()}
+        for item, value in overrides.items():
+            if item in self.input_files._dict:
+                self.input_files._dict[item]['UserEntry.csv'] = value
+            else:
+                self.general_inputs._dict[item]['UserEntry'] = value
+        self.general_inputs.set_config()
+        self.overrides = dict(overrides)
+        changed = [item for item, previous_value in zip(items, previous_values)
+                   if self.get_override_value(item) != previous_value]
+        self.no_action_alt = self.general_inputs.config.no_action_alt
+
+        file_ids = list()
+        for item in changed:
+            if item in self.input_files._dict:
+                file_ids.append(item)
+            else:
+                file_ids += self.general_input_loads.get(item, list())
+        file_ids = [file_id for file_id in file_ids if file_id in self.input_load_graph.tasks]
+
+        start_time = time()
+        reload_ids = self.input_load_graph.get_dependents(file_ids)
+        self.input_reload_graph = TaskGraph('Input reloading')
+        for file_id in reload_ids:
+            task = self.input_load_graph.tasks[file_id]
+            self.input_reload_graph.add_task(
+                file_id, task['function'],
+                [dependency for dependency in task['dependencies'] if dependency in reload_ids]
+            )
+        loaded = len(self.input_files_pathlist)
+        self.input_reload_graph.run(max_workers=self.max_workers)
+        del self.input_files_pathlist[loaded:]
+
+        self.set_run_objects()
+        self.elapsed_time_reload = time() - start_time
+
+    def get_override_value(self, item):
+        """
+
+        Parameters:
+            item: str; a BCA_General_Inputs entry or an Input_Files file_id.
+
+        Returns:
+            The current value of the general inputs entry or the current filename of the input file.
+
+        """
+        if item in self.input_files._dict:
+            return self.input_files.get_filename(item)
+
+        return self.general_inputs.get_attribute_value(item)
+
+    def get_input_path(self, file_id):
+        """
+
+        Parameters:
+            file_id: str; the file_id stipulated in the InputFiles.csv file (e.g., deflators).
 
-        if self.runtime_options.calc_cap_costs:
+        Returns:
+            The path to the input file associated with file_id.
+
+        """
+        return self.path_inputs / self.input_files.get_filename(file_id)
+
+    def add_input_task(self, file_id, function, dependencies=None):
+        """
+
+        Parameters:
+            file_id: str; the file_id stipulated in the InputFiles.csv file, also used as the task name.\n
+            function: callable; the function, taking no arguments, that loads the input.\n
+            dependencies: List; the file_ids of inputs that must be loaded before this input.
+
+        Returns:
+            Nothing, but adds the load task to input_load_graph.
+
+        """
+        self.input_file_ids.append(file_id)
+        self.input_load_graph.add_task(file_id, function, dependencies)
+
+    def add_input_tasks(self):
+        """
+
+        Returns:
+            Nothing, but adds a load task, with its dependencies, to input_load_graph for each input file used in the
+            run.
+
+        Note:
+            Only the dependencies declared here are respected when loading concurrently (deflators before priced
+            inputs, options and moves_adjustments before fleet). An input class that uses another input object must
+            declare that input as a dependency.
+
+        """
+        def load_deflators():
+            self.deflators = Deflators()
+            self.deflators.init_from_file(
+                self.get_input_path('deflators'),
+                self.general_inputs
+            )
+
+        def load_fuel_prices():
+            self.fuel_prices = FuelPrices()
+            self.fuel_prices.init_from_file(
+                self.get_input_path('fuel_prices'),
+                self.general_inputs, self.deflators
+            )
+
+        def load_def_prices():
+            self.def_prices = DefPrices()
+            self.def_prices.init_from_file(
+                self.get_input_path('def_prices'),
+                self.general_inputs, self.deflators
+            )
+
+        self.add_input_task('deflators', load_deflators)
+        self.add_input_task('fuel_prices', load_fuel_prices, ['deflators'])
+        self.add_input_task('def_prices', load_def_prices, ['deflators'])
+
+        if not self.runtime_options.calc_cap_costs:
+            return
+
+        def load_options():
             self.options = Options()
             self.options.init_from_file(
-                set_paths.path_inputs / self.input_files.get_filename('options')
+                self.get_input_path('options')
             )
+
+        def load_techpens():
             self.techpens = TechPenetrations()
             self.techpens.init_from_file(
-                set_paths.path_inputs / self.input_files.get_filename('techpens'), 'engine_id',
+                self.get_input_path('techpens'), 'engine_id',
             )
+
+        def load_moves_adjustments():
             self.moves_adj = MovesAdjustments()
             self.moves_adj.init_from_file(
-                set_paths.path_inputs / self.input_files.get_filename('moves_adjustments')
+                self.get_input_path('moves_adjustments')
+            )
+
+        def load_fleet():
+            if self.shared_fleet:
+                self.vehicle = Vehicle()
+                self.vehicle.init_from_attributes(self.shared_fleet['vehicle'])
+                self.fleet = Fleet()
+                self.fleet.attach_vehicles(self.shared_fleet)
+                return
+            self.fleet_cache = FleetCache(
+                self.path_cache,
+                [self.get_input_path(file_id) for file_id in ['fleet', 'options', 'moves_adjustments']]
             )
             self.vehicle = Vehicle()
             self.vehicle.init_from_file(
-                set_paths.path_inputs / self.input_files.get_filename('fleet'),
-                self.options, adjustments=self.moves_adj
+                self.get_input_path('fleet'),
+                self.options, adjustments=self.moves_adj, fleet_cache=self.fleet_cache
             )
             self.fleet = Fleet()
             self.fleet.create_vehicles(self.no_action_alt, self.options)
 
+        def load_engine_costs():
             self.engine_costs = PieceCosts()
             self.engine_costs.init_from_file(
-                set_paths.path_inputs / self.input_files.get_filename('engine_costs'),
+                self.get_input_path('engine_costs'),
                 'engine_id', self.general_inputs, self.deflators
             )
+
+        def load_replacement_costs():
             try:
-                set_paths.path_inputs / self.input_files.get_filename('replacement_costs')
+                self.get_input_path('replacement_costs')
                 self.replacement_costs = PieceCosts()
                 self.replacement_costs.init_from_file(
-                    set_paths.path_inputs / self.input_files.get_filename('replacement_costs'),
+                    self.get_input_path('replacement_costs'),
                     'engine_id', self.general_inputs, self.deflators
                 )
             except:
                 self.replacement_costs = None
 
+        def load_engine_learning_scalers():
             self.engine_learning_scalers = EngineLearningScalers()
             self.engine_learning_scalers.init_from_file(
-                set_paths.path_inputs / self.input_files.get_filename('engine_learning_scalers')
+                self.get_input_path('engine_learning_scalers')
             )
+
+        def load_markups():
             self.markups = Markups()
             self.markups.init_from_file(
-                set_paths.path_inputs / self.input_files.get_filename('markups')
+                self.get_input_path('markups')
             )
+
+        def load_warranty():
             self.warranty = Warranty()
             self.warranty.init_from_file(
-                set_paths.path_inputs / self.input_files.get_filename('warranty')
+                self.get_input_path('warranty')
             )
+
+        def load_warranty_extended():
             self.warranty_extended = WarrantyExtended()
             self.warranty_extended.init_from_file(
-                set_paths.path_inputs / self.input_files.get_filename('warranty_extended')
+                self.get_input_path('warranty_extended')
             )
+
+        def load_warranty_base_costs():
             self.warranty_base_costs = BaseWarrantyCosts()
             self.warranty_base_costs.init_from_file(
-                set_paths.path_inputs / self.input_files.get_filename('base_warranty_costs'),
+                self.get_input_path('base_warranty_costs'),
                 self.general_inputs, self.deflators
             )
+
+        def load_warranty_new_tech_adj():
             try:
-                set_paths.path_inputs / self.input_files.get_filename('warranty_new_tech_adj_factor')
+                self.get_input_path('warranty_new_tech_adj_factor')
                 self.warranty_new_tech_adj = WarrantyNewTechAdj()
                 self.warranty_new_tech_adj.init_from_file(
-                    set_paths.path_inputs / self.input_files.get_filename('warranty_new_tech_adj_factor'),
+                    self.get_input_path('warranty_new_tech_adj_factor'),
                 )
             except:
                 self.warranty_new_tech_adj = None
 
-            self.warranty_cost_approach = self.general_inputs.get_attribute_value('warranty_cost_approach')
-
+        def load_useful_life():
             self.useful_life = UsefulLife()
             self.useful_life.init_from_file(
-                set_paths.path_inputs / self.input_files.get_filename('useful_life')
+                self.get_input_path('useful_life')
             )
+
+        def load_average_speed():
             self.average_speed = AverageSpeed()
             self.average_speed.init_from_file(
-                set_paths.path_inputs / self.input_files.get_filename('average_speed')
+                self.get_input_path('average_speed')
             )
+
+        def load_def_doserates():
             self.def_doserates = DefDoseRates()
             self.def_doserates.init_from_file(
-                set_paths.path_inputs / self.input_files.get_filename('def_doserates')
+                self.get_input_path('def_doserates')
             )
+
+        def load_orvr_fuelchanges():
             self.orvr_fuelchanges_cap = OrvrFuelChanges()
             self.orvr_fuelchanges_cap.init_from_file(
-                set_paths.path_inputs / self.input_files.get_filename('orvr_fuelchanges_cap')
+                self.get_input_path('orvr_fuelchanges_cap')
             )
+
+        def load_repair_and_maintenance():
             self.repair_and_maintenance = RepairAndMaintenance()
             self.repair_and_maintenance.init_from_file(
-                set_paths.path_inputs / self.input_files.get_filename('repair_and_maintenance'),
+                self.get_input_path('repair_and_maintenance'),
                 self.general_inputs, self.deflators
             )
+
+        def load_repair_calc_attribute():
             self.repair_calc_attr = RepairCalcAttribute()
             self.repair_calc_attr.init_from_file(
-                set_paths.path_inputs / self.input_files.get_filename('repair_calc_attribute')
+                self.get_input_path('repair_calc_attribute')
             )
-            self.emission_repair_cost = EmissionRepairCost()
-            self.estimated_age = EstimatedAge()
-            self.wtd_def_cpm_dict = dict()
-            self.wtd_repair_cpm_dict = dict()
-            self.wtd_cap_fuel_cpm_dict = dict()
-            self.annual_summary_cap = AnnualSummary()
 
-        if self.runtime_options.calc_cap_costs:
+        self.add_input_task('options', load_options)
+        self.add_input_task('techpens', load_techpens)
+        self.add_input_task('moves_adjustments', load_moves_adjustments)
+        self.add_input_task('fleet', load_fleet, ['options', 'moves_adjustments'])
+        self.add_input_task('engine_costs', load_engine_costs, ['deflators'])
+        self.add_input_task('replacement_costs', load_replacement_costs, ['deflators'])
+        self.add_input_task('engine_learning_scalers', load_engine_learning_scalers)
+        self.add_input_task('markups', load_markups)
+        self.add_input_task('warranty', load_warranty)
+        self.add_input_task('warranty_extended', load_warranty_extended)
+        self.add_input_task('base_warranty_costs', load_warranty_base_costs, ['deflators'])
+        self.add_input_task('warranty_new_tech_adj_factor', load_warranty_new_tech_adj)
+        self.add_input_task('useful_life', load_useful_life)
+        self.add_input_task('average_speed', load_average_speed)
+        self.add_input_task('def_doserates', load_def_doserates)
+        self.add_input_task('orvr_fuelchanges_cap', load_orvr_fuelchanges)
+        self.add_input_task('repair_and_maintenance', load_repair_and_maintenance, ['deflators'])
+        self.add_input_task('repair_calc_attribute', load_repair_calc_attribute)
 
-            # calculate year-over-year engine sales
-            for vehicle in self.fleet.vehicles_age0:
-                self.fleet.engine_sales(vehicle)
+    def restore_load_order(self, first_loaded):
+        """
 
-            # calculate year-over-year cumulative engine sales (for use in learning effects)
-            for vehicle in self.fleet.vehicles_age0:
-                for start_year in self.engine_costs.standardyear_ids:
-                    self.fleet.cumulative_engine_sales(vehicle, start_year)
+        Parameters:
+            first_loaded: int; the number of entries in input_files_pathlist before the concurrent loads began.
 
-            self.cost_calcs = CostCalcs()
+        Returns:
+            Nothing, but reorders the entries added to input_files_pathlist and read_stats by the concurrent loads into
+            the order in which the load tasks were added, i.e., the order of a sequential load.
 
-        self.end_time_inputs = time()
-        self.elapsed_time_inputs = self.end_time_inputs - self.start_time
+        """
+        load_order = [self.get_input_path(file_id) for file_id in self.input_file_ids
+                      if file_id in self.input_files._dict]
+        load_order += [file_path for file_path in self.input_files_pathlist[first_loaded:] if file_path not in load_order]
+        self.input_files_pathlist[first_loaded:] \
+            = sorted(self.input_files_pathlist[first_loaded:], key=lambda file_path: load_order.index(file_path))
+
+        file_order = [PurePath(file_path).name for file_path in load_order]
+        loaded_stats = [stats for stats in read_stats if stats['file'] in file_order]
+        other_stats = [stats for stats in read_stats if stats['file'] not in file_order]
+        read_stats[:] = other_stats + sorted(loaded_stats, key=lambda stats: file_order.index(stats['file']))
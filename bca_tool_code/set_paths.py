@@ -14,6 +14,7 @@ class SetPaths:
         self.path_inputs = self.path_project / 'inputs'
         self.path_outputs = self.path_project / 'outputs'
         self.path_test = self.path_project / 'test'
+        self.path_cache = self.path_project / 'cache'
 
     def files_in_code_folder(self):
         """
@@ -0,0 +1,268 @@
+"""
+
+**INPUT FILE FORMAT**
+
+The scenarios file lists the input overrides of each scenario of a batch run, one row per override.
+
+File Type
+    comma-separated values (CSV)
+
+Sample Data Columns
+    .. csv-table::
+        :widths: auto
+
+        scenario_id,item,user_entry,notes
+        base,,,a scenario with a blank item runs the base inputs
+        low_oil,aeo_fuel_price_case,Low oil price,
+        learning_0.1,learning_rate,-0.1,
+        alt_engine_costs,engine_costs,EngineCosts_alt.csv,a file_id of the Input_Files file and a file in the inputs folder
+
+Data Column Name and Description
+    :scenario_id:
+        The name of the scenario; outputs are saved to a subfolder of this name.
+
+    :item:
+        A BCA_General_Inputs entry (e.g., learning_rate) or an Input_Files file_id (e.g., engine_costs) to override.
+
+    :user_entry:
+        The value of the BCA_General_Inputs entry or the filename of the input file to use in the scenario.
+
+    :notes:
+        User input area, if desired; ignored in-code.
+
+----
+
+**CODE**
+
+"""
+import os
+import sys
+import shutil
+import multiprocessing
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from time import time
+
+import bca_tool_code
+from bca_tool_code.set_inputs import SetInputs
+from bca_tool_code.set_paths import SetPaths
+from bca_tool_code.tool_main import save_outputs
+import bca_tool_code.general_input_modules.general_functions as gen_fxns
+
+_batch_settings = None  # the SetInputs object inherited by forked scenario worker processes
+
+
+def read_scenarios(filepath):
+    """
+
+    Parameters:
+        filepath: Path; the scenarios file.
+
+    Returns:
+        A dictionary of the scenario_ids, in the order first listed, and the dictionary of overrides of each.
+
+    """
+    df = gen_fxns.read_input_file(filepath, usecols=lambda x: 'notes' not in x)
+
+    scenarios = dict()
+    for scenario_id, item, value in zip(df['scenario_id'], df['item'], df['user_entry']):
+        overrides = scenarios.setdefault(str(scenario_id), dict())
+        if pd.isna(item):
+            continue
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)  # e.g., a dollar_basis_analysis read as 2018.0 in a column with blanks
+        overrides[str(item)] = str(value)
+
+    return scenarios
+
+
+def run_scenario(settings, scenario_id, overrides, path_of_run_folder, stamp):
+    """
+
+    Parameters:
+        settings: object; the SetInputs class object holding the loaded inputs.\n
+        scenario_id: str; the scenario name.\n
+        overrides: Dictionary; the input overrides of the scenario (see SetInputs.set_overrides).\n
+        path_of_run_folder: Path; the batch run folder, in which a folder for the scenario is created.\n
+        stamp: str; the stamp of the batch run.
+
+    Returns:
+        A dictionary of the scenario's overrides, run times and output folder, and the scenario's annual summary
+        DataFrame (or None).
+
+    """
+    print(f'\nRunning scenario {scenario_id}...\n')
+    settings.set_overrides(overrides)
+
+    start_time_calcs = time()
+    if settings.runtime_options.calc_cap_costs:
+        settings.cost_calcs.calc_results(settings)
+
+    start_time_outputs = time()
+    path_of_scenario_folder = path_of_run_folder / scenario_id
+    path_of_scenario_results_folder = path_of_scenario_folder / 'run_results'
+    path_of_scenario_results_folder.mkdir(parents=True, exist_ok=False)
+    path_of_scenario_modified_inputs_folder = path_of_scenario_folder / 'modified_inputs'
+    path_of_scenario_modified_inputs_folder.mkdir(exist_ok=False)
+
+    # copy the input files the scenario uses in place of the base input files
+    override_files = [value for item, value in overrides.items() if item in settings.input_files._dict]
+    if override_files:
+        path_of_scenario_inputs_folder = path_of_scenario_folder / 'run_inputs'
+        path_of_scenario_inputs_folder.mkdir(exist_ok=False)
+        for file in override_files:
+            shutil.copy2(settings.path_inputs / file, path_of_scenario_inputs_folder / file)
+
+    annual_summary_df = save_outputs(settings, path_of_scenario_results_folder,
+                                     path_of_scenario_modified_inputs_folder, f'{stamp}_{scenario_id}')
+
+    scenario_summary = {
+        'ScenarioID': scenario_id,
+        'Overrides': '; '.join(f'{item}={value}' for item, value in overrides.items()),
+        'Reloaded inputs': ', '.join(settings.input_reload_graph.tasks),
+        'Elapsed time reload inputs': settings.elapsed_time_reload,
+        'Elapsed time calculations': start_time_outputs - start_time_calcs,
+        'Elapsed time save outputs': time() - start_time_outputs,
+        'Output folder': path_of_scenario_folder,
+    }
+
+    return scenario_summary, annual_summary_df
+
+
+def run_scenario_in_worker(scenario_id, overrides, path_of_run_folder, stamp):
+    """
+    This function runs a scenario in a worker process forked by run_batch.
+
+    Parameters:
+        scenario_id: str; the scenario name.\n
+        overrides: Dictionary; the input overrides of the scenario.\n
+        path_of_run_folder: Path; the batch run folder.\n
+        stamp: str; the stamp of the batch run.
+
+    Returns:
+        The scenario summary and annual summary DataFrame returned by run_scenario.
+
+    """
+    return run_scenario(_batch_settings, scenario_id, overrides, path_of_run_folder, stamp)
+
+
+def run_batch(scenarios_path, parallel=False):
+    """
+    This function runs each scenario of a scenarios file, loading the inputs once and reloading, for each scenario,
+    only the inputs it overrides and the inputs that depend on them.
+
+    Parameters:
+        scenarios_path: Path; the scenarios file, in the inputs folder or at the passed path.\n
+        parallel: bool; True runs the scenarios in parallel worker processes (where fork is available), False runs them
+        back to back.
+
+    Returns:
+        Nothing, but saves the outputs of each scenario to its own folder of the batch run folder, along with a scenario
+        summary and the annual summaries of all scenarios combined.
+
+    """
+    global _batch_settings
+
+    set_paths = SetPaths()
+    scenarios_path = Path(scenarios_path)
+    if not scenarios_path.exists():
+        scenarios_path = set_paths.path_inputs / scenarios_path.name
+
+    settings = SetInputs()
+    scenarios = read_scenarios(scenarios_path)
+    stamp = f'{settings.project_name}_{settings.start_time_readable}'
+
+    path_of_run_folder, path_of_run_inputs_folder, path_of_run_results_folder, path_of_modified_inputs_folder, path_of_code_folder \
+        = set_paths.create_output_paths(settings.start_time_readable, scenarios_path.stem)
+
+    for file in gen_fxns.inputs_filenames(settings.input_files_pathlist):
+        shutil.copy2(set_paths.path_inputs / file, path_of_run_inputs_folder / file)
+    shutil.copy2(scenarios_path, path_of_run_inputs_folder / scenarios_path.name)
+    try:
+        set_paths.copy_code_to_destination(path_of_code_folder)
+        shutil.copy2(set_paths.path_project / 'requirements.txt', path_of_run_folder)
+    except Exception:
+        print('\nUnable to copy Python code to run results folder when using the executable.\n')
+
+    start_time_scenarios = time()
+    if parallel and 'fork' not in multiprocessing.get_all_start_methods():
+        print('\nWorker processes cannot be forked on this platform; running scenarios back to back.')
+        parallel = False
+
+    if parallel:
+        _batch_settings = settings
+        try:
+            max_workers = min(len(scenarios), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=max_workers,
+                                     mp_context=multiprocessing.get_context('fork')) as executor:
+                futures = [executor.submit(run_scenario_in_worker, scenario_id, overrides, path_of_run_folder, stamp)
+                           for scenario_id, overrides in scenarios.items()]
+                scenario_results = [future.result() for future in futures]
+        finally:
+            _batch_settings = None
+    else:
+        scenario_results = [run_scenario(settings, scenario_id, overrides, path_of_run_folder, stamp)
+                            for scenario_id, overrides in scenarios.items()]
+
+    end_time = time()
+
+    scenario_summary = pd.DataFrame([summary for summary, annual_summary_df in scenario_results])
+    scenario_summary.to_csv(path_of_run_results_folder / f'scenario_summary_{stamp}.csv', index=False)
+
+    annual_summaries = [annual_summary_df.assign(ScenarioID=summary['ScenarioID'])
+                        for summary, annual_summary_df in scenario_results if annual_summary_df is not None]
+    if annual_summaries:
+        annual_summary = pd.concat(annual_summaries, axis=0, ignore_index=True)
+        annual_summary.insert(0, 'ScenarioID', annual_summary.pop('ScenarioID'))
+        annual_summary.to_csv(path_of_run_results_folder / f'annual_summary_all_scenarios_{stamp}.csv', index=False)
+
+    summary_log = pd.DataFrame(
+        data={
+            'Item': [
+                'Version',
+                'Run folder',
+                'Scenarios',
+                'Scenario runs',
+                'Start of run',
+                'End of run',
+                'Elapsed time read inputs',
+                'Elapsed time scenarios',
+                'Elapsed runtime',
+            ],
+            'Results': [
+                bca_tool_code.__version__,
+                path_of_run_folder,
+                len(scenarios),
+                'parallel' if parallel else 'back to back',
+                settings.start_time_readable,
+                datetime.now().strftime('%Y%m%d-%H%M%S'),
+                settings.elapsed_time_inputs,
+                end_time - start_time_scenarios,
+                end_time - settings.start_time,
+            ],
+            'Units': [
+                '',
+                '',
+                'scenarios',
+                '',
+                'YYYYmmdd-HHMMSS',
+                'YYYYmmdd-HHMMSS',
+                'seconds',
+                'seconds',
+                'seconds',
+            ]
+        })
+    summary_log = pd.concat([summary_log, settings.input_load_graph.get_summary()], axis=0, ignore_index=True)
+    summary_log.to_csv(path_of_run_results_folder / f'summary_log_{stamp}.csv', index=False)
+
+    print(f'\nOutput files have been saved to {path_of_run_folder}\n')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('\nUsage:\n    python -m bca_tool_code.tool_batch <scenarios_file> [--parallel]\n')
+        sys.exit()
+
+    run_batch(sys.argv[1], parallel='--parallel' in sys.argv[2:])
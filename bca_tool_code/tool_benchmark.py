@@ -0,0 +1,181 @@
+import sys
+import numpy as np
+import pandas as pd
+from time import time
+
+from bca_tool_code.set_inputs import SetInputs
+from bca_tool_code.general_modules.fleet import Fleet
+
+
+def run_benchmark(repeats=3):
+    """
+    This function compares the by-stage, fused and parallel-options cost calculations of CostCalcs.calc_results on the
+    same inputs.
+
+    Parameters:
+        repeats: int; the number of times to run each calculation mode.
+
+    Returns:
+        A DataFrame, in the Item/Results/Units layout of the summary log, of the best and mean calc_results time of each
+        mode, the speedup of each mode over the by-stage mode and whether each mode produced the by-stage results.
+
+    Note:
+        Inputs are loaded anew before each run so that each run starts from the same state; only calc_results is timed.
+
+    """
+    modes = {  # mode: CostCalcs attribute values
+        'by-stage': {'fused': False, 'parallel_options': False},
+        'fused': {'fused': True, 'parallel_options': False},
+        'parallel-options': {'fused': True, 'parallel_options': True},
+    }
+    run_times = {mode: list() for mode in modes}
+    results = dict()
+    for repeat in range(repeats):
+        for mode, attribute_values in modes.items():
+            settings = SetInputs()
+            if not settings.runtime_options.calc_cap_costs:
+                print('\ncalculate_cap_costs must be set to 1 in the Runtime_Options file to run the benchmark.')
+                sys.exit()
+            for attribute_name, attribute_value in attribute_values.items():
+                setattr(settings.cost_calcs, attribute_name, attribute_value)
+
+            start_time = time()
+            settings.cost_calcs.calc_results(settings)
+            run_times[mode].append(time() - start_time)
+
+            results[mode] = settings.cost_calcs.results.to_dataframe()
+
+    by_stage_df = results['by-stage']
+    numeric_cols = [col for col in by_stage_df.columns if pd.api.types.is_numeric_dtype(by_stage_df[col])]
+
+    items, values, units = list(), list(), list()
+    for mode in modes:
+        items += [f'calc_results {mode} best time', f'calc_results {mode} mean time']
+        values += [min(run_times[mode]), sum(run_times[mode]) / repeats]
+        units += ['seconds', 'seconds']
+    for mode in list(modes)[1:]:
+        df = results[mode]
+        same_results = list(by_stage_df.columns) == list(df.columns) \
+                       and by_stage_df.drop(columns=numeric_cols).equals(df.drop(columns=numeric_cols)) \
+                       and np.allclose(by_stage_df[numeric_cols].to_numpy(dtype=float),
+                                       df[numeric_cols].to_numpy(dtype=float), rtol=1e-12, atol=0, equal_nan=True)
+        items += [f'{mode} speedup (best times)', f'{mode} and by-stage results match']
+        values += [min(run_times['by-stage']) / min(run_times[mode]), same_results]
+        units += ['x', '']
+    items += ['results rows', 'repeats']
+    values += [len(by_stage_df), repeats]
+    units += ['rows', 'runs']
+
+    return pd.DataFrame(data={'Item': items, 'Results': values, 'Units': units})
+
+
+def calc_engine_sales_by_scan(table):
+    """
+    This function sums engine sales as Fleet.engine_sales did before its single pass over the age_id=0 rows, i.e., with
+    a scan of the whole fleet for each age_id=0 row having a new (engine_id, option_id, modelyear_id) key.
+
+    Parameters:
+        table: object; the FleetTable class object.
+
+    Returns:
+        A dictionary of the engine sales keyed by (engine_id, option_id, modelyear_id).
+
+    """
+    engine_codes = table.engine_codes.tolist()
+    option_ids = table.columns['option_id'].tolist()
+    modelyear_ids = table.columns['modelyear_id'].tolist()
+    age_ids = table.columns['age_id'].tolist()
+    vpops = table.columns['vpop'].tolist()
+
+    sales = dict()
+    for row in table.age0_index.tolist():
+        key = table.engine_ids[engine_codes[row]], option_ids[row], modelyear_ids[row]
+        if key not in sales:
+            sales[key] = sum([
+                vpop for engine_code, option_id, modelyear_id, age_id, vpop
+                in zip(engine_codes, option_ids, modelyear_ids, age_ids, vpops)
+                if engine_code == engine_codes[row]
+                   and option_id == option_ids[row]
+                   and modelyear_id == modelyear_ids[row]
+                   and age_id == 0
+            ])
+
+    return sales
+
+
+def run_fleet_scaling_benchmark(scales=(1, 4, 16, 32), repeats=3, scan=False):
+    """
+    This function times Fleet.engine_sales and Fleet.cumulative_engine_sales on copies of the fleet of the inputs tiled
+    to several multiples of its size.
+
+    Parameters:
+        scales: tuple; the multiples of the fleet size to time.\n
+        repeats: int; the number of times to time each method at each scale.\n
+        scan: bool; True also times, once at each scale, the scan of the whole fleet per sales key that engine_sales
+        replaced (see calc_engine_sales_by_scan) and checks that it gives the engine_sales results.
+
+    Returns:
+        A DataFrame, in the Item/Results/Units layout of the summary log, of the fleet rows, the sales keys and the best
+        time, in total and per million fleet rows, of each method at each scale.
+
+    Note:
+        Each copy of the fleet has its year_id and modelyear_id shifted by 100 years so that the fleet rows and the
+        (engine_id, option_id, modelyear_id) sales keys both grow with the scale; times per million rows that hold
+        steady across scales show that the methods scale linearly with fleet size.
+
+    """
+    settings = SetInputs()
+    base_df = pd.DataFrame({attribute: column.copy() for attribute, column in settings.fleet.table.columns.items()})
+    start_years = settings.engine_costs.standardyear_ids
+
+    items, values, units = list(), list(), list()
+    for scale in scales:
+        df = pd.concat([base_df.assign(year_id=base_df['year_id'] + 100 * copy,
+                                       modelyear_id=base_df['modelyear_id'] + 100 * copy)
+                        for copy in range(scale)], ignore_index=True)
+        fleet = Fleet()
+        fleet.table.init_from_df(df, settings.no_action_alt, settings.options)
+
+        run_times = {'engine_sales': list(), 'cumulative_engine_sales': list()}
+        for repeat in range(repeats):
+            fleet.sales_by_start_year = dict()
+            start_time = time()
+            fleet.engine_sales()
+            run_times['engine_sales'].append(time() - start_time)
+
+            start_time = time()
+            fleet.cumulative_engine_sales(start_years)
+            run_times['cumulative_engine_sales'].append(time() - start_time)
+
+        items += [f'fleet rows {scale}x', f'age_id=0 rows {scale}x', f'sales keys {scale}x']
+        values += [fleet.table.num_rows, len(fleet.table.age0_index), len(fleet.sales_by_start_year)]
+        units += ['rows', 'rows', 'keys']
+        if scan:
+            start_time = time()
+            scan_sales = calc_engine_sales_by_scan(fleet.table)
+            run_times['engine_sales by scan'] = [time() - start_time]
+            same_sales = list(scan_sales) == list(fleet.sales_by_start_year) \
+                         and all(np.isclose(sales, fleet.sales_by_start_year[key]['engine_sales'], rtol=1e-12, atol=0)
+                                 for key, sales in scan_sales.items())
+            items += [f'engine_sales by scan {scale}x results match']
+            values += [same_sales]
+            units += ['']
+        for method, times in run_times.items():
+            items += [f'{method} {scale}x best time', f'{method} {scale}x best time per million rows']
+            values += [min(times), min(times) * 1e6 / fleet.table.num_rows]
+            units += ['seconds', 'seconds']
+    items += ['repeats']
+    values += [repeats]
+    units += ['runs']
+
+    return pd.DataFrame(data={'Item': items, 'Results': values, 'Units': units})
+
+
+if __name__ == '__main__':
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    repeats = int(args[0]) if args else 3
+    if '--fleet-scaling' in sys.argv[1:]:
+        benchmark = run_fleet_scaling_benchmark(repeats=repeats, scan='--scan' in sys.argv[1:])
+    else:
+        benchmark = run_benchmark(repeats)
+    print(f'\n{benchmark.to_string(index=False)}\n')
@@ -13,10 +13,14 @@ import bca_tool_code.general_modules.create_figures
 import bca_tool_code.general_input_modules.general_functions as gen_fxns
 
 
-def main():
+def main(shards_path=None):
     """
     This is the main module of the tool.
 
+    Parameters:
+        shards_path: Path; the shared directory of shard results files (see tool_shards) to merge rather than
+        calculating costs; None calculates costs in this run.
+
     Returns:
         The results of the current run of the tool.
 
@@ -31,6 +35,7 @@ def main():
     print("\nDoing the work...\n")
 
     if settings.runtime_options.calc_cap_costs:
+        settings.cost_calcs.shards_path = shards_path
         settings.cost_calcs.calc_results(settings)
 
     end_time_calcs = start_time_outputs = time()
@@ -66,9 +71,94 @@ def main():
 
     print("\nSaving the output files...\n")
     stamp = f'{settings.project_name}_{settings.start_time_readable}'
+    save_outputs(settings, path_of_run_results_folder, path_of_modified_inputs_folder, stamp)
+
+    end_time_outputs = end_time = time()
+    elapsed_time_outputs = end_time_outputs - start_time_outputs
+    end_time_readable = datetime.now().strftime('%Y%m%d-%H%M%S')
+    elapsed_time = end_time - settings.start_time
+
+    # create and save a summary log for the run
+    summary_log = pd.DataFrame(
+        data={
+            'Item': [
+                'Version',
+                'Run folder',
+                'Calc CAP costs',
+                'Calc CAP pollution',
+                'Discount Values',
+                'Calculate Deltas',
+                'Start of run',
+                'End of run',
+                'Elapsed time read inputs',
+                'Elapsed time calculations',
+                'Elapsed time save outputs',
+                'Elapsed runtime',
+            ],
+            'Results': [
+                bca_tool_code.__version__,
+                path_of_run_folder,
+                settings.runtime_options.calc_cap_costs,
+                settings.runtime_options.calc_cap_pollution,
+                settings.runtime_options.discount_values,
+                settings.runtime_options.calc_deltas,
+                settings.start_time_readable,
+                end_time_readable,
+                settings.elapsed_time_inputs,
+                elapsed_time_calcs,
+                elapsed_time_outputs,
+                elapsed_time,
+            ],
+            'Units': [
+                '',
+                '',
+                '',
+                '',
+                '',
+                '',
+                'YYYYmmdd-HHMMSS',
+                'YYYYmmdd-HHMMSS',
+                'seconds',
+                'seconds',
+                'seconds',
+                'seconds',
+            ]
+        })
+    summary_logs = [summary_log,
+                    gen_fxns.get_file_datetime(settings.input_files_pathlist),
+                    gen_fxns.get_read_stats(),
+                    settings.input_load_graph.get_summary()]
     if settings.runtime_options.calc_cap_costs:
+        summary_logs.append(settings.cost_calcs.stage_graph.get_summary())
+        if settings.cost_calcs.worker_stats:
+            summary_logs.append(settings.cost_calcs.get_worker_summary())
+    summary_log = pd.concat(summary_logs, axis=0, sort=False, ignore_index=True)
+    summary_log.to_csv(path_of_run_results_folder / f'summary_log_{stamp}.csv', index=False)
+
+    print(f'\nOutput files have been saved to {path_of_run_folder}\n')
+
+
+def save_outputs(settings, path_of_run_results_folder, path_of_modified_inputs_folder, stamp):
+    """
+    This function saves the results of a run and the modified inputs used in it.
+
+    Parameters:
+        settings: object; the SetInputs class object of the run.\n
+        path_of_run_results_folder: Path; the folder in which to save the results.\n
+        path_of_modified_inputs_folder: Path; the folder in which to save the modified inputs.\n
+        stamp: str; the stamp to include in the output filenames.
+
+    Returns:
+        The annual summary DataFrame, or None if CAP costs were not calculated.
+
+    """
+    annual_summary_df = None
+    if settings.runtime_options.calc_cap_costs:
+        all_costs = settings.cost_calcs.results
+        if settings.cost_calcs.discounted_results is not None:
+            all_costs = settings.cost_calcs.discounted_results
         gen_fxns.save_dict(
-            settings.cost_calcs.results,
+            all_costs,
             path_of_run_results_folder / 'all_costs',
             row_header=None, stamp=stamp, index=False
         )
@@ -133,62 +223,7 @@ def main():
     settings.def_prices.def_prices_in_analysis_dollars.to_csv(path_of_modified_inputs_folder / f'def_prices_{stamp}.csv', index=True)
     settings.deflators.deflators_and_adj_factors.to_csv(path_of_modified_inputs_folder / f'deflators_{stamp}.csv', index=True)
 
-    end_time_outputs = end_time = time()
-    elapsed_time_outputs = end_time_outputs - start_time_outputs
-    end_time_readable = datetime.now().strftime('%Y%m%d-%H%M%S')
-    elapsed_time = end_time - settings.start_time
-
-    # create and save a summary log for the run
-    summary_log = pd.DataFrame(
-        data={
-            'Item': [
-                'Version',
-                'Run folder',
-                'Calc CAP costs',
-                'Calc CAP pollution',
-                'Discount Values',
-                'Calculate Deltas',
-                'Start of run',
-                'End of run',
-                'Elapsed time read inputs',
-                'Elapsed time calculations',
-                'Elapsed time save outputs',
-                'Elapsed runtime',
-            ],
-            'Results': [
-                bca_tool_code.__version__,
-                path_of_run_folder,
-                settings.runtime_options.calc_cap_costs,
-                settings.runtime_options.calc_cap_pollution,
-                settings.runtime_options.discount_values,
-                settings.runtime_options.calc_deltas,
-                settings.start_time_readable,
-                end_time_readable,
-                settings.elapsed_time_inputs,
-                elapsed_time_calcs,
-                elapsed_time_outputs,
-                elapsed_time,
-            ],
-            'Units': [
-                '',
-                '',
-                '',
-                '',
-                '',
-                '',
-                'YYYYmmdd-HHMMSS',
-                'YYYYmmdd-HHMMSS',
-                'seconds',
-                'seconds',
-                'seconds',
-                'seconds',
-            ]
-        })
-    summary_log = pd.concat([summary_log, gen_fxns.get_file_datetime(settings.input_files_pathlist)],
-                            axis=0, sort=False, ignore_index=True)
-    summary_log.to_csv(path_of_run_results_folder / f'summary_log_{stamp}.csv', index=False)
-
-    print(f'\nOutput files have been saved to {path_of_run_folder}\n')
+    return annual_summary_df
 
 
 if __name__ == '__main__':
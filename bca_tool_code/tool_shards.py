@@ -0,0 +1,91 @@
+import sys
+from pathlib import Path
+
+from bca_tool_code.set_inputs import SetInputs
+from bca_tool_code.tool_main import main
+
+
+def get_settings():
+    """
+
+    Returns:
+        The SetInputs class object, exiting if the run does not calculate CAP costs.
+
+    """
+    settings = SetInputs()
+    if not settings.runtime_options.calc_cap_costs:
+        print('\ncalculate_cap_costs must be set to 1 in the Runtime_Options file to run in shards.')
+        sys.exit()
+
+    return settings
+
+
+def run_reference(shards_path):
+    """
+    This function calculates the reference vehicle costs shared by all shards; run it once before the shards.
+
+    Parameters:
+        shards_path: Path; the shared directory of shard results files.
+
+    Returns:
+        Nothing, but saves the reference costs to the shards_path.
+
+    """
+    settings = get_settings()
+    settings.cost_calcs.calc_reference_costs(settings, shards_path)
+    print(f'\nReference costs saved to {shards_path}\n')
+
+
+def run_shard(shards_path, shard_number, num_shards):
+    """
+    This function calculates the costs of one shard of the fleet; shards can run as separate processes on separate
+    machines sharing the shards_path.
+
+    Parameters:
+        shards_path: Path; the shared directory of shard results files.\n
+        shard_number: int; the shard, from 1 through num_shards.\n
+        num_shards: int; the number of shards.
+
+    Returns:
+        Nothing, but saves the shard results to the shards_path.
+
+    """
+    settings = get_settings()
+    settings.cost_calcs.calc_shard_costs(settings, shards_path, shard_number, num_shards)
+    print(f'\nShard {shard_number} of {num_shards} saved to {shards_path}\n')
+
+
+def merge_shards(shards_path):
+    """
+    This function merges the shard results and runs the discounting, annual summary and deltas and saves the outputs
+    as a normal run of the tool would.
+
+    Parameters:
+        shards_path: Path; the shared directory of shard results files.
+
+    Returns:
+        The results of the run.
+
+    """
+    main(shards_path=shards_path)
+
+
+if __name__ == '__main__':
+    usage = '\nUsage:\n' \
+            '    python -m bca_tool_code.tool_shards reference <shards_path>\n' \
+            '    python -m bca_tool_code.tool_shards shard <shards_path> <shard_number> <number_of_shards>\n' \
+            '    python -m bca_tool_code.tool_shards merge <shards_path>\n'
+    if len(sys.argv) < 3:
+        print(usage)
+        sys.exit()
+
+    step, path = sys.argv[1], Path(sys.argv[2])
+    if step == 'reference':
+        run_reference(path)
+    elif step == 'shard' and len(sys.argv) == 5:
+        run_shard(path, int(sys.argv[3]), int(sys.argv[4]))
+    elif step == 'merge':
+        merge_shards(path)
+    else:
+        print(usage)
+        sys.exit()
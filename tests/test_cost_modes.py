@@ -0,0 +1,16 @@
+import pytest
+
+from bca_tool_code.set_paths import SetPaths
+
+INPUT_FILES = ['Input_Files.csv', 'Runtime_Options.csv', 'BCA_General_Inputs.csv', 'Fleet.csv']
+
+
+@pytest.mark.skipif(not all((SetPaths().path_inputs / file).exists() for file in INPUT_FILES),
+                    reason='requires a complete inputs folder')
+def test_fused_by_stage_and_parallel_options_results_match():
+    from bca_tool_code.tool_benchmark import run_benchmark
+
+    summary = run_benchmark(repeats=1).set_index('Item')['Results']
+
+    assert summary['fused and by-stage results match']
+    assert summary['parallel-options and by-stage results match']
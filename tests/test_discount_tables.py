@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from bca_tool_code.general_input_modules.general_inputs import GeneralInputs
+from bca_tool_code.general_modules.discount_tables import DiscountTables
+
+
+def get_discount_tables(costs_start, rate_entries):
+    general_inputs = GeneralInputs()
+    general_inputs._dict = {'costs_start': {'UserEntry': costs_start}, 'discount_to_yearID': {'UserEntry': 2027}}
+    general_inputs._dict.update({name: {'UserEntry': value} for name, value in rate_entries.items()})
+    general_inputs.set_config()
+
+    discount_tables = DiscountTables()
+    discount_tables.init_from_general_inputs(general_inputs, range(2027, 2031))
+
+    return discount_tables
+
+
+def test_social_rates_in_order_entered():
+    discount_tables = get_discount_tables('start-year', {'social_discount_rate_2': 0.07, 'social_discount_rate_1': 0.03})
+    assert discount_tables.social_rates == [0.03, 0.07]
+
+    discount_tables = get_discount_tables('start-year', {'social_discount_rates': '0.07, 0.03, 0.02'})
+    assert discount_tables.social_rates == [0.07, 0.03, 0.02]
+
+
+@pytest.mark.parametrize('costs_start, offset', [('start-year', 0), ('end-year', 1)])
+def test_discount_factors(costs_start, offset):
+    discount_tables = get_discount_tables(costs_start, {'social_discount_rates': '0.03'})
+    year_ids = np.array([2027, 2028, 2030])
+
+    np.testing.assert_allclose(discount_tables.get_discount_factors(0.03, year_ids),
+                               1 / 1.03 ** (year_ids - 2027 + offset))
+    np.testing.assert_allclose(discount_tables.get_discount_factors(0, year_ids), 1)
+    np.testing.assert_allclose(discount_tables.get_discount_factors(np.array([0.03, 0.07]), 2029),
+                               [1 / 1.03 ** (2 + offset), 1 / 1.07 ** (2 + offset)])
+
+
+def test_rates_added_on_request():
+    discount_tables = get_discount_tables('start-year', {'social_discount_rates': '0.03'})
+    assert 0.04 not in discount_tables.rate_index
+
+    assert discount_tables.get_discount_factors(0.04, 2028) == pytest.approx(1 / 1.04)
+    assert 0.04 in discount_tables.rate_index
+
+
+def test_years_out_of_range_exit():
+    discount_tables = get_discount_tables('start-year', {'social_discount_rates': '0.03'})
+
+    with pytest.raises(SystemExit):
+        discount_tables.get_discount_factors(0.03, np.array([2030, 2031]))
+    with pytest.raises(SystemExit):
+        discount_tables.get_discount_factors(0.03, 2026)
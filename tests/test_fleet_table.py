@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from bca_tool_code.general_modules.fleet_table import FleetTable
+
+
+class Options:
+    def get_option_name(self, option_id):
+        return f'Option {option_id}'
+
+
+def get_fleet_df(rows):
+    df = pd.DataFrame(rows, columns=['sourcetype_id', 'regclass_id', 'fueltype_id', 'modelyear_id', 'age_id',
+                                     'option_id'])
+    df.insert(0, 'year_id', df['modelyear_id'] + df['age_id'])
+    for attribute in FleetTable.value_attributes:
+        df[attribute] = np.arange(len(df), dtype=float)
+
+    return df
+
+
+def test_align_to_no_action_matches_vehicle_modelyear_and_age():
+    df = get_fleet_df([
+        (61, 47, 2, 2027, 0, 0),
+        (61, 47, 2, 2027, 1, 0),
+        (32, 41, 1, 2027, 0, 0),
+        (32, 41, 1, 2027, 0, 1),
+        (61, 47, 2, 2027, 1, 1),
+        (61, 47, 2, 2027, 0, 1),
+        (61, 47, 2, 2028, 0, 1),
+    ])
+    table = FleetTable()
+    table.init_from_df(df, 0, Options())
+
+    np.testing.assert_array_equal(table.no_action_rows, [0, 1, 2, 2, 1, 0, -1])
+    assert table.option_names == {0: 'Option 0', 1: 'Option 1'}
+
+
+def test_align_to_no_action_without_no_action_rows():
+    df = get_fleet_df([
+        (61, 47, 2, 2027, 0, 1),
+        (61, 47, 2, 2027, 1, 1),
+    ])
+    table = FleetTable()
+    table.init_from_df(df, 0, Options())
+
+    np.testing.assert_array_equal(table.no_action_rows, [-1, -1])
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from bca_tool_code.general_modules.results_table import ResultsTable
+
+
+def get_table():
+    table = ResultsTable(('vehicle_id', 'option_id', 'modelyear_id', 'age_id', 'discount_rate'),
+                         int_columns=('CO2_UStons',))
+    table.add_rows([((61, 47, 2), 0, 2027, 0, 0), ((61, 47, 2), 1, 2027, 0, 0), ((32, 41, 1), 0, 2027, 1, 0)],
+                   {'optionName': ['Baseline', 'Action', 'Baseline'], 'DirectCost': [1.0, 2.0, 3.0],
+                    'CO2_UStons': 5})
+
+    return table
+
+
+def test_single_key_lookups():
+    table = get_table()
+
+    assert len(table) == 3
+    assert table.get_row_index(((61, 47, 2), 1, 2027, 0, 0)) == 1
+    assert table.get_row_index(((61, 47, 2), 2, 2027, 0, 0)) is None
+    assert ((32, 41, 1), 0, 2027, 1, 0) in table
+    assert table.get_attribute_value(((32, 41, 1), 0, 2027, 1, 0), 'DirectCost') == 3.0
+    assert table[((61, 47, 2), 1, 2027, 0, 0)]['optionName'] == 'Action'
+    with pytest.raises(KeyError):
+        table.get_row_index(((99, 99, 9), 0, 2027, 0, 0), required=True)
+
+
+def test_column_types():
+    table = get_table()
+
+    assert table.get_column('CO2_UStons').dtype == np.int64
+    assert table.get_column('DirectCost').dtype == np.float64
+    assert list(table.get_column('optionName')) == ['Baseline', 'Action', 'Baseline']
+
+
+def test_update_object_dict_updates_or_adds_rows():
+    table = get_table()
+    table.update_object_dict(((61, 47, 2), 0, 2027, 0, 0), {'DirectCost': 10.0})
+    table.update_object_dict(((61, 47, 2), 0, 2027, 0, 0.03), {'DirectCost': 9.0})
+
+    assert len(table) == 4
+    assert table.get_attribute_values(((61, 47, 2), 0, 2027, 0, 0), 'DirectCost', 'CO2_UStons') == [10.0, 5]
+    assert table.get_attribute_value(((61, 47, 2), 0, 2027, 0, 0.03), 'DirectCost') == 9.0
+
+
+def test_find_rows_and_key_element_replacement():
+    table = get_table()
+    key_codes = table.get_key_codes()
+
+    np.testing.assert_array_equal(table.find_rows(key_codes), [0, 1, 2])
+
+    no_action_codes = table.replace_key_element(key_codes, 1, 0)
+    np.testing.assert_array_equal(table.find_rows(no_action_codes), [0, 0, 2])
+
+    missing_codes = table.replace_key_element(key_codes, 3, 5)
+    np.testing.assert_array_equal(table.find_rows(missing_codes), [-1, -1, -1])
+
+
+def test_copy_rows_with_new_keys():
+    table = get_table()
+    key_codes = table.replace_key_element(table.get_key_codes(), 4, 0.03)
+    table.copy_rows(np.arange(3), key_codes, {'DirectCost': [4.0, 5.0, 6.0]})
+
+    assert len(table) == 6
+    assert table.get_keys()[3:] == [((61, 47, 2), 0, 2027, 0, 0.03), ((61, 47, 2), 1, 2027, 0, 0.03),
+                                    ((32, 41, 1), 0, 2027, 1, 0.03)]
+    assert table.get_attribute_value(((61, 47, 2), 1, 2027, 0, 0.03), 'DirectCost') == 5.0
+    assert table.get_attribute_value(((61, 47, 2), 1, 2027, 0, 0.03), 'optionName') == 'Action'
+    assert table.get_attribute_value(((61, 47, 2), 1, 2027, 0, 0), 'DirectCost') == 2.0
+
+
+def test_encode_key_columns_matches_encode_keys():
+    table = get_table()
+    vehicle_ids = [(61, 47, 2), (32, 41, 1)]
+    key_codes = table.encode_key_columns((vehicle_ids, np.array([0, 0, 1])), 0, np.array([2027, 2027, 2027]),
+                                         np.array([0, 1, 0]), 0)
+
+    assert list(key_codes) == list(table.encode_keys([((61, 47, 2), 0, 2027, 0, 0), ((61, 47, 2), 0, 2027, 1, 0),
+                                                      ((32, 41, 1), 0, 2027, 0, 0)]))
+
+
+def test_rows_added_one_at_a_time_are_found_before_and_after_sorting():
+    table = ResultsTable(('vehicle_id', 'option_id', 'modelyear_id', 'age_id', 'discount_rate'))
+    keys = [((61, 47, 2), row % 3, 2027 + row // 300, row % 100, 0) for row in range(3000)]
+    for row, key in enumerate(keys):
+        table.update_object_dict(key, {'DirectCost': float(row)})
+        assert table.get_row_index(key) == row
+
+    assert table.sorted_num_rows > 0 and table.new_rows
+    assert [table.get_row_index(key) for key in keys] == list(range(3000))
+    np.testing.assert_array_equal(table.find_rows(table.encode_keys(keys)), np.arange(3000))
+
+    table.add_rows([keys[0]], {'DirectCost': -1.0})  # a repeated key finds the last row added
+    assert table.get_row_index(keys[0]) == 3000
+    assert table.find_rows(table.encode_keys([keys[0]]))[0] == 3000
+
+
+def test_get_key_columns():
+    table = get_table()
+    (vehicle_ids, vehicle_codes), (option_ids, option_codes) = table.get_key_columns(np.array([2, 1]))[:2]
+
+    assert [vehicle_ids[code] for code in vehicle_codes] == [(32, 41, 1), (61, 47, 2)]
+    assert [option_ids[code] for code in option_codes] == [0, 1]
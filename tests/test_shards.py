@@ -0,0 +1,122 @@
+import pickle
+import shutil
+
+import pandas as pd
+import pytest
+
+from bca_tool_code.set_inputs import SetInputs
+from bca_tool_code.set_paths import SetPaths
+
+INPUT_FILES = ['Input_Files.csv', 'Runtime_Options.csv', 'BCA_General_Inputs.csv', 'Fleet.csv']
+
+pytestmark = pytest.mark.skipif(not all((SetPaths().path_inputs / file).exists() for file in INPUT_FILES),
+                                reason='requires a complete inputs folder')
+
+
+def run_shards(shards_path, num_shards):
+    settings = SetInputs()
+    settings.cost_calcs.calc_reference_costs(settings, shards_path)
+    for shard_number in range(1, num_shards + 1):
+        settings = SetInputs()
+        settings.cost_calcs.calc_shard_costs(settings, shards_path, shard_number, num_shards)
+
+
+def merge_shards(shards_path):
+    settings = SetInputs()
+    settings.cost_calcs.shards_path = shards_path
+    settings.cost_calcs.calc_results(settings)
+
+    return settings
+
+
+def rewrite_shard(path, **changes):
+    with open(path, 'rb') as file:
+        shard_costs = pickle.load(file)
+    shard_costs.update(changes)
+    with open(path, 'wb') as file:
+        pickle.dump(shard_costs, file)
+
+
+@pytest.fixture(scope='module')
+def shards_path(tmp_path_factory):
+    shards_path = tmp_path_factory.mktemp('shards')
+    run_shards(shards_path, 2)
+
+    return shards_path
+
+
+@pytest.fixture
+def shards_copy(shards_path, tmp_path):
+    return shutil.copytree(shards_path, tmp_path / 'shards')
+
+
+def test_merged_shards_match_unsharded_run(shards_path):
+    merged = merge_shards(shards_path)
+    unsharded = SetInputs()
+    unsharded.cost_calcs.calc_results(unsharded)
+
+    pd.testing.assert_frame_equal(merged.cost_calcs.results.to_dataframe(),
+                                  unsharded.cost_calcs.results.to_dataframe(), check_exact=True)
+    pd.testing.assert_frame_equal(merged.annual_summary_cap.results.to_dataframe(),
+                                  unsharded.annual_summary_cap.results.to_dataframe(), check_exact=True)
+
+
+def test_shard_of_other_inputs_exits(shards_copy, capsys):
+    settings = SetInputs()
+    settings.set_overrides({'learning_rate': '-0.1'})
+
+    with pytest.raises(SystemExit):
+        settings.cost_calcs.calc_shard_costs(settings, shards_copy, 1, 2)
+    assert 'reference_costs.pkl was calculated with input files, general inputs or overrides other than' \
+           in capsys.readouterr().out
+
+
+def test_merge_of_other_inputs_exits(shards_copy, capsys):
+    rewrite_shard(shards_copy / 'shard_2_of_2.pkl', input_fingerprint='0' * 16)
+
+    with pytest.raises(SystemExit):
+        merge_shards(shards_copy)
+    assert 'shard_2_of_2.pkl was calculated with input files, general inputs or overrides other than' \
+           in capsys.readouterr().out
+
+
+def test_merge_without_shards_exits(tmp_path):
+    with pytest.raises(SystemExit):
+        merge_shards(tmp_path)
+
+
+def test_merge_with_missing_shard_exits(shards_copy, capsys):
+    (shards_copy / 'shard_2_of_2.pkl').unlink()
+    shutil.copy2(shards_copy / 'shard_1_of_2.pkl', shards_copy / 'shard_1_of_3.pkl')
+    (shards_copy / 'shard_1_of_2.pkl').unlink()
+
+    with pytest.raises(SystemExit):
+        merge_shards(shards_copy)
+    assert "['shard_2_of_3.pkl', 'shard_3_of_3.pkl'] not found" in capsys.readouterr().out
+
+
+def test_merge_with_mixed_shard_counts_exits(shards_copy, capsys):
+    shutil.copy2(shards_copy / 'shard_1_of_2.pkl', shards_copy / 'shard_1_of_3.pkl')
+
+    with pytest.raises(SystemExit):
+        merge_shards(shards_copy)
+    assert 'were run with [2, 3] shards' in capsys.readouterr().out
+
+
+def test_merge_of_other_fleet_exits(shards_copy, capsys):
+    rewrite_shard(shards_copy / 'shard_2_of_2.pkl', num_rows=1)
+
+    with pytest.raises(SystemExit):
+        merge_shards(shards_copy)
+    assert 'shard_2_of_2.pkl was not run on the fleet of this run' in capsys.readouterr().out
+
+
+def test_merge_not_covering_fleet_exits(shards_copy, capsys):
+    with open(shards_copy / 'shard_2_of_2.pkl', 'rb') as file:
+        shard_costs = pickle.load(file)
+    rewrite_shard(shards_copy / 'shard_2_of_2.pkl', rows=shard_costs['rows'][1:],
+                  columns={attribute_name: values[1:] for attribute_name, values in shard_costs['columns'].items()})
+
+    with pytest.raises(SystemExit):
+        merge_shards(shards_copy)
+    assert 'do not cover the fleet' in capsys.readouterr().out
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from bca_tool_code.general_input_modules.start_year_lookup import StartYearLookup
+
+
+def get_lookup():
+    _dict = {
+        ((47, 2), 0, 2027, 1): {'Warranty_Miles': 100000, 'Warranty_Age': 5},
+        ((47, 2), 0, 2031, 1): {'Warranty_Miles': 150000, 'Warranty_Age': None},
+        ((47, 2), 1, 2027, 1): {'Warranty_Miles': 200000, 'Warranty_Age': 7},
+        ((41, 1), 0, 2024, 1): {'Warranty_Miles': 50000, 'Warranty_Age': 3},
+    }
+    start_year_lookup = StartYearLookup()
+    start_year_lookup.init_from_dict(_dict, 'Warranty_Miles', 'Warranty_Age')
+
+    return start_year_lookup
+
+
+def test_start_years():
+    start_year_lookup = get_lookup()
+
+    assert start_year_lookup.start_years == [2024, 2027, 2031]
+    assert start_year_lookup.get_start_year(2030) == 2027
+    np.testing.assert_array_equal(start_year_lookup.get_start_years([2024, 2026, 2031, 2040]),
+                                  [2024, 2024, 2031, 2031])
+    with pytest.raises(SystemExit):
+        start_year_lookup.get_start_years([2023, 2027])
+
+
+def test_get_values():
+    start_year_lookup = get_lookup()
+    engine_ids = [(41, 1), (47, 2)]
+    engine_codes = np.array([1, 1, 1, 0])
+    option_ids = np.array([0, 0, 1, 0])
+    modelyear_ids = np.array([2028, 2032, 2029, 2026])
+
+    np.testing.assert_array_equal(
+        start_year_lookup.get_values('Warranty_Miles', engine_ids, engine_codes, option_ids, modelyear_ids, 1),
+        [100000, 150000, 200000, 50000])
+    np.testing.assert_array_equal(
+        start_year_lookup.get_values('Warranty_Age', engine_ids, engine_codes, option_ids, modelyear_ids, 1),
+        [5, np.nan, 7, 3])
+
+
+@pytest.mark.parametrize('engine_ids, option_id, modelyear_id, key_suffix', [
+    ([(47, 2)], 1, 2032, 1),  # no option 1 entry for the 2031 start year
+    ([(47, 2)], 2, 2028, 1),  # no option 2
+    ([(46, 2)], 0, 2028, 1),  # no such engine
+    ([(47, 2)], 0, 2028, 2),  # no such key suffix
+])
+def test_get_values_missing_entry_exits(engine_ids, option_id, modelyear_id, key_suffix):
+    start_year_lookup = get_lookup()
+
+    with pytest.raises(SystemExit):
+        start_year_lookup.get_values('Warranty_Miles', engine_ids, [0], [option_id], [modelyear_id], key_suffix)
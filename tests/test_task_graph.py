@@ -0,0 +1,62 @@
+import pytest
+
+from bca_tool_code.general_modules.task_graph import TaskGraph
+
+
+def get_stages(calls):
+    def stage(name, inputs, outputs):
+        return {'name': name, 'function': lambda: calls.append(name), 'inputs': inputs, 'outputs': outputs}
+
+    return [
+        stage('tech_cost', ['package_cost'], ['tech_cost']),
+        stage('package_cost', ['fleet'], ['package_cost']),
+        stage('fuel_cost', ['fleet'], ['fuel_cost']),
+        stage('total_cost', ['tech_cost', 'fuel_cost'], ['total_cost']),
+    ]
+
+
+def test_add_stages_in_dependency_order():
+    graph = TaskGraph()
+    graph.add_stages(get_stages(list()))
+
+    assert list(graph.tasks) == ['package_cost', 'fuel_cost', 'tech_cost', 'total_cost']
+    assert graph.tasks['total_cost']['dependencies'] == ['tech_cost', 'fuel_cost']
+    assert graph.get_dependents(['package_cost']) == ['package_cost', 'tech_cost', 'total_cost']
+
+
+def test_add_stages_cycle():
+    graph = TaskGraph()
+    stages = get_stages(list())
+    stages[1]['inputs'] = ['total_cost']
+
+    with pytest.raises(ValueError, match='form a cycle'):
+        graph.add_stages(stages)
+
+
+def test_add_stages_duplicate_output():
+    graph = TaskGraph()
+    stages = get_stages(list())
+    stages[2]['outputs'] = ['fuel_cost', 'tech_cost']
+
+    with pytest.raises(ValueError, match='is written by both'):
+        graph.add_stages(stages)
+
+
+def test_add_task_unknown_dependency():
+    graph = TaskGraph()
+
+    with pytest.raises(ValueError):
+        graph.add_task('tech_cost', lambda: None, ['package_cost'])
+
+
+@pytest.mark.parametrize('max_workers', [1, None])
+def test_run_respects_dependencies(max_workers):
+    calls = list()
+    graph = TaskGraph()
+    graph.add_stages(get_stages(calls))
+    graph.run(max_workers)
+
+    assert sorted(calls) == sorted(graph.tasks)
+    assert calls.index('package_cost') < calls.index('tech_cost') < calls.index('total_cost')
+    assert calls.index('fuel_cost') < calls.index('total_cost')
+    assert set(graph.task_times) == set(graph.tasks)